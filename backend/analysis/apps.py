@@ -4,3 +4,11 @@ from django.apps import AppConfig
 class AnalysisConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'analysis'
+
+    def ready(self):
+        from . import jobs
+
+        # Pick up jobs a restart left behind, from the first request served
+        # (not here: a preloading server forks after ready())
+        if jobs.should_start_workers():
+            jobs.start_workers_on_first_request()
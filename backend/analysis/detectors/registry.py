@@ -0,0 +1,272 @@
+"""
+Detectors the analysis router can run, and what the scheduler needs to
+know about each (see router._run_detectors):
+
+    file_types   uploads it applies to
+    cost         rough milliseconds per upload on one core; cheaper
+                 detectors are scheduled first
+    version      () -> what its output depends on (models, rule sets); a
+                 stored run is only reused under the same versions
+    after        detectors whose outputs its skip rules read; it waits for them
+    speculative  with workers to spare it starts without waiting for `after`,
+                 and its output is discarded if a skip rule fires once they
+                 finish (latency over compute); one worker keeps the wait
+    skip_rules   rule(document, done) -> reason or None, where `done` maps
+                 the detectors finished so far to their outputs; the first
+                 reason returned skips the detector
+    score        its output's contribution to the run's risk label (0-1)
+
+Endpoints pick a detector set (DETECTOR_SETS): the full analysis, PII
+only or AI-text only.
+
+A skip rule may only fire when the detector's output could not change
+the outcome, or could not mean anything for this upload.
+
+The torch-backed detector modules (pdf_text_detector, image_detector) are
+imported by their runners and versions only, so a PII-only process never
+imports torch or transformers.
+"""
+from __future__ import annotations
+
+import os
+from typing import Any, Callable, Dict, NamedTuple, Optional, Tuple
+
+from pii_detection.result_cache import DETECTOR_VERSION as PII_DETECTOR_VERSION
+from pii_detection.router import model_router
+
+# An image whose OCR text is at least this long is a screenshot or scan
+# of a document, not a photo the deepfake classifier was trained on
+SCREENSHOT_MIN_WORDS = int(os.getenv("PII_SCREENSHOT_MIN_WORDS", 40))
+
+# Floor a detector's own risk label puts under its score
+LABEL_SCORES = {"HIGH": 0.7, "MEDIUM": 0.3}
+
+Rule = Callable[[Any, Dict[str, Dict[str, Any]]], Optional[str]]
+
+
+class DetectorSpec(NamedTuple):
+    name: str
+    file_types: Tuple[str, ...]
+    cost: int
+    version: Callable[[], str]
+    run: Callable[[Any, Dict[str, Any]], Dict[str, Any]]
+    score: Callable[[Dict[str, Any]], float]
+    after: Tuple[str, ...] = ()
+    skip_rules: Tuple[Rule, ...] = ()
+    speculative: bool = False
+
+
+def risk_label_from_scores(scores) -> str:
+    if not scores: return "LOW"
+    m = max(scores)
+    return "HIGH" if m >= 0.7 else "MEDIUM" if m >= 0.3 else "LOW"
+
+
+def risk_label(outputs: Dict[str, Dict[str, Any]]) -> str:
+    """Risk label of a run from its detectors' outputs, by detector name."""
+    return risk_label_from_scores([REGISTRY[name].score(out) for name, out in outputs.items() if name in REGISTRY])
+
+
+def _result(output: Dict[str, Any], kind: str) -> Dict[str, Any]:
+    return next((r for r in output.get("results") or [] if r.get("type") == kind), {})
+
+
+# -- skip rules --
+
+def risk_decided(document, done) -> Optional[str]:
+    """Nothing scores above HIGH: once there, the remaining detectors can't change the label."""
+    if done and risk_label(done) == "HIGH":
+        return f"risk already HIGH from {', '.join(done)}"
+    return None
+
+
+def text_screenshot(document, done) -> Optional[str]:
+    words = _result(done.get("pdf_text_ai", {}), "AI_ANALYSIS").get("word_count", 0)
+    if words >= SCREENSHOT_MIN_WORDS:
+        return f"image is a screenshot of text ({words} words OCR'd)"
+    return None
+
+
+def pii_blocks(pii_result: Dict[str, Any]) -> Optional[str]:
+    """
+    Perplexity gate inside pdf_text_ai: a document the PII pass blocks is
+    HIGH whatever its authorship.
+    """
+    if pii_result.get("action") == "BLOCK":
+        return "PII pass already decided BLOCK"
+    return None
+
+
+# -- detectors --
+
+def _text_model_name() -> str:
+    from core.ai_detection.pdf_text_detector import MODEL_NAME
+    return MODEL_NAME
+
+
+def _image_model_name() -> str:
+    from ..image_detector import MODEL_NAME
+    return MODEL_NAME
+
+
+def _run_pdf_text_ai(document, payload: Dict[str, Any]) -> Dict[str, Any]:
+    from core.ai_detection.pdf_text_detector import detect_pdf_ai
+
+    if payload.get("cached_pdf_text_ai") is not None:
+        return payload["cached_pdf_text_ai"]
+    # Text / OCR come from the shared Document (extracted at most once)
+    on_progress = payload.get("on_progress")
+    return detect_pdf_ai(
+        metadata=payload.get("metadata", {}),
+        pii_mode=payload.get("pii_mode", "standard"),
+        document=document,
+        # PII findings are reported before perplexity scoring starts
+        on_pii=(lambda partial: on_progress("pdf_text_ai", partial)) if on_progress else None,
+        skip_ai_text=pii_blocks,
+    )
+
+
+def _score_pdf_text_ai(output: Dict[str, Any]) -> float:
+    # risk_score is the AI-authorship score; risk_label also counts the PII found
+    return max(float(output.get("risk_score", output.get("confidence_score", 0.0))),
+               LABEL_SCORES.get(output.get("risk_label"), 0.0))
+
+
+def _run_image_deepfake(document, payload: Dict[str, Any]) -> Dict[str, Any]:
+    from . import image_deepfake as image_detector
+
+    if not document.data:
+        return {"is_ai": False, "confidence": 0, "message": "No image data provided"}
+
+    # Same decoded pixels the OCR step uses (no temp file, no re-decode)
+    res = image_detector.detect_ai_generated(document.image)
+    # Map your result to the generic DetectorResult structure
+    output = {
+        "detection_type": "image_deepfake",
+        "confidence_score": res.get("confidence", 0) / 100,
+        "is_ai": res.get("is_ai"),
+        "label": res.get("label"),
+        "short_explanation": res.get("message"),
+        "results": [res] # Nested for frontend compatibility
+    }
+    # detect_ai_generated reports a failure as a message, not an exception;
+    # flagged, the output is never reused for the same bytes
+    if str(res.get("message", "")).startswith("Error"):
+        output["flags"] = ["error"]
+    return output
+
+
+def _score_confidence(output: Dict[str, Any]) -> float:
+    return float(output.get("confidence_score", 0.0))
+
+
+def _run_pii(document, payload: Dict[str, Any]) -> Dict[str, Any]:
+    # Text layer / OCR and the PII tiers only: no torch model is loaded
+    pii_mode = payload.get("pii_mode", "standard")
+    segments = document.segments if document.file_type == "pdf" else None
+    result = model_router(document.text or "", mode=pii_mode, segments=segments)
+    findings = result.get("detected_pii", [])
+    risk = result.get("risk_level", "LOW")
+    if risk == "NONE": risk = "LOW"
+    weighted = result.get("risk_score", 0.0)
+    return {
+        "detection_type": "pii",
+        "found": bool(findings),
+        "entities": findings,
+        "risk_label": risk,
+        "action": result.get("action", "PROCESS"),
+        "risk_score_weighted": round(weighted, 2),
+        "confidence_score": 0.9 if risk == "HIGH" else (0.6 if weighted >= 6 else 0.0),
+        "privacy_tips": result.get("privacy_tips", []),
+        "short_explanation": f"Found {len(findings)} PII entities." if findings else "No PII entities detected.",
+        "mode": pii_mode,
+        "timings_ms": result.get("timings_ms", {}),
+    }
+
+
+def _score_label(output: Dict[str, Any]) -> float:
+    return LABEL_SCORES.get(output.get("risk_label"), 0.0)
+
+
+def _run_ai_text(document, payload: Dict[str, Any]) -> Dict[str, Any]:
+    from core.ai_detection.pdf_text_detector import score_ai_text
+
+    # PII is masked before scoring, as in detect_pdf_ai
+    result = score_ai_text(document.text, pii_mode=payload.get("pii_mode", "standard"))
+    return dict(
+        result,
+        detection_type="ai_text",
+        confidence_score=result["risk_score"],
+        short_explanation=result.get("explanation", result.get("error", "")),
+        flags=["error"] if "error" in result else [],
+    )
+
+
+REGISTRY: Dict[str, DetectorSpec] = {}
+
+
+def register(spec: DetectorSpec) -> DetectorSpec:
+    REGISTRY[spec.name] = spec
+    return spec
+
+
+register(DetectorSpec(
+    name="pdf_text_ai",
+    file_types=("text", "pdf", "image"),
+    # OCR on images dominates; PII tiers and perplexity on text
+    cost=300,
+    version=lambda: f"{PII_DETECTOR_VERSION}+{_text_model_name()}",
+    run=_run_pdf_text_ai,
+    score=_score_pdf_text_ai,
+))
+
+register(DetectorSpec(
+    name="image_deepfake",
+    file_types=("image",),
+    # ViT-base forward pass
+    cost=400,
+    version=_image_model_name,
+    run=_run_image_deepfake,
+    score=_score_confidence,
+    after=("pdf_text_ai",),
+    skip_rules=(risk_decided, text_screenshot),
+    # Overlaps OCR instead of queueing behind it; the rules then only drop its result
+    speculative=True,
+))
+
+
+register(DetectorSpec(
+    name="pii",
+    file_types=("text", "pdf", "image"),
+    # Regex / checksum tiers; OCR on images
+    cost=100,
+    version=lambda: PII_DETECTOR_VERSION,
+    run=_run_pii,
+    score=_score_label,
+))
+
+register(DetectorSpec(
+    name="ai_text",
+    file_types=("text", "pdf", "image"),
+    # distilgpt2 perplexity
+    cost=1000,
+    version=lambda: f"{PII_DETECTOR_VERSION}+{_text_model_name()}",
+    run=_run_ai_text,
+    score=_score_confidence,
+))
+
+# Detectors each endpoint may run (see analysis/urls.py)
+DETECTOR_SETS = {
+    "full": ("pdf_text_ai", "image_deepfake"),
+    "pii": ("pii",),
+    "ai_text": ("ai_text",),
+}
+
+
+def detectors_for(file_type: str, detector_set: str = "full"):
+    """Names of the detectors of `detector_set` for an upload type, cheapest first."""
+    specs = sorted(
+        (REGISTRY[name] for name in DETECTOR_SETS[detector_set] if file_type in REGISTRY[name].file_types),
+        key=lambda s: s.cost,
+    )
+    return [s.name for s in specs]
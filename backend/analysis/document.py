@@ -0,0 +1,230 @@
+"""
+Parse-once view of an uploaded file, shared by every detector.
+
+route_and_detect builds one Document per upload from the bytes already in
+memory, and everything else is derived lazily, at most once:
+
+    pdf          pdfplumber.PDF over a BytesIO (no temp file)
+    extraction   pdf_extractor.extract_pdf() on the bytes: text layer,
+                 per-page OCR decision, OCR output
+    image        image uploads: pixels decoded once (cv2, BGR) straight
+                 from the upload buffer, shared by OCR and the ViT detector
+    text         PDF: text layer + OCR'd pages; image: OCR text;
+                 text upload: decoded UTF-8
+    text_layer   PDF text layer alone (no OCR)
+    pages        per-page extraction records (PDF)
+    segments     form fields, annotations and metadata, with offsets in
+                 `text` (PDF, see pii_detection.pdf_structure)
+    images       embedded image placements per page (PDF)
+
+Time spent parsing / extracting is recorded in Document.stats. Detector
+threads share a Document, so each lazy attribute is computed under a lock
+of its own Document (see _lazy_property).
+"""
+from __future__ import annotations
+
+import hashlib
+import logging
+import threading
+import time
+from typing import Any, Dict, List
+
+logger = logging.getLogger(__name__)
+
+
+class _lazy_property:
+    """
+    functools.cached_property with a lock per Document and attribute.
+    cached_property (up to 3.11) holds one lock per attribute across all
+    instances, so one upload's OCR blocks every other upload's; from 3.12
+    it has none and two detector threads can both run the extraction.
+    """
+
+    def __init__(self, fn):
+        self.fn = fn
+        self.name = fn.__name__
+        self.__doc__ = fn.__doc__
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, obj, owner=None):
+        if obj is None:
+            return self
+        # Once computed, the instance __dict__ entry shadows this descriptor
+        with obj._lock_for(self.name):
+            if self.name not in obj.__dict__:
+                obj.__dict__[self.name] = self.fn(obj)
+        return obj.__dict__[self.name]
+
+
+def classify_file_type(filename: str, content_type: str = "") -> str:
+    fn = filename.lower()
+    if fn.endswith((".jpg", ".jpeg", ".png")): return "image"
+    if fn.endswith(".pdf"): return "pdf"
+    if fn.endswith(".txt"): return "text"
+    return "unsupported"
+
+
+class Document:
+    def __init__(self, data: bytes, name: str = "uploaded", content_type: str = "", file_type: str = None,
+                 content_hash: str = None):
+        self.data = data
+        self.name = name
+        self.content_type = content_type
+        self.file_type = file_type or classify_file_type(name, content_type)
+        self.ocr_info: Dict[str, Any] = {}
+        self.stats: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._locks: Dict[str, threading.Lock] = {}
+        if content_hash:
+            self.__dict__["content_hash"] = content_hash
+
+    @classmethod
+    def from_upload(cls, uploaded_file) -> "Document":
+        """
+        Read a Django UploadedFile once, hashing its chunks as they are
+        read; nothing is written to disk.
+        """
+        hasher, chunks = hashlib.sha256(), []
+        uploaded_file.seek(0)
+        for chunk in uploaded_file.chunks():
+            hasher.update(chunk)
+            chunks.append(chunk)
+        uploaded_file.seek(0)
+        return cls(
+            b"".join(chunks),
+            name=getattr(uploaded_file, "name", "uploaded"),
+            content_type=getattr(uploaded_file, "content_type", ""),
+            content_hash=hasher.hexdigest(),
+        )
+
+    def _lock_for(self, name: str) -> threading.Lock:
+        with self._lock:
+            return self._locks.setdefault(name, threading.Lock())
+
+    @property
+    def size(self) -> int:
+        return len(self.data)
+
+    @_lazy_property
+    def content_hash(self) -> str:
+        """SHA-256 of the bytes (AnalysisFile.content_hash)."""
+        return hashlib.sha256(self.data).hexdigest()
+
+    def _timed(self, stat, fn, *args, **kwargs):
+        t0 = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            self.stats[stat] = round((time.perf_counter() - t0) * 1000, 2)
+
+    # -- PDF --
+
+    @_lazy_property
+    def pdf(self):
+        from pii_detection.pdf_extractor import open_pdf
+        return self._timed("parse_ms", open_pdf, self.data)
+
+    @_lazy_property
+    def extraction(self) -> Dict[str, Any]:
+        """pdf_extractor.extract_pdf() result (empty for non-PDFs or on failure)."""
+        empty = {"text": "", "text_layer": "", "pages": [], "ocr_pages": [], "ocr_cache_hits": [], "segments": []}
+        if self.file_type != "pdf":
+            return empty
+        from pii_detection.pdf_extractor import extract_pdf
+        try:
+            # The text layer backend parses the bytes itself; a pdfplumber
+            # document already opened here is reused for layout fallbacks
+            return self._timed("extract_ms", extract_pdf, self.data, pdf=self.__dict__.get("pdf"))
+        except Exception as e:
+            logger.error(f"PDF extraction failed: {e}")
+            return empty
+
+    @property
+    def extracted(self) -> bool:
+        """True once the PDF extraction has run (it is never forced by reads of `data`)."""
+        return "extraction" in self.__dict__
+
+    @property
+    def pages(self) -> List[Dict[str, Any]]:
+        return self.extraction["pages"]
+
+    @property
+    def ocr_pages(self) -> List[int]:
+        return self.extraction["ocr_pages"]
+
+    @property
+    def ocr_cache_hits(self) -> List[int]:
+        return self.extraction["ocr_cache_hits"]
+
+    @property
+    def segments(self) -> List[Dict[str, Any]]:
+        return self.extraction["segments"]
+
+    @_lazy_property
+    def images(self) -> List[Dict[str, Any]]:
+        """Embedded images of a PDF: page number, placement box and source pixel size."""
+        if self.file_type != "pdf":
+            return []
+        found = []
+        for page_num, page in enumerate(self.pdf.pages, 1):
+            try:
+                for img in page.images:
+                    width, height = img.get("srcsize") or (None, None)
+                    found.append({
+                        "page": page_num,
+                        "bbox": (img["x0"], img["top"], img["x1"], img["bottom"]),
+                        "width": width,
+                        "height": height,
+                    })
+            finally:
+                page.close()
+        return found
+
+    # -- image --
+
+    @_lazy_property
+    def image(self):
+        """Decoded BGR array (None if undecodable); np.frombuffer wraps the bytes without copying."""
+        if self.file_type != "image":
+            return None
+        import cv2
+        import numpy as np
+        return self._timed("decode_ms", cv2.imdecode, np.frombuffer(self.data, dtype=np.uint8), cv2.IMREAD_COLOR)
+
+    # -- text --
+
+    @_lazy_property
+    def text_layer(self) -> str:
+        if self.file_type == "pdf":
+            return self.extraction["text_layer"]
+        if self.file_type == "text":
+            return self.text
+        return ""
+
+    @_lazy_property
+    def text(self) -> str:
+        """
+        Text every detector works on. For images this runs OCR (details in
+        `ocr_info`); OCR errors propagate to the caller.
+        """
+        if self.file_type == "pdf":
+            return self.extraction["text"]
+        if self.file_type == "text":
+            return self.data.decode("utf-8", errors="replace")
+        if self.file_type == "image":
+            from pii_detection.image_extractor import extract_text_from_array
+            return self._timed("ocr_ms", extract_text_from_array, self.image, info=self.ocr_info)
+        return ""
+
+    def close(self):
+        pdf = self.__dict__.pop("pdf", None)
+        if pdf is not None:
+            pdf.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -1,7 +1,9 @@
 import torch
 from transformers import AutoImageProcessor, ViTForImageClassification
 from PIL import Image
+import cv2
 import io
+import numpy as np
 
 MODEL_NAME = "AashishKumar/AIvisionGuard-v2"
 
@@ -17,12 +19,29 @@ def get_resources():
         model = ViTForImageClassification.from_pretrained(MODEL_NAME)
     return processor, model
 
-def detect_ai_generated(file_path):
+def _to_rgb(image):
+    """
+    RGB input for the processor from a file path, encoded bytes, a PIL
+    image or an already decoded cv2 (BGR / grayscale) array, the last one
+    shared with OCR so the upload is decoded only once.
+    """
+    if isinstance(image, np.ndarray):
+        code = cv2.COLOR_GRAY2RGB if image.ndim == 2 else cv2.COLOR_BGR2RGB
+        return cv2.cvtColor(image, code)
+    if isinstance(image, (bytes, bytearray, memoryview)):
+        image = io.BytesIO(image)
+    if not isinstance(image, Image.Image):
+        image = Image.open(image)
+    return image.convert('RGB')
+
+def detect_ai_generated(image):
     try:
         proc, mod = get_resources()
         
         # 1. Load and Convert Image
-        image = Image.open(file_path).convert('RGB')
+        if image is None:
+            raise ValueError("Image could not be decoded")
+        image = _to_rgb(image)
         
         # 2. Preprocess (Resizes to 224x224 automatically)
         inputs = proc(image, return_tensors="pt")
@@ -0,0 +1,352 @@
+"""
+Asynchronous analysis jobs on a database-backed queue (no broker).
+
+    enqueue()        stores the upload on its AnalysisFile and creates a
+                     QUEUED DetectionRun; the caller answers 202 at once
+                     (bytes analysed before are answered from that run,
+                     DONE straight away, see router.find_reusable_run)
+    worker threads   claim QUEUED runs (compare-and-set on job_status, so
+                     any number of threads / processes can share the
+                     queue), run the detectors outside any transaction
+                     and finish the run DONE or FAILED in one short one
+    JobEvent rows    progress of each run, in order: "status", "partial"
+                     (PII findings before perplexity scoring), "result"
+                     (one per detector run, as it finishes), then "done"
+                     (listing the detectors skipped) or "failed";
+                     iter_events() turns them into server-sent events
+
+Web server processes start their worker threads with the first request
+they serve (AnalysisConfig.ready arms start_workers_on_first_request, see
+should_start_workers), so runs left QUEUED, or RUNNING past their lease,
+by a restart are picked up without waiting for the next async upload.
+Waiting for a request rather than starting in ready() keeps the threads
+out of a master that loads the app and then forks its workers (gunicorn
+--preload, uWSGI without lazy-apps): a forked child would inherit their
+DB connection but not the threads. Management commands and the runserver
+autoreloader's parent never start them. With PII_JOB_WORKERS=0, run
+`manage.py run_analysis_jobs` alongside.
+
+Configured from the environment:
+    PII_JOB_WORKERS    worker threads per web process (default 2); 0 leaves
+                       the queue to `manage.py run_analysis_jobs`
+    PII_JOB_POLL       seconds between queue polls when idle (default 2)
+    PII_JOB_LEASE      seconds after which a RUNNING job is presumed lost
+                       with its worker and re-queued (default 900)
+    PII_JOB_SSE_TIMEOUT  longest an event stream stays open (default 300)
+    PII_JOB_AUTOSTART  1 / 0 forces the first-request start on / off, for
+                       servers should_start_workers doesn't recognise
+                       (mod_wsgi, ...); 1 is safe under a preforking server
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from datetime import timedelta
+from typing import Any, Dict, Iterator, Optional
+
+from django.core.signals import request_started
+from django.db import close_old_connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .document import Document
+from .models import AnalysisFile, DetectionRun, DetectorResult, JobEvent
+from .router import (
+    _risk_label, _run_detectors, detector_version, document_metadata, find_reusable_run, prepare_document, reuse_run,
+)
+
+logger = logging.getLogger(__name__)
+
+JOB_WORKERS = int(os.getenv("PII_JOB_WORKERS", 2))
+JOB_POLL_SECONDS = float(os.getenv("PII_JOB_POLL", 2))
+JOB_LEASE_SECONDS = float(os.getenv("PII_JOB_LEASE", 900))
+SSE_TIMEOUT_SECONDS = float(os.getenv("PII_JOB_SSE_TIMEOUT", 300))
+SSE_POLL_SECONDS = 0.5
+SSE_KEEPALIVE_SECONDS = 15
+FINAL_EVENTS = ("done", "failed")
+# Process names of the WSGI / ASGI servers that start workers on boot
+SERVER_COMMANDS = ("gunicorn", "uwsgi", "daphne", "uvicorn", "hypercorn", "waitress-serve")
+
+_workers = []
+_workers_lock = threading.Lock()
+_wakeup = threading.Event()
+
+
+def _emit(run_id: int, kind: str, **data) -> None:
+    JobEvent.objects.create(run_id=run_id, kind=kind, data=data)
+
+
+def enqueue(*, user, uploaded_file, metadata: Dict[str, Any], pii_mode: str = "standard",
+            force_rescan: bool = False, detector_set: str = "full") -> DetectionRun:
+    """
+    Store the upload and queue it; processing happens on a worker. An
+    upload identical to an earlier one reuses its results unless
+    `force_rescan`, and the run returned is already DONE.
+    """
+    document = Document.from_upload(uploaded_file)
+    name, content_type = document.name, document.content_type or ""
+    size = getattr(uploaded_file, "size", document.size)
+    source = None if force_rescan else find_reusable_run(
+        document.content_hash, document.file_type, pii_mode, detector_set
+    )
+    if source is not None:
+        run, outputs, _ = reuse_run(
+            user=user, source=source, name=name, content_type=content_type, size=size,
+            content_hash=document.content_hash, metadata=metadata,
+        )
+        for detector, out in zip(run.detectors_executed, outputs):
+            _emit(run.id, "result", detector=detector, output=out)
+        _emit(run.id, "done", job_status="DONE", risk_label=run.risk_label,
+              detectors_skipped=run.detectors_skipped, reused_from=source.id)
+        return run
+
+    with transaction.atomic():
+        af = AnalysisFile.objects.create(
+            original_name=name,
+            content_type=content_type,
+            size_bytes=size,
+            upload=document.data,
+            content_hash=document.content_hash,
+        )
+        run = DetectionRun.objects.create(
+            user=user if (user and user.is_authenticated) else None,
+            file=af, risk_label="", job_status="QUEUED", detector_set=detector_set, pii_mode=pii_mode,
+            metadata=metadata,
+        )
+        _emit(run.id, "status", job_status="QUEUED")
+    if JOB_WORKERS > 0:
+        start_workers()
+    _wakeup.set()
+    return run
+
+
+def _owned(run_id: int, claimed_at):
+    """The run, if it is still RUNNING under the claim made at `claimed_at`."""
+    return DetectionRun.objects.filter(id=run_id, job_status="RUNNING", started_at=claimed_at)
+
+
+def claim_next() -> Optional[DetectionRun]:
+    """
+    Oldest QUEUED run (or RUNNING one whose lease expired), marked RUNNING
+    for this worker; None when the queue is empty. The UPDATE only matches
+    while the row is unchanged, so a run is never claimed twice.
+    """
+    stale = timezone.now() - timedelta(seconds=JOB_LEASE_SECONDS)
+    candidates = (
+        DetectionRun.objects
+        .filter(Q(job_status="QUEUED") | Q(job_status="RUNNING", started_at__lt=stale))
+        .order_by("id")
+        .values_list("id", "job_status", "started_at")[:10]
+    )
+    for run_id, job_status, started_at in candidates:
+        now = timezone.now()
+        claimed = DetectionRun.objects.filter(
+            id=run_id, job_status=job_status, started_at=started_at
+        ).update(job_status="RUNNING", started_at=now, updated_at=now)
+        if claimed:
+            return DetectionRun.objects.select_related("file").get(id=run_id)
+    return None
+
+
+def process(run: DetectionRun) -> None:
+    """
+    Run the detectors of a claimed job and record the outcome. The outcome
+    is only written while this worker still holds the claim: a job that
+    outlived its lease has been re-queued and claimed again (claim_next),
+    and the later worker's outcome is the one kept.
+    """
+    af = run.file
+    claimed_at = run.started_at
+    document = Document(bytes(af.upload or b""), name=af.original_name, content_type=af.content_type)
+    _emit(run.id, "status", job_status="RUNNING")
+    try:
+        if document.file_type == "unsupported":
+            routed, names, outputs, skipped = [], [], [{"detection_type": "unsupported"}], []
+            extracted_content, risk = "", "LOW"
+        else:
+            routed, payload, extracted_content = prepare_document(
+                document, run.metadata, run.pii_mode, run.detector_set
+            )
+
+            def on_progress(name, partial):
+                # Called from a detector thread: don't keep its connection around
+                _emit(run.id, "partial", detector=name, output=partial)
+                close_old_connections()
+
+            payload["on_progress"] = on_progress
+            names, outputs, skipped = _run_detectors(
+                routed, document, payload,
+                on_result=lambda name, output: _emit(run.id, "result", detector=name, output=output),
+            )
+            risk = _risk_label(names, outputs)
+        file_metadata = document_metadata(document, af.size_bytes)
+
+        now = timezone.now()
+        with transaction.atomic():
+            if not _owned(run.id, claimed_at).update(
+                job_status="DONE", risk_label=risk, detectors_executed=names, detectors_skipped=skipped,
+                detector_version=detector_version(routed),
+                file_metadata=file_metadata, finished_at=now, updated_at=now,
+            ):
+                logger.warning(f"Analysis job {run.id} was claimed again after its lease; result dropped")
+                return
+            AnalysisFile.objects.filter(id=af.id).update(
+                upload=None, extracted_text=extracted_content[:50000] if extracted_content else None
+            )
+            DetectorResult.objects.bulk_create([
+                DetectorResult(run_id=run.id, detector_name=out.get("detection_type", "unknown"), output=out)
+                for out in outputs
+            ])
+            _emit(run.id, "done", job_status="DONE", risk_label=risk, detectors_skipped=skipped)
+    except Exception as e:
+        logger.error(f"Analysis job {run.id} failed: {e}", exc_info=True)
+        now = timezone.now()
+        with transaction.atomic():
+            if not _owned(run.id, claimed_at).update(
+                job_status="FAILED", error=str(e)[:2000], finished_at=now, updated_at=now
+            ):
+                logger.warning(f"Analysis job {run.id} was claimed again after its lease; failure dropped")
+                return
+            AnalysisFile.objects.filter(id=af.id).update(upload=None)
+            _emit(run.id, "failed", job_status="FAILED", error=str(e)[:2000])
+    finally:
+        document.close()
+
+
+def run_next() -> bool:
+    """Claim and process one job; False when there was none."""
+    close_old_connections()
+    try:
+        run = claim_next()
+        if run is None:
+            return False
+        process(run)
+        return True
+    finally:
+        close_old_connections()
+
+
+def work(stop: threading.Event = None, drain: bool = False) -> None:
+    """Worker loop: process jobs until `stop` is set (or the queue is empty, with `drain`)."""
+    while not (stop and stop.is_set()):
+        try:
+            if run_next():
+                continue
+        except Exception as e:
+            logger.error(f"Analysis job worker error: {e}", exc_info=True)
+        if drain:
+            return
+        _wakeup.wait(JOB_POLL_SECONDS)
+        _wakeup.clear()
+
+
+def should_start_workers(argv=None, environ=None) -> bool:
+    """
+    Whether this process may serve requests and should work the queue
+    once it does: one of SERVER_COMMANDS, or `manage.py runserver` in the
+    reloader's child (or with --noreload). Management commands (migrate,
+    run_analysis_jobs, ...) and scripts calling django.setup() never do.
+    PII_JOB_AUTOSTART=1 / 0 overrides the guess (e.g. under mod_wsgi).
+    """
+    argv = sys.argv if argv is None else argv
+    environ = os.environ if environ is None else environ
+    if JOB_WORKERS <= 0:
+        return False
+    if environ.get("PII_JOB_AUTOSTART") in ("0", "1"):
+        return environ["PII_JOB_AUTOSTART"] == "1"
+    command = os.path.basename(argv[0]) if argv else ""
+    if command in SERVER_COMMANDS:
+        return True
+    if command.startswith("manage") and argv[1:2] == ["runserver"]:
+        return environ.get("RUN_MAIN") == "true" or "--noreload" in argv
+    return False
+
+
+def start_workers_on_first_request() -> None:
+    """
+    Start the worker threads from the first request this process serves.
+    In a preforking server that is a worker, never the master that ran
+    AnalysisConfig.ready().
+    """
+    request_started.connect(_start_on_request, dispatch_uid="analysis-job-workers")
+
+
+def _start_on_request(sender, **kwargs):
+    request_started.disconnect(dispatch_uid="analysis-job-workers")
+    start_workers()
+
+
+def start_workers(count: int = None) -> None:
+    """Start in-process worker threads (idempotent), JOB_WORKERS by default."""
+    count = JOB_WORKERS if count is None else count
+    with _workers_lock:
+        _workers[:] = [t for t in _workers if t.is_alive()]
+        while len(_workers) < count:
+            thread = threading.Thread(target=work, name=f"analysis-job-{len(_workers)}", daemon=True)
+            thread.start()
+            _workers.append(thread)
+
+
+# -- status / events --
+
+def job_report(run: DetectionRun) -> Dict[str, Any]:
+    """
+    Status of a run. Once DONE it carries the same fields as the
+    synchronous /api/analyze/ response; before that, "results" holds the
+    detectors that have finished so far.
+    """
+    if run.job_status == "DONE":
+        results = [r.output for r in run.results.order_by("id")]
+    else:
+        results = [e.data["output"] for e in run.events.filter(kind="result")]
+    return {
+        "report_id": run.id,
+        "job_status": run.job_status,
+        "pii_mode": run.pii_mode,
+        "detector_set": run.detector_set,
+        "created_at": run.created_at,
+        "started_at": run.started_at,
+        "finished_at": run.finished_at,
+        "error": run.error or None,
+        "file_metadata": run.file_metadata or {"name": run.file.original_name, "size_bytes": run.file.size_bytes},
+        "detectors_executed": run.detectors_executed,
+        "detectors_skipped": run.detectors_skipped,
+        "results": results,
+        "risk_label": run.risk_label or None,
+    }
+
+
+def _sse(event_id, kind, data) -> str:
+    return f"id: {event_id}\nevent: {kind}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+def iter_events(run_id: int, after: int = 0) -> Iterator[str]:
+    """
+    Server-sent events for a run, starting after event id `after` (the
+    client's Last-Event-ID). Ends after "done" / "failed", or with a
+    "timeout" event after SSE_TIMEOUT_SECONDS.
+    """
+    deadline = time.monotonic() + SSE_TIMEOUT_SECONDS
+    last_sent = time.monotonic()
+    while True:
+        events = list(JobEvent.objects.filter(run_id=run_id, id__gt=after))
+        for event in events:
+            after = event.id
+            last_sent = time.monotonic()
+            yield _sse(event.id, event.kind, event.data)
+            if event.kind in FINAL_EVENTS:
+                return
+        if not events and not DetectionRun.objects.filter(id=run_id, job_status__in=("QUEUED", "RUNNING")).exists():
+            # Resumed after the final event: nothing more will come
+            return
+        if time.monotonic() >= deadline:
+            yield _sse(after, "timeout", {"retry": True})
+            return
+        if time.monotonic() - last_sent >= SSE_KEEPALIVE_SECONDS:
+            last_sent = time.monotonic()
+            yield ": keepalive\n\n"
+        time.sleep(SSE_POLL_SECONDS)
@@ -0,0 +1,33 @@
+import threading
+
+from django.core.management.base import BaseCommand
+
+from analysis import jobs
+
+
+class Command(BaseCommand):
+    help = 'Processes queued async analyses (POST /api/analyze/ with async=1)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=1, help='worker threads')
+        parser.add_argument('--drain', action='store_true', help='exit once the queue is empty')
+
+    def handle(self, *args, **options):
+        workers, drain = max(1, options['workers']), options['drain']
+        self.stdout.write(f"Processing analysis jobs on {workers} worker(s)...")
+        stop = threading.Event()
+        threads = [
+            threading.Thread(target=jobs.work, kwargs={'stop': stop, 'drain': drain}, name=f"analysis-job-{i}")
+            for i in range(workers)
+        ]
+        for thread in threads:
+            thread.start()
+        try:
+            for thread in threads:
+                thread.join()
+        except KeyboardInterrupt:
+            self.stdout.write("Stopping after the jobs in progress...")
+            stop.set()
+            for thread in threads:
+                thread.join()
+        self.stdout.write("Done.")
@@ -0,0 +1,71 @@
+# Generated by Django 5.2.5 on 2026-10-17 00:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analysis', '0004_analysisfile_extracted_text'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='analysisfile',
+            name='upload',
+            field=models.BinaryField(blank=True, help_text='Uploaded bytes, held only until the async job has run', null=True),
+        ),
+        migrations.AddField(
+            model_name='detectionrun',
+            name='error',
+            field=models.TextField(blank=True, default=''),
+        ),
+        migrations.AddField(
+            model_name='detectionrun',
+            name='file_metadata',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AddField(
+            model_name='detectionrun',
+            name='finished_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='detectionrun',
+            name='job_status',
+            field=models.CharField(choices=[('QUEUED', 'Queued'), ('RUNNING', 'Running'), ('DONE', 'Done'), ('FAILED', 'Failed')], db_index=True, default='DONE', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='detectionrun',
+            name='metadata',
+            field=models.JSONField(blank=True, default=dict, help_text='Client metadata sent with the upload'),
+        ),
+        migrations.AddField(
+            model_name='detectionrun',
+            name='pii_mode',
+            field=models.CharField(default='standard', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='detectionrun',
+            name='started_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='JobEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(max_length=20)),
+                ('data', models.JSONField(default=dict)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('run', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='events', to='analysis.detectionrun')),
+            ],
+            options={
+                'ordering': ['id'],
+            },
+        ),
+        migrations.RunSQL(
+            sql='ALTER TABLE "analysis_jobevent" ENABLE ROW LEVEL SECURITY;',
+            reverse_sql='ALTER TABLE "analysis_jobevent" DISABLE ROW LEVEL SECURITY;',
+        ),
+    ]
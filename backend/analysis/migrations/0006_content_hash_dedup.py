@@ -0,0 +1,29 @@
+# Generated by Django 5.2.5 on 2026-10-17 00:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analysis', '0005_detectionrun_jobs'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='analysisfile',
+            name='content_hash',
+            field=models.CharField(blank=True, db_index=True, default='', help_text='SHA-256 of the uploaded bytes', max_length=64),
+        ),
+        migrations.AddField(
+            model_name='detectionrun',
+            name='detector_version',
+            field=models.CharField(blank=True, default='', max_length=255),
+        ),
+        migrations.AddField(
+            model_name='detectionrun',
+            name='reused_from',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='reuses', to='analysis.detectionrun'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-17 00:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analysis', '0006_content_hash_dedup'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='detectionrun',
+            name='detectors_skipped',
+            field=models.JSONField(blank=True, default=list),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-17 00:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analysis', '0007_detectionrun_detectors_skipped'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='detectionrun',
+            name='detector_set',
+            field=models.CharField(default='full', max_length=10),
+        ),
+    ]
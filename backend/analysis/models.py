@@ -8,6 +8,8 @@ class AnalysisFile(models.Model):
     content_type = models.CharField(max_length=100)
     size_bytes = models.BigIntegerField()
     extracted_text = models.TextField(blank=True, null=True, help_text="Stored text or document content for admin inspection")
+    content_hash = models.CharField(max_length=64, blank=True, default='', db_index=True, help_text="SHA-256 of the uploaded bytes")
+    upload = models.BinaryField(blank=True, null=True, editable=False, help_text="Uploaded bytes, held only until the async job has run")
     created_at = models.DateTimeField(auto_now_add=True)
 
     def __str__(self) -> str:
@@ -21,6 +23,13 @@ class DetectionRun(models.Model):
         ('REVIEWED', 'Reviewed'),
         ('FLAGGED', 'Flagged'),
     ]
+    # Processing lifecycle; synchronous runs are created DONE
+    JOB_STATUS_CHOICES = [
+        ('QUEUED', 'Queued'),
+        ('RUNNING', 'Running'),
+        ('DONE', 'Done'),
+        ('FAILED', 'Failed'),
+    ]
     
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True
@@ -29,6 +38,21 @@ class DetectionRun(models.Model):
     risk_label = models.CharField(max_length=10, choices=[('LOW','LOW'),('MEDIUM','MEDIUM'),('HIGH','HIGH')])
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='PENDING')
     detectors_executed = models.JSONField(default=list)
+    # Detectors the scheduler left out, [{"name", "reason"}] (see router._run_detectors)
+    detectors_skipped = models.JSONField(default=list, blank=True)
+    job_status = models.CharField(max_length=10, choices=JOB_STATUS_CHOICES, default='DONE', db_index=True)
+    # Detectors the endpoint runs: full, pii or ai_text (see detectors/registry.py)
+    detector_set = models.CharField(max_length=10, default='full')
+    pii_mode = models.CharField(max_length=10, default='standard')
+    metadata = models.JSONField(default=dict, blank=True, help_text="Client metadata sent with the upload")
+    file_metadata = models.JSONField(default=dict, blank=True)
+    error = models.TextField(blank=True, default='')
+    # Versions of the detectors that produced the results (see router.detector_version)
+    detector_version = models.CharField(max_length=255, blank=True, default='')
+    # Set when the results were copied from an earlier run on identical bytes
+    reused_from = models.ForeignKey('self', on_delete=models.SET_NULL, null=True, blank=True, related_name='reuses')
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -44,3 +68,17 @@ class DetectorResult(models.Model):
 
     def __str__(self) -> str:
         return f"{self.detector_name} -> Run {self.run_id}"
+
+
+class JobEvent(models.Model):
+    """Progress of an async run, in order: status changes and per-detector results."""
+    run = models.ForeignKey(DetectionRun, on_delete=models.CASCADE, related_name='events')
+    kind = models.CharField(max_length=20)
+    data = models.JSONField(default=dict)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['id']
+
+    def __str__(self) -> str:
+        return f"{self.kind} -> Run {self.run_id}"
@@ -1,183 +1,319 @@
 from __future__ import annotations
 
-from typing import Any, Dict, List
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Optional
 from django.db import transaction
 from .models import AnalysisFile, DetectionRun, DetectorResult
-from core.ai_detection.pdf_text_detector import detect_pdf_ai
-from .detectors import image_deepfake as image_detector
+from .detectors.registry import REGISTRY, detectors_for, risk_label as _registry_risk_label
+from .document import Document
 from .utils.file_validation import validate_uploaded_file
-import tempfile
-import os
 
-from io import BytesIO
 import logging
 
 logger = logging.getLogger(__name__)
 
-# --- Teammate's PDF extraction logic preserved exactly ---
-def _extract_pdf_text(file_obj) -> str:
-    logger.info("🔍 Starting PDF text extraction...")
-    try:
-        file_obj.seek(0)
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp_pdf:
-            tmp_pdf.write(file_obj.read())
-            tmp_pdf_path = tmp_pdf.name
-        
-        try:
-            import pdfplumber
-            text = ""
-            with pdfplumber.open(tmp_pdf_path) as pdf:
-                for page in pdf.pages:
-                    page_text = page.extract_text()
-                    if page_text: text += page_text + "\n"
-            
-            extracted_text = text.strip()
-            if len(extracted_text) < 500:
-                logger.warning("PDF likely scanned, triggering OCR fallback...")
-                # OCR Fallback logic continues...
-            return extracted_text
-        finally:
-            if os.path.exists(tmp_pdf_path): os.unlink(tmp_pdf_path)
-    except Exception as e:
-        logger.error(f"PDF extraction failed: {str(e)}")
-        return ""
-
-def _classify_file_type(filename: str, content_type: str) -> str:
-    fn = filename.lower()
-    if fn.endswith((".jpg", ".jpeg", ".png")): return "image"
-    if fn.endswith(".pdf"): return "pdf"
-    if fn.endswith(".txt"): return "text"
-    return "unsupported"
-
-# --- MODIFIED: Split routing so images trigger BOTH detectors ---
-def _route_detectors(file_type: str) -> List[str]:
-    if file_type == "image":
-        # Returns teammate's OCR/PII detector AND your Deepfake detector
-        return ["pdf_text_ai", "image_deepfake"] 
-    if file_type in ("text", "pdf"):
-        return ["pdf_text_ai"]
-    return []
-
-# --- MODIFIED: Updated to handle ViT file-path requirements ---
-def _invoke_detector(name: str, payload: Dict[str, Any]) -> Dict[str, Any]:
-    try:
-        if name == "pdf_text_ai":
-            return detect_pdf_ai(
-                text_input=payload.get("text", ""),
-                metadata=payload.get("metadata", {}),
-                image_bytes=payload.get("image_bytes")
-            )
-
-        if name == "image_deepfake":
-            # Your model needs a file path for PIL.Image.open()
-            img_bytes = payload.get("image_bytes") or payload.get("bytes")
-            if not img_bytes:
-                return {"is_ai": False, "confidence": 0, "message": "No image data provided"}
-            
-            # Create a temporary file so your ViT can read it by path
-            with tempfile.NamedTemporaryFile(delete=False, suffix=".png") as tmp:
-                tmp.write(img_bytes)
-                tmp_path = tmp.name
-            
-            try:
-                # Calling your specific function name
-                res = image_detector.detect_ai_generated(tmp_path)
-                # Map your result to the generic DetectorResult structure
-                return {
-                    "detection_type": "image_deepfake",
-                    "confidence_score": res.get("confidence", 0) / 100,
-                    "is_ai": res.get("is_ai"),
-                    "label": res.get("label"),
-                    "short_explanation": res.get("message"),
-                    "results": [res] # Nested for frontend compatibility
-                }
-            finally:
-                if os.path.exists(tmp_path):
-                    os.unlink(tmp_path)
+# Detectors of one upload run concurrently, outside any DB transaction, on
+# a pool shared by all requests (the heavy work is OCR / torch, which
+# release the GIL). 1 runs them inline, one after another.
+DETECTOR_WORKERS = int(os.getenv("PII_DETECTOR_WORKERS", 0)) or min(4, os.cpu_count() or 1)
+
+_detector_pool = None
+_detector_pool_lock = threading.Lock()
 
+
+def _get_detector_pool():
+    global _detector_pool
+    if _detector_pool is None:
+        with _detector_pool_lock:
+            if _detector_pool is None:
+                _detector_pool = ThreadPoolExecutor(max_workers=DETECTOR_WORKERS, thread_name_prefix="detector")
+    return _detector_pool
+
+# Images get both the OCR/PII detector and the ViT deepfake detector in the
+# full set; see detectors/registry.py
+def _route_detectors(file_type: str, detector_set: str = "full") -> List[str]:
+    return detectors_for(file_type, detector_set)
+
+def _invoke_detector(name: str, document: Document, payload: Dict[str, Any]) -> Dict[str, Any]:
+    try:
+        spec = REGISTRY.get(name)
+        if spec is not None:
+            return spec.run(document, payload)
         return {"detection_type": name, "confidence_score": 0.0, "short_explanation": "Unknown detector"}
     except Exception as e:
         logger.error(f"Detector {name} failed: {e}")
         return {"detection_type": name, "confidence_score": 0.0, "flags": ["error"], "short_explanation": str(e)}
 
-def _risk_label_from_scores(scores: List[float]) -> str:
-    if not scores: return "LOW"
-    m = max(scores)
-    return "HIGH" if m >= 0.7 else "MEDIUM" if m >= 0.3 else "LOW"
+def _skip_reason(name: str, document: Document, done: Dict[str, Dict[str, Any]]) -> Optional[str]:
+    spec = REGISTRY.get(name)
+    for rule in (spec.skip_rules if spec else ()):
+        reason = rule(document, done)
+        if reason:
+            return reason
+    return None
 
-def route_and_detect(*, user, uploaded_file, metadata: Dict[str, Any]) -> Dict[str, Any]:
-    fname = getattr(uploaded_file, "name", "uploaded")
-    ctype = getattr(uploaded_file, "content_type", "")
-    fsize = getattr(uploaded_file, "size", 0)
+def _run_detectors(names: List[str], document: Document, payload: Dict[str, Any],
+                   on_result: Callable[[str, Dict[str, Any]], None] = None):
+    """
+    Cascade over the named detectors, cheapest first. A detector starts
+    once the detectors it runs `after` are finished, unless one of its
+    skip rules fires on their outputs; independent detectors run
+    concurrently. A `speculative` detector doesn't wait when there are
+    workers to spare: its rules are applied once its `after` detectors
+    finish, and its output is discarded (and it is reported skipped) if
+    one fires. `on_result(name, output)` is called as each kept output
+    is final.
 
-    ftype = _classify_file_type(fname, ctype)
-    detectors_to_run = _route_detectors(ftype)
+    Returns (names run, their outputs, skipped) with `skipped` a list of
+    {"name", "reason"}, including stages a detector skipped internally
+    (as "<detector>/<stage>").
+    """
+    waiting = sorted(names, key=lambda n: REGISTRY[n].cost if n in REGISTRY else 0)
+    done: Dict[str, Dict[str, Any]] = {}
+    skipped: List[Dict[str, str]] = []
+    running = {}
+    early = set()  # speculative detectors started before their `after` finished
+    held: Dict[str, Dict[str, Any]] = {}  # ... and finished before them
+    concurrent = len(names) > 1 and DETECTOR_WORKERS > 1
+    if concurrent and document.file_type == "image":
+        # Decode here so OCR and the ViT share one array instead of racing to fill it
+        document.image
+
+    def finish(name, output):
+        done[name] = output
+        skipped.extend(
+            {"name": f"{name}/{stage['name']}", "reason": stage["reason"]} for stage in output.get("skipped") or []
+        )
+        if on_result:
+            on_result(name, output)
+
+    def settle():
+        # Keep or discard speculative detectors whose `after` are all finished
+        pending = set(waiting) | set(running.values()) | set(held) if waiting or running else set()
+        for name in [n for n in early if not pending.intersection(REGISTRY[n].after)]:
+            early.discard(name)
+            reason = _skip_reason(name, document, done)
+            if name in held:
+                output = held.pop(name)
+                if not reason:
+                    finish(name, output)
+            elif reason:
+                # Still running: not waited for, its result is dropped
+                future = next(f for f, n in running.items() if n == name)
+                future.cancel()
+                del running[future]
+            if reason:
+                skipped.append({"name": name, "reason": f"{reason} (ran concurrently, result discarded)"})
+
+    while waiting or running or held:
+        settle()
+        pending = set(waiting) | set(running.values()) | set(held)
+        ready = [n for n in waiting if n not in REGISTRY or not pending.intersection(REGISTRY[n].after)
+                 or (concurrent and REGISTRY[n].speculative)]
+        if not ready and not running:
+            ready = waiting[:]  # `after` names a cycle: give up ordering rather than stall
+        for name in ready:
+            waiting.remove(name)
+            reason = _skip_reason(name, document, done)
+            if reason:
+                skipped.append({"name": name, "reason": reason})
+            elif concurrent:
+                if name in REGISTRY and pending.intersection(REGISTRY[name].after):
+                    early.add(name)
+                running[_get_detector_pool().submit(_invoke_detector, name, document, payload)] = name
+            else:
+                finish(name, _invoke_detector(name, document, payload))
+        if running:
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                name = running.pop(future)
+                if name in early:
+                    held[name] = future.result()
+                else:
+                    finish(name, future.result())
+
+    executed = [name for name in names if name in done]
+    return executed, [done[name] for name in executed], skipped
+
+def _risk_label(names: List[str], outputs: List[Dict[str, Any]]) -> str:
+    return _registry_risk_label(dict(zip(names, outputs)))
+
+def detector_version(names: List[str]) -> str:
+    """
+    Versions of the detectors routed to an upload. A run's results are only
+    reused for identical bytes (AnalysisFile.content_hash) analysed with the
+    same versions, so bumping a version in the registry retires every
+    stored result of it.
+    """
+    return ";".join(f"{name}={REGISTRY[name].version() if name in REGISTRY else ''}" for name in names)
+
+def _reusable_outputs(outputs: List[Dict[str, Any]]) -> bool:
+    """Failed detectors (an "error" key or flag) are never replayed."""
+    return bool(outputs) and not any("error" in out or "error" in (out.get("flags") or []) for out in outputs)
+
+def find_reusable_run(content_hash: str, file_type: str, pii_mode: str,
+                      detector_set: str = "full") -> Optional[DetectionRun]:
+    """Most recent finished run on the same bytes, mode and detectors / versions, if its results are sound."""
+    names = _route_detectors(file_type, detector_set)
+    if not content_hash or not names:
+        return None
+    run = (
+        DetectionRun.objects
+        .filter(file__content_hash=content_hash, pii_mode=pii_mode, job_status="DONE",
+                detector_version=detector_version(names))
+        .select_related("file")
+        .order_by("-id")
+        .first()
+    )
+    if run is None or not _reusable_outputs([r.output for r in run.results.order_by("id")]):
+        return None
+    return run
+
+def reuse_run(*, user, source: DetectionRun, name: str, content_type: str, size: int, content_hash: str,
+              metadata: Dict[str, Any]):
+    """
+    New DetectionRun (and AnalysisFile) for an upload identical to
+    `source`'s, carrying copies of its detector outputs. Returns
+    (run, outputs, file_metadata).
+    """
+    outputs = [r.output for r in source.results.order_by("id")]
+    file_metadata = dict(source.file_metadata or {}, name=name, size_bytes=size, reused_from=source.id)
+    with transaction.atomic():
+        af = AnalysisFile.objects.create(
+            original_name=name, content_type=content_type, size_bytes=size,
+            extracted_text=source.file.extracted_text, content_hash=content_hash,
+        )
+        run = DetectionRun.objects.create(
+            user=user if (user and user.is_authenticated) else None,
+            file=af, risk_label=source.risk_label, detectors_executed=source.detectors_executed,
+            detectors_skipped=source.detectors_skipped, detector_set=source.detector_set, pii_mode=source.pii_mode, metadata=metadata, file_metadata=file_metadata,
+            detector_version=source.detector_version, reused_from=source,
+        )
+        DetectorResult.objects.bulk_create([
+            DetectorResult(run=run, detector_name=out.get("detection_type", "unknown"), output=out)
+            for out in outputs
+        ])
+    return run, outputs, file_metadata
+
+def route_and_detect(*, user, uploaded_file, metadata: Dict[str, Any], pii_mode: str = "standard",
+                     force_rescan: bool = False, detector_set: str = "full") -> Dict[str, Any]:
+    """
+    Analyse an upload with the detectors of `detector_set` (see
+    registry.DETECTOR_SETS). Identical bytes analysed before (same mode
+    and detectors / versions) get that run's results, unless `force_rescan`.
+    """
+    # Upload read once; parsing, text layer and OCR are done lazily by the
+    # Document and shared by every detector
+    document = Document.from_upload(uploaded_file)
+    try:
+        return _route_document(
+            user, document, getattr(uploaded_file, "size", 0), metadata, pii_mode, force_rescan, detector_set
+        )
+    finally:
+        document.close()
+
+
+def prepare_document(document: Document, metadata: Dict[str, Any], pii_mode: str, detector_set: str = "full"):
+    """
+    Detectors of `detector_set` to run on `document`, their shared payload
+    and the text to store on the AnalysisFile. A PDF seen before gets its
+    cached pdf_text_ai result instead of an extraction.
+    """
+    names = _route_detectors(document.file_type, detector_set)
+    payload = {"metadata": metadata, "pii_mode": pii_mode}
+    extracted_content = ""
+
+    if document.file_type == "pdf" and "pdf_text_ai" in names:
+        from core.ai_detection.pdf_text_detector import cached_detect_pdf_ai
+
+        # Same bytes seen before: reuse the masked result, skip extraction
+        payload["cached_pdf_text_ai"] = cached_detect_pdf_ai(document.data, metadata, pii_mode)
+        if payload["cached_pdf_text_ai"] is None:
+            extracted_content = document.text
+    elif document.file_type in ("text", "pdf"):
+        extracted_content = document.text
+    return names, payload, extracted_content
+
+
+def document_metadata(document: Document, fsize: int) -> Dict[str, Any]:
+    file_metadata = {"name": document.name, "file_type": document.file_type.upper(), "size_bytes": fsize}
+    if document.extracted:
+        # Which pages were OCR'd (only pages without a usable text layer are)
+        file_metadata["ocr_pages"] = document.ocr_pages
+        file_metadata["ocr_cache_hits"] = document.ocr_cache_hits
+        # Pages whose form fields stood in for OCR, and where the structured text came from
+        file_metadata["form_pages"] = [p["page"] for p in document.pages if p["source"] == "form"]
+        file_metadata["structured_segments"] = [
+            {k: s[k] for k in ("source", "label", "page")} for s in document.segments
+        ]
+    if document.stats:
+        file_metadata["extraction_ms"] = document.stats
+    return file_metadata
+
+
+def _route_document(user, document: Document, fsize: int, metadata: Dict[str, Any], pii_mode: str,
+                    force_rescan: bool = False, detector_set: str = "full") -> Dict[str, Any]:
+    fname, ctype, ftype = document.name, document.content_type, document.file_type
 
     if ftype == "unsupported":
         return {"risk_label": "LOW", "results": [{"detection_type": "unsupported"}]}
 
-    payload = {"metadata": metadata}
-
-    # Prepare data for both OCR and Deepfake
-    if ftype == "image":
-        uploaded_file.seek(0)
-        img_data = uploaded_file.read()
-        payload["image_bytes"] = img_data # Used by teammate's OCR
-        payload["bytes"] = img_data       # Standard key for detectors
-        uploaded_file.seek(0)
-    elif ftype == "text":
-        uploaded_file.seek(0)
-        payload["text"] = uploaded_file.read().decode("utf-8", errors="replace")
-    elif ftype == "pdf":
-        # Teammate's new PDF extraction logic preserved
-        try:
-            from pii_detection.pdf_extractor import extract_text_from_pdf
-            with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp:
-                uploaded_file.seek(0)
-                tmp.write(uploaded_file.read())
-                tmp_path = tmp.name
-            extracted_text = extract_text_from_pdf(tmp_path)
-            os.unlink(tmp_path)
-        except:
-            extracted_text = _extract_pdf_text(uploaded_file)
-        payload["text"] = extracted_text
-
-    outputs_list = []
-    scores = []
+    source = None if force_rescan else find_reusable_run(document.content_hash, ftype, pii_mode, detector_set)
+    if source is not None:
+        run_obj, outputs_list, file_metadata = reuse_run(
+            user=user, source=source, name=fname, content_type=ctype, size=fsize,
+            content_hash=document.content_hash, metadata=metadata,
+        )
+        return {
+            "file_metadata": file_metadata,
+            "detectors_executed": run_obj.detectors_executed,
+            "detectors_skipped": run_obj.detectors_skipped,
+            "results": outputs_list,
+            "risk_label": run_obj.risk_label,
+        }
+
+    detectors_to_run, payload, extracted_content = prepare_document(document, metadata, pii_mode, detector_set)
+
+    started = time.perf_counter()
+    executed, outputs_list, skipped = _run_detectors(detectors_to_run, document, payload)
+    detected = time.perf_counter()
+    risk_str = _risk_label(executed, outputs_list)
 
+    file_metadata = document_metadata(document, fsize)
+
+    # Only the writes hold the transaction
     with transaction.atomic():
-        extracted_content = payload.get("text", "")
         af = AnalysisFile.objects.create(
             original_name=fname, 
             content_type=ctype, 
             size_bytes=fsize,
-            extracted_text=extracted_content[:50000] if extracted_content else None
+            extracted_text=extracted_content[:50000] if extracted_content else None,
+            content_hash=document.content_hash,
         )
-
-        for d_name in detectors_to_run:
-            res = _invoke_detector(d_name, payload)
-            outputs_list.append(res)
-            
-            # Extract score for risk calculation
-            score = res.get("confidence_score", 0.0)
-            if d_name == "pdf_text_ai":
-                score = res.get("risk_score", score)
-            scores.append(float(score))
-
-        risk_str = _risk_label_from_scores(scores)
         run_obj = DetectionRun.objects.create(
             user=user if (user and user.is_authenticated) else None,
-            file=af, risk_label=risk_str, detectors_executed=detectors_to_run
+            file=af, risk_label=risk_str, detectors_executed=executed, detectors_skipped=skipped,
+            detector_set=detector_set, pii_mode=pii_mode, metadata=metadata, file_metadata=file_metadata,
+            detector_version=detector_version(detectors_to_run),
         )
+        DetectorResult.objects.bulk_create([
+            DetectorResult(run=run_obj, detector_name=out.get("detection_type", "unknown"), output=out)
+            for out in outputs_list
+        ])
+    stored = time.perf_counter()
 
-        for out in outputs_list:
-            DetectorResult.objects.create(
-                run=run_obj, detector_name=out.get("detection_type", "unknown"), output=out
-            )
+    file_metadata["route_ms"] = {
+        "detectors": round((detected - started) * 1000, 2),
+        "db": round((stored - detected) * 1000, 2),
+    }
 
     return {
-        "file_metadata": {"name": fname, "file_type": ftype.upper(), "size_bytes": fsize},
-        "detectors_executed": detectors_to_run,
+        "file_metadata": file_metadata,
+        "detectors_executed": executed,
+        "detectors_skipped": skipped,
         "results": outputs_list,
         "risk_label": risk_str,
-    }
\ No newline at end of file
+    }
@@ -33,7 +33,7 @@ class ReportListSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = DetectionRun
-        fields = ('report_id', 'submitted_at', 'submitted_by', 'file_type', 'file_metadata', 'overall_risk', 'status', 'preview_snippet')
+        fields = ('report_id', 'submitted_at', 'submitted_by', 'file_type', 'file_metadata', 'overall_risk', 'status', 'job_status', 'preview_snippet')
         read_only_fields = fields
     
     def get_report_id(self, obj):
@@ -94,7 +94,9 @@ class ReportDetailSerializer(serializers.ModelSerializer):
             'detector_results',
             'overall_risk',
             'detectors_executed',
-            'status'
+            'detectors_skipped',
+            'status',
+            'job_status',
         )
         read_only_fields = fields
     
@@ -118,6 +120,8 @@ class ReportDetailSerializer(serializers.ModelSerializer):
             'original_name': file_obj.original_name,
             'content_type': file_obj.content_type,
             'size_bytes': file_obj.size_bytes,
+            'content_hash': file_obj.content_hash,
+            'reused_from': obj.reused_from_id,
             'extracted_text': file_obj.extracted_text,
             'created_at': file_obj.created_at,
         }
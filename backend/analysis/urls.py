@@ -1,15 +1,21 @@
 from django.urls import path
-from .views import analyze, admin_report_list, admin_report_detail, admin_report_status_update, AdminDashboardStatsView
+from .views import analyze, detect_pii, detect_pdf_ai, screen_pii, analyze_job, analyze_job_events, admin_report_list, admin_report_detail, admin_report_status_update, AdminDashboardStatsView
 
 app_name = 'analysis'
 
 urlpatterns = [
     # This is the one that works for images
     path('analyze/', analyze, name='analyze'), 
+    # Async analyses (POST .../analyze/ with async=1)
+    path('analyze/jobs/<int:report_id>/', analyze_job, name='analyze-job'),
+    path('analyze/jobs/<int:report_id>/events/', analyze_job_events, name='analyze-job-events'),
     
-    # ADD THESE TWO LINES to catch the PDF and PII calls from your frontend:
-    path('detect-pdf-ai/', analyze, name='detect-pdf-ai'),
-    path('detect-pii/', analyze, name='detect-pii'),
+    # Single-purpose analyses: AI-text score only / PII findings only
+    path('detect-pdf-ai/', detect_pdf_ai, name='detect-pdf-ai'),
+    path('detect-pii/', detect_pii, name='detect-pii'),
+
+    # Fast PII tier for bulk screening
+    path('screen-pii/', screen_pii, name='screen-pii'),
     
     # Admin report management
     path('admin/reports/', admin_report_list, name='admin-report-list'),
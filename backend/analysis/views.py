@@ -3,11 +3,16 @@ from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.parsers import MultiPartParser, FormParser
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.throttling import ScopedRateThrottle
+from django.http import StreamingHttpResponse
+from django.urls import reverse
 # VersionedJWTAuthentication is used via the project default (set in settings.py REST_FRAMEWORK)
 
 from accounts.permissions import IsOwnerOrAdmin, IsAdminWithMFA
 import json
 
+from . import jobs
 from .router import route_and_detect
 from .utils.file_validation import validate_uploaded_file
 
@@ -20,6 +25,34 @@ from .serializers import (
 )
 
 
+def _flag(request, name) -> bool:
+    """Boolean option sent as a form field or query parameter."""
+    return str(request.data.get(name, request.query_params.get(name, ""))).lower() in ("1", "true", "yes")
+
+
+# Fields of its one detector's output a PII-only / AI-text-only endpoint
+# answers with, next to file_metadata and risk_label
+REPORT_FIELDS = {
+    "pii": ("found", "entities", "action", "risk_score_weighted", "privacy_tips", "mode"),
+    "ai_text": ("risk_score", "label", "verdict", "explanation", "word_count"),
+}
+
+
+def _shape_report(report, detector_set):
+    fields = REPORT_FIELDS.get(detector_set)
+    if fields is None:
+        return report
+    output = next(iter(report.get("results") or []), {})
+    shaped = {
+        "file_metadata": report.get("file_metadata"),
+        "risk_label": report.get("risk_label"),
+        **{field: output.get(field) for field in fields},
+    }
+    if "error" in (output.get("flags") or []) or output.get("detection_type") == "unsupported":
+        shaped["error"] = output.get("short_explanation") or "Unsupported file type"
+    return shaped
+
+
 class AnalyzeView(APIView):
     """
     API endpoint for file analysis.
@@ -31,10 +64,27 @@ class AnalyzeView(APIView):
     Accepts multipart/form-data with:
     - file: uploaded file
     - metadata: optional JSON string
+    - async: optional; "1" / "true" queues the analysis and answers 202
+      with the report id and its status / event stream URLs
+    - force_rescan: optional; "1" / "true" analyses the file even if the
+      same bytes were analysed before (otherwise that run's results are
+      reused)
+
+    Set per route via as_view(...):
+    - pii_mode: the PII detection tier ("fast", "standard" or "deep")
+    - detector_set: "full" (every detector, the full report), "pii" or
+      "ai_text" (that detector only; the response carries its fields
+      instead of "results", see REPORT_FIELDS)
+    - throttle_scope: rate in REST_FRAMEWORK["DEFAULT_THROTTLE_RATES"],
+      on top of the project-wide user / anon rates
     """
     # No authentication_classes override — inherits project default (VersionedJWTAuthentication)
     permission_classes = [IsAuthenticated]
     parser_classes = [MultiPartParser, FormParser]
+    throttle_classes = APIView.throttle_classes + [ScopedRateThrottle]
+    throttle_scope = "analyze"
+    pii_mode = "standard"
+    detector_set = "full"
 
     def post(self, request):
         uploaded_file = request.FILES.get("file")
@@ -61,17 +111,112 @@ class AnalyzeView(APIView):
             except (json.JSONDecodeError, AttributeError):
                 pass
 
+        force_rescan = _flag(request, "force_rescan")
+        if _flag(request, "async"):
+            run = jobs.enqueue(
+                user=request.user,
+                uploaded_file=uploaded_file,
+                metadata=metadata,
+                pii_mode=self.pii_mode,
+                force_rescan=force_rescan,
+                detector_set=self.detector_set,
+            )
+            return Response(
+                {
+                    "report_id": run.id,
+                    "job_status": run.job_status,
+                    "status_url": request.build_absolute_uri(reverse("analysis:analyze-job", args=[run.id])),
+                    "events_url": request.build_absolute_uri(reverse("analysis:analyze-job-events", args=[run.id])),
+                },
+                status=status.HTTP_202_ACCEPTED,
+            )
+
         report = route_and_detect(
             user=request.user,
             uploaded_file=uploaded_file,
-            metadata=metadata
+            metadata=metadata,
+            pii_mode=self.pii_mode,
+            force_rescan=force_rescan,
+            detector_set=self.detector_set,
         )
 
-        return Response(report, status=status.HTTP_200_OK)
+        return Response(_shape_report(report, self.detector_set), status=status.HTTP_200_OK)
+
+
+def _can_view_run(user, run) -> bool:
+    return user.role == 'ADMIN' or user.is_staff or (run.user is not None and run.user == user)
+
+
+class JobStatusView(APIView):
+    """
+    Status of an async analysis (see AnalyzeView "async").
+
+    GET /api/analyze/jobs/{id}/
+    Owner or ADMIN. job_status is QUEUED, RUNNING, DONE or FAILED; results
+    holds the detectors finished so far.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, report_id):
+        try:
+            run = DetectionRun.objects.select_related("user", "file").get(id=report_id)
+        except DetectionRun.DoesNotExist:
+            return Response({"error": f"Report {report_id} not found"}, status=status.HTTP_404_NOT_FOUND)
+        if not _can_view_run(request.user, run):
+            return Response({"error": "Permission denied"}, status=status.HTTP_403_FORBIDDEN)
+        return Response(jobs.job_report(run), status=status.HTTP_200_OK)
+
+
+class EventStreamRenderer(BaseRenderer):
+    """Lets text/event-stream clients through content negotiation; errors are sent as one event."""
+    media_type = "text/event-stream"
+    format = "event-stream"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return f"event: error\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+class JobEventsView(APIView):
+    """
+    Server-sent events for an async analysis.
+
+    GET /api/analyze/jobs/{id}/events/
+    Owner or ADMIN. Events: status, partial (PII findings before perplexity
+    scoring), result (one per detector), then done / failed. Resumes after
+    the Last-Event-ID header.
+    """
+    permission_classes = [IsAuthenticated]
+    renderer_classes = [JSONRenderer, EventStreamRenderer]
+
+    def get(self, request, report_id):
+        try:
+            run = DetectionRun.objects.select_related("user").get(id=report_id)
+        except DetectionRun.DoesNotExist:
+            return Response({"error": f"Report {report_id} not found"}, status=status.HTTP_404_NOT_FOUND)
+        if not _can_view_run(request.user, run):
+            return Response({"error": "Permission denied"}, status=status.HTTP_403_FORBIDDEN)
+
+        try:
+            after = int(request.headers.get("Last-Event-ID") or 0)
+        except ValueError:
+            after = 0
+        response = StreamingHttpResponse(jobs.iter_events(run.id, after), content_type="text/event-stream")
+        response["Cache-Control"] = "no-cache"
+        response["X-Accel-Buffering"] = "no"  # nginx: don't buffer the stream
+        return response
 
 
 # Backwards compatibility
 analyze = AnalyzeView.as_view()
+# PII findings only: text layer / OCR and the PII tiers, no torch model
+detect_pii = AnalyzeView.as_view(detector_set="pii", throttle_scope="detect_pii")
+# AI-authorship (perplexity) score only
+detect_pdf_ai = AnalyzeView.as_view(detector_set="ai_text", throttle_scope="detect_pdf_ai")
+# Bulk screening: regex/checksum/keyword PII tier only (no Presidio/spaCy)
+screen_pii = AnalyzeView.as_view(pii_mode="fast", detector_set="pii", throttle_scope="screen_pii")
+analyze_job = JobStatusView.as_view()
+analyze_job_events = JobEventsView.as_view()
 
 
 class StandardPagination(PageNumberPagination):
@@ -111,6 +256,8 @@ from .models import DetectionRun, DetectorResult
 User = get_user_model()
 
 from accounts.permissions import IsAdminUserRole
+from pii_detection.ocr_cache import ocr_cache_stats
+from pii_detection.result_cache import cache_stats
 
 class AdminDashboardStatsView(APIView):
     """
@@ -146,6 +293,10 @@ class AdminDashboardStatsView(APIView):
         risk_dist = {item['risk_label']: item['count'] for item in risk_counts}
         high_risk_count = risk_dist.get('HIGH', 0)
         
+        # Dedup: runs answered from an earlier run on identical bytes
+        reused_total = DetectionRun.objects.filter(reused_from__isnull=False).count()
+        reused_24h = DetectionRun.objects.filter(reused_from__isnull=False, created_at__gte=last_24h).count()
+
         # 4. Content Stats
         pending_review_count = DetectionRun.objects.filter(status='PENDING').count()
         pii_detections_count = high_risk_count
@@ -164,7 +315,22 @@ class AdminDashboardStatsView(APIView):
                 "Image": DetectionRun.objects.filter(Q(file__original_name__iendswith='.png') | Q(file__original_name__iendswith='.jpg')).count(),
                 "Text": DetectionRun.objects.filter(file__original_name__iendswith='.txt').count(),
                 "Other": 0
-            }
+            },
+            # Detection result cache counters (hits, misses, evictions, ...)
+            "result_cache": cache_stats(),
+            # OCR page cache (this process's hits / misses, shared store size)
+            "ocr_cache": ocr_cache_stats(),
+            "dedup": {
+                "reused_runs": reused_total,
+                "hit_rate": round(reused_total / total_files, 3) if total_files else 0.0,
+                "reused_runs_24h": reused_24h,
+                "hit_rate_24h": round(reused_24h / files_24h, 3) if files_24h else 0.0,
+            },
+            # Async analysis queue
+            "jobs": {
+                item['job_status']: item['count']
+                for item in DetectionRun.objects.exclude(job_status='DONE').values('job_status').annotate(count=Count('id'))
+            },
         }
         return Response(data)
 
@@ -4,9 +4,10 @@ import logging
 import json
 import torch
 import numpy as np
-from typing import Tuple, Dict, List, Any
+from typing import Tuple, Dict, List, Any, Callable, Optional
 from transformers import AutoTokenizer, AutoModelForCausalLM
-from pypdf import PdfReader
+
+from pii_detection.result_cache import bytes_key, get_cache, text_key
 
 
 
@@ -45,44 +46,6 @@ def _clean_text(text: str) -> str:
     return text.strip()
 
 
-def _extract_text_from_pdf(file_path: str) -> Tuple[str, str]:
-    """
-    Extracts text from a PDF file.
-    Returns the extracted text and a status note.
-    """
-
-    extracted_text = []
-    has_images = False
-    full_text = ""
-    status_note = ""
-
-    try:
-        reader = PdfReader(file_path)
-
-        for page in reader.pages:
-            content = page.extract_text()
-
-            if hasattr(page, "/Resources") and "/XObject" in page["/Resources"]:
-                has_images = True
-
-            if content and content.strip():
-                extracted_text.append(content)
-
-        full_text = " ".join(extracted_text).strip()
-
-        if not full_text:
-            if has_images:
-                status_note = "Note: PDF appears to be scanned or text layer missing."
-            else:
-                status_note = "Note: PDF is empty or text extraction failed."
-
-    except Exception as e:
-        status_note = f"Error during PDF structure reading: {str(e)}"
-        raise RuntimeError(f"Could not read PDF structure: {str(e)}")
-
-    return full_text, status_note
-
-
 def _calculate_perplexity_score(text: str) -> float:
     """Calculates risk score (0–1) using DistilGPT2 perplexity."""
 
@@ -119,43 +82,147 @@ def _calculate_perplexity_score(text: str) -> float:
     return max(0.0, min(1.0, risk_score))
 
 
-def detect_pdf_ai(text_input: str = "", metadata: Dict = None, image_bytes: bytes = None) -> Dict:
+def _ai_verdict(ai_score: float) -> Tuple[str, str, str]:
+    """(verdict, message, risk label) for a perplexity risk score."""
+    if ai_score >= 0.80:
+        return "Likely AI-generated", "Text is highly predictable.", "HIGH"
+    if ai_score >= 0.50:
+        return "Suspicious", "Text predictability slightly high.", "MEDIUM"
+    return "Safe", "Text shows sufficient linguistic variance.", "LOW"
+
+
+def _mask_findings(text: str, findings: List[Dict]) -> str:
+    """`text` with each finding's span replaced by "[TYPE]"."""
+    for finding in sorted(findings, key=lambda x: x['start'], reverse=True):
+        s, e = finding['start'], finding['end']
+        if s >= 0 and e <= len(text):
+            text = text[:s] + f"[{finding['type']}]" + text[e:]
+    return text
+
+
+def score_ai_text(text: str, pii_mode: str = "standard") -> Dict:
+    """
+    Perplexity-based AI-authorship score of `text` alone, with its PII
+    masked first as in detect_pdf_ai (findings are not reported; no cache).
+    The model is loaded only for texts long enough to score (60 words).
+    """
+    from pii_detection.router import model_router
+
+    text = text or ""
+    findings = model_router(text, mode=pii_mode).get("detected_pii", []) if text.strip() else []
+    cleaned_text = _clean_text(_mask_findings(text, findings))
+    word_count = len(cleaned_text.split())
+    if word_count < 60:
+        return {
+            "risk_score": 0.0,
+            "label": "UNKNOWN",
+            "verdict": "Too Short for Reliable Analysis",
+            "explanation": f"Text is too short ({word_count} words) for AI authorship detection.",
+            "word_count": word_count,
+        }
+    if not _load_model_safely():
+        return {"error": "Model Load Failure", "risk_score": 0.0, "label": "ERROR", "word_count": word_count}
+    ai_score = _calculate_perplexity_score(cleaned_text)
+    verdict, ai_msg, ai_risk_label = _ai_verdict(ai_score)
+    return {
+        "risk_score": round(ai_score, 3),
+        "label": ai_risk_label,
+        "verdict": verdict,
+        "explanation": ai_msg,
+        "word_count": word_count,
+    }
+
+
+def _file_metadata(metadata: Dict) -> Dict:
+    return {"name": metadata.get("source", "analyzed_text_input"), "metadata_received": metadata}
+
+
+def _from_cache(key: str, metadata: Dict):
+    cache = get_cache()
+    if cache is None or key is None:
+        return None
+    result = cache.get(key)
+    if result is not None:
+        # file_metadata is per-upload and never cached
+        result["file_metadata"] = _file_metadata(metadata)
+        result["cached"] = True
+    return result
+
+
+def _store_in_cache(result: Dict, *keys) -> None:
+    cache = get_cache()
+    if cache is None:
+        return
+    value = {k: v for k, v in result.items() if k != "file_metadata"}
+    for key in keys:
+        if key is not None:
+            cache.set(key, value)
+
+
+def cached_detect_pdf_ai(file_bytes: bytes, metadata: Dict = None, pii_mode: str = "standard"):
+    """
+    Result of an earlier detect_pdf_ai() run on the same file bytes, or None.
+
+    Lets callers skip text extraction entirely on a repeat upload.
+    """
+    return _from_cache(bytes_key(file_bytes, pii_mode), metadata or {})
+
+
+def detect_pdf_ai(text_input: str = "", metadata: Dict = None, image_bytes: bytes = None,
+                  pii_mode: str = "standard", file_bytes: bytes = None, document=None,
+                  on_pii: Callable[[Dict], None] = None,
+                  skip_ai_text: Callable[[Dict], Optional[str]] = None) -> Dict:
+    """
+    Run PII detection and perplexity-based AI-text scoring on a document.
+
+    `pii_mode` is the pii_detection tier ("fast", "standard" or "deep").
+    `file_bytes` are the raw bytes of the upload `text_input` was extracted
+    from; they (or `image_bytes`) key the result cache alongside the text.
+    `document` (analysis.document.Document) replaces all three: its text
+    (or, for images, its OCR output) is extracted once and shared with the
+    other detectors. `on_pii`, if given, receives the PII_DETECTION result
+    as soon as it is known, before perplexity scoring. `skip_ai_text`, if
+    given, gets the pii_detection router result and may return a reason to
+    skip perplexity scoring; the reason is listed under "skipped" and such
+    a result is not cached.
+    """
     logger.info("AI Detection process started.")
     
     if metadata is None:
         metadata = {}
 
     final_result_structure = {
-        "file_metadata": {"name": metadata.get("source", "analyzed_text_input"), "metadata_received": metadata},
+        "file_metadata": _file_metadata(metadata),
         "detectors_executed": [],
         "results": [],
         "risk_label": "UNKNOWN"
     }
 
-    if not _load_model_safely():
-        return {
-            "error": "Model Load Failure",
-            "file_metadata": final_result_structure["file_metadata"],
-            "detectors_executed": [],
-            "results": [{"name": "Error Processing file", "size_bytes": 0, "file_type": "ERROR"}],
-            "risk_label": "ERROR"
-        }
+    if document is not None:
+        file_bytes = document.data
+    is_image = bool(image_bytes) or (document is not None and document.file_type == "image")
+
+    source_bytes = file_bytes or image_bytes
+    file_key = bytes_key(source_bytes, pii_mode) if source_bytes else None
+    cached = _from_cache(file_key, metadata)
+    if cached is not None:
+        return cached
 
     try:
         # Handle image OCR extraction
-        if image_bytes:
+        if is_image:
             try:
-                import tempfile
-                import os
-                from pii_detection.image_extractor import extract_text_from_image
-                
-                # Save bytes to temp file for cv2 to read
-                with tempfile.NamedTemporaryFile(delete=False, suffix='.png') as tmp_file:
-                    tmp_file.write(image_bytes)
-                    tmp_path = tmp_file.name
-                
-                raw_text = extract_text_from_image(tmp_path)
-                os.unlink(tmp_path)  # Clean up temp file
+                if document is not None:
+                    raw_text = document.text
+                    ocr_info = document.ocr_info
+                else:
+                    from pii_detection.image_extractor import extract_text_from_bytes
+
+                    # Decoded and OCR'd in memory (no temp file)
+                    ocr_info = {}
+                    raw_text = extract_text_from_bytes(image_bytes, info=ocr_info)
+                final_result_structure["file_metadata"]["ocr_lang"] = ocr_info.get("ocr_lang")
+                final_result_structure["file_metadata"]["ocr_cached"] = ocr_info.get("ocr_cached", False)
                 
                 if not raw_text or len(raw_text.strip()) < 10:
                     return {
@@ -180,7 +247,15 @@ def detect_pdf_ai(text_input: str = "", metadata: Dict = None, image_bytes: byte
                     "risk_label": "ERROR"
                 }
         else:
-            raw_text = text_input
+            raw_text = document.text if document is not None else text_input
+
+        # Detection offsets below index the document text as extracted (and segmented)
+        raw_text = raw_text or ""
+        text_cache_key = text_key(raw_text, pii_mode, scope="detect_pdf_ai")
+        cached = _from_cache(text_cache_key, metadata)
+        if cached is not None:
+            _store_in_cache(cached, file_key)
+            return cached
         
         # Log only safe metadata — never log raw text or actual PII values
         logger.info(f"Extracted text length: {len(raw_text or '')} characters")
@@ -195,6 +270,7 @@ def detect_pdf_ai(text_input: str = "", metadata: Dict = None, image_bytes: byte
             logger.warning("WARNING: No text extracted from document!")
             
         status_note = ""
+        pii_failed = False
 
         # Use new PII Module - ALWAYS run PII detection via centralized router
         try:
@@ -202,7 +278,8 @@ def detect_pdf_ai(text_input: str = "", metadata: Dict = None, image_bytes: byte
             logger.info(f"Running PII detection via module router on text length: {len(raw_text or '')}")
             
             # Analyze using the full pipeline
-            pii_result = model_router(raw_text or "")
+            segments = document.segments if document is not None and document.file_type == "pdf" else None
+            pii_result = model_router(raw_text or "", mode=pii_mode, segments=segments)
             
             pii_findings = pii_result.get("detected_pii", [])
             risk_label = pii_result.get("risk_level", "LOW") # Returns HIGH/MEDIUM/LOW/NONE
@@ -213,6 +290,7 @@ def detect_pdf_ai(text_input: str = "", metadata: Dict = None, image_bytes: byte
             
             # Privacy tips from module
             privacy_tips = pii_result.get("privacy_tips", [])
+            pii_timings = pii_result.get("timings_ms", {})
             
             logger.info(f"PII Module Result: Risk={risk_label}, Score={risk_score_weighted}, Entities={len(pii_findings)}")
             
@@ -222,25 +300,31 @@ def detect_pdf_ai(text_input: str = "", metadata: Dict = None, image_bytes: byte
             risk_label = "LOW"
             risk_score_weighted = 0.0
             privacy_tips = []
+            pii_timings = {}
+            pii_result = {}
+            pii_failed = True
         
         pii_detected = len(pii_findings) > 0
+        if on_pii is not None and not pii_failed:
+            try:
+                on_pii({
+                    "type": "PII_DETECTION",
+                    "found": pii_detected,
+                    "entities": pii_findings,
+                    "risk_label": risk_label,
+                    "risk_score_weighted": round(risk_score_weighted, 2),
+                    "mode": pii_mode,
+                })
+            except Exception as progress_error:
+                logger.warning(f"PII progress callback failed: {progress_error}")
         
-        # Scrub text for AI analysis (mask PII) using findings
-        # Sort findings by start index descending to avoid offset issues
-        scrubbed_text = raw_text
-        sorted_findings = sorted(pii_findings, key=lambda x: x['start'], reverse=True)
-        
+        # Scrub text for AI analysis (mask PII) using findings, exactly as
+        # score_ai_text does for the ai_text detector
+        scrubbed_text = _mask_findings(raw_text, pii_findings)
+
         pii_only = False
-        pii_chars = 0
         total_length = len(raw_text)
-
-        for finding in sorted_findings:
-            s, e = finding['start'], finding['end']
-            p_type = finding['type']
-            # Simple bounds check
-            if s >= 0 and e <= len(scrubbed_text):
-                scrubbed_text = scrubbed_text[:s] + f"[{p_type}]" + scrubbed_text[e:]
-                pii_chars += (e - s)
+        pii_chars = sum(f['end'] - f['start'] for f in pii_findings if f['start'] >= 0 and f['end'] <= total_length)
 
         if total_length > 0 and (pii_chars / total_length) > 0.6:
             pii_only = True
@@ -253,6 +337,10 @@ def detect_pdf_ai(text_input: str = "", metadata: Dict = None, image_bytes: byte
         ai_msg = ""
         # Default AI risk label
         ai_risk_label = "LOW"
+        skipped = []
+        skip_reason = None
+        if skip_ai_text is not None and not pii_failed and not pii_only and word_count >= 60:
+            skip_reason = skip_ai_text(pii_result)
 
         if pii_only:
             ai_score = 1.0
@@ -260,28 +348,33 @@ def detect_pdf_ai(text_input: str = "", metadata: Dict = None, image_bytes: byte
             ai_msg = "Document contains mostly PII. AI analysis skipped."
             ai_risk_label = "HIGH"
             final_result_structure["detectors_executed"].append("pii_detection")
+            skipped.append({"name": "ai_generated_content", "reason": "text is mostly PII"})
 
         elif word_count < 60:
             verdict = "Too Short for Reliable Analysis"
             ai_msg = f"Insufficient text ({word_count} words) for AI detection."
             ai_risk_label = "UNKNOWN"
             final_result_structure["detectors_executed"].append("short_text_check")
+            skipped.append({"name": "ai_generated_content", "reason": f"too short ({word_count} words)"})
+
+        elif skip_reason:
+            verdict = "AI Analysis Skipped"
+            ai_msg = f"AI analysis skipped: {skip_reason}."
+            ai_risk_label = "UNKNOWN"
+            skipped.append({"name": "ai_generated_content", "reason": skip_reason})
+
+        elif not _load_model_safely():
+            return {
+                "error": "Model Load Failure",
+                "file_metadata": final_result_structure["file_metadata"],
+                "detectors_executed": [],
+                "results": [{"name": "Error Processing file", "size_bytes": 0, "file_type": "ERROR"}],
+                "risk_label": "ERROR"
+            }
 
         else:
             ai_score = _calculate_perplexity_score(cleaned_text)
-
-            if ai_score >= 0.80:
-                verdict = "Likely AI-generated"
-                ai_msg = "Text is highly predictable."
-                ai_risk_label = "HIGH"
-            elif ai_score >= 0.50:
-                verdict = "Suspicious"
-                ai_msg = "Text predictability slightly high."
-                ai_risk_label = "MEDIUM"
-            else:
-                verdict = "Safe"
-                ai_msg = "Text shows sufficient linguistic variance."
-                ai_risk_label = "LOW"
+            verdict, ai_msg, ai_risk_label = _ai_verdict(ai_score)
 
             final_result_structure["detectors_executed"].append("ai_generated_content")
 
@@ -297,6 +390,8 @@ def detect_pdf_ai(text_input: str = "", metadata: Dict = None, image_bytes: byte
                    # Separate AI explanation from overall document verdict
         if word_count < 60:
             ai_explanation = f"Text is too short ({word_count} words) for AI authorship detection."
+        elif skip_reason:
+            ai_explanation = f"Not assessed for AI authorship: {skip_reason}."
         elif ai_risk_label == "HIGH":
             ai_explanation = "High predictability detected. Likely AI-generated text."
         elif ai_risk_label == "MEDIUM":
@@ -324,7 +419,8 @@ def detect_pdf_ai(text_input: str = "", metadata: Dict = None, image_bytes: byte
             "type": "AI_ANALYSIS",
             "score": round(ai_score, 3),
             "label": ai_risk_label,
-            "explanation": ai_explanation
+            "explanation": ai_explanation,
+            "word_count": word_count
         })
 
         # ALWAYS add PII detection result (even if empty)
@@ -339,14 +435,16 @@ def detect_pdf_ai(text_input: str = "", metadata: Dict = None, image_bytes: byte
             "privacy_tips": privacy_tips,
             "risk_score_weighted": round(risk_score_weighted, 2),
             "confidence_score": 0.9 if has_critical else (0.6 if risk_score_weighted >= 6 else 0.0),
-            "risk_label": risk_label
+            "risk_label": risk_label,
+            "mode": pii_mode,
+            "timings_ms": pii_timings
         })
         final_result_structure["detectors_executed"].append("pii_detection")
 
         # Log PII detection results for debugging
         logger.info(f"PII Detection Results: Found {len(pii_findings)} entities, Risk: {risk_label}")
         
-        return {
+        result = {
             "risk_score": final_result_structure["risk_score"],
             "verdict": final_result_structure["verdict"],
             "explanation": final_result_structure["explanation"],
@@ -354,8 +452,15 @@ def detect_pdf_ai(text_input: str = "", metadata: Dict = None, image_bytes: byte
             "detectors_executed": final_result_structure["detectors_executed"],
             "results": final_result_structure["results"],
             "risk_label": final_result_structure["risk_label"],
-            "file_metadata": final_result_structure["file_metadata"]
+            "file_metadata": final_result_structure["file_metadata"],
+            "skipped": skipped,
+            "cached": False
         }
+        # A degraded result (PII step crashed) must not be replayed later,
+        # nor one whose AI analysis the caller chose to skip
+        if not pii_failed and not skip_reason:
+            _store_in_cache(result, text_cache_key, file_key)
+        return result
 
     except Exception as e:
         logger.error(f"Detection failed: {e}")
@@ -1,8 +1,8 @@
-import os
 import json
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
+from analysis.document import Document
 from .pdf_text_detector import detect_pdf_ai
 
 @csrf_exempt
@@ -15,18 +15,11 @@ def detect_ai_content(request):
     try:
         if 'file' in request.FILES:
             file_obj = request.FILES['file']
-            
-            temp_path = f"temp_{file_obj.name}"
-            with open(temp_path, 'wb+') as destination:
-                for chunk in file_obj.chunks():
-                    destination.write(chunk)
-         
-            result = detect_pdf_ai(temp_path)
-            
-            
-            if os.path.exists(temp_path):
-                os.remove(temp_path)
-            
+
+            # Parsed from memory (no temp file); text layer / OCR extracted once
+            with Document.from_upload(file_obj) as document:
+                result = detect_pdf_ai(metadata={"source": file_obj.name}, document=document)
+
             return JsonResponse(result)
 
         
@@ -206,6 +206,11 @@ REST_FRAMEWORK = {
         'anon': '100/day',
         'user': '1000/day',
         'ai_chatbot': '30/hour',   # Dedicated limit for AI chatbot endpoint
+        # Analysis endpoints (analysis/views.py AnalyzeView.throttle_scope)
+        'analyze': '120/hour',
+        'detect_pdf_ai': '120/hour',
+        'detect_pii': '600/hour',   # no model inference: regex/checksum/OCR time
+        'screen_pii': '600/hour',
     }
 }
 
@@ -0,0 +1,139 @@
+"""
+Batch PII detection for bulk jobs (e.g. nightly re-screens of stored
+AnalysisFile.extracted_text).
+
+Texts are cut into chunks and fanned out over a process pool; every worker
+loads the spaCy / Presidio engines once (pool initializer) and parses each
+chunk with a single nlp.pipe() call, handing the Docs to Presidio and NER.
+Results come back in input order. The input iterable is consumed lazily
+and at most `max_pending` chunks are in flight, so memory stays bounded
+however long the input is.
+
+    for result in model_router_batch(texts, mode="standard", workers=4):
+        ...
+"""
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from .pii_engine import MODES, detect_pii
+from .result_cache import get_cache, text_key
+from .router import model_router
+
+DEFAULT_CHUNK_SIZE = 16
+
+
+def default_workers():
+    return int(os.getenv("PII_BATCH_WORKERS", 0)) or os.cpu_count() or 1
+
+
+def _chunks(texts, size):
+    it = iter(texts)
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _docs(texts, mode):
+    if mode == "fast":
+        return [None] * len(texts)
+    from .nlp_provider import parse_many
+    return list(parse_many(texts))
+
+
+def _init_worker(mode):
+    # Load engines once per worker, not once per chunk
+    if mode != "fast":
+        from .presidio_engine import get_analyzer
+        get_analyzer()
+
+
+def _detect_chunk(texts, mode):
+    return [detect_pii(t, mode=mode, doc=d) for t, d in zip(texts, _docs(texts, mode))]
+
+
+def _route_chunk(texts, mode):
+    return [
+        model_router(t, mode=mode, use_cache=False, doc=d)
+        for t, d in zip(texts, _docs(texts, mode))
+    ]
+
+
+def _ordered_map(fn, chunks, mode, workers, max_pending):
+    """Yield fn(chunk, mode) for each chunk, in order, with bounded look-ahead."""
+    if workers <= 1:
+        for chunk in chunks:
+            yield fn(chunk, mode)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(mode,)) as pool:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(pool.submit(fn, chunk, mode))
+            if len(pending) >= max_pending:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def _check_args(mode, workers, chunk_size, max_pending):
+    if mode not in MODES:
+        raise ValueError(f"Unknown detection mode '{mode}'. Expected one of {MODES}")
+    workers = default_workers() if workers is None else workers
+    return workers, max(1, chunk_size), max_pending or 2 * max(1, workers)
+
+
+def detect_pii_batch(texts, mode="standard", workers=None, chunk_size=DEFAULT_CHUNK_SIZE, max_pending=None):
+    """
+    detect_pii() over an iterable of texts; yields one hit list per text,
+    in input order. workers=None uses PII_BATCH_WORKERS or all cores;
+    workers=1 runs in-process (still batching the spaCy parse).
+    """
+    workers, chunk_size, max_pending = _check_args(mode, workers, chunk_size, max_pending)
+    for results in _ordered_map(_detect_chunk, _chunks(texts, chunk_size), mode, workers, max_pending):
+        yield from results
+
+
+def model_router_batch(texts, mode="standard", workers=None, chunk_size=DEFAULT_CHUNK_SIZE,
+                       max_pending=None, use_cache=True):
+    """
+    model_router() over an iterable of texts; yields one masked result per
+    text, in input order. Cache lookups and stores happen in this process,
+    so only misses are sent to the workers.
+    """
+    workers, chunk_size, max_pending = _check_args(mode, workers, chunk_size, max_pending)
+    cache = get_cache() if use_cache else None
+
+    def jobs():
+        for chunk in _chunks(texts, chunk_size):
+            chunk = [t or "" for t in chunk]
+            keys = [text_key(t, mode) for t in chunk] if cache is not None else [None] * len(chunk)
+            cached = [cache.get(k) if k else None for k in keys]
+            misses = [t for t, c in zip(chunk, cached) if c is None]
+            yield keys, cached, misses
+
+    # Route the misses of each chunk through the pool; keep the chunk's
+    # cached results alongside so the output order is preserved
+    job_queue = deque()
+
+    def miss_chunks():
+        for job in jobs():
+            job_queue.append(job)
+            yield job[2]
+
+    for computed in _ordered_map(_route_chunk, miss_chunks(), mode, workers, max_pending):
+        keys, cached, _ = job_queue.popleft()
+        computed = iter(computed)
+        for key, hit in zip(keys, cached):
+            if hit is not None:
+                hit["cached"] = True
+                hit["timings_ms"] = {"total": 0.0}
+                yield hit
+                continue
+            result = next(computed)
+            if cache is not None:
+                cache.set(key, {k: v for k, v in result.items() if k != "timings_ms"})
+            yield result
@@ -0,0 +1,156 @@
+"""
+Batch checksum / structure validation for regex candidates.
+
+Runs once per document, before any keyword scoring, over arrays of candidate
+strings grouped by length:
+- AADHAAR: Verhoeff checksum ("checksum_valid") and the UIDAI rule that
+  numbers never start with 0 or 1 ("structure_valid")
+- CREDIT_DEBIT_CARD: Luhn checksum and a known card-network BIN prefix (dropped)
+- PAN: 4th character must be a valid holder-type code ("structure_valid")
+
+Flags only mark a candidate: detect_pii still keeps an invalid one with
+strong context (an OCR error, a specimen / dummy card).
+"""
+import numpy as np
+
+from .aadhaar_validator import MULTIPLICATION_TABLE, PERMUTATION_TABLE, validate_aadhaar_checksum
+
+_MUL = np.array(MULTIPLICATION_TABLE, dtype=np.uint8)
+_PERM = np.array(PERMUTATION_TABLE, dtype=np.uint8)
+
+# Card network prefixes (IIN/BIN) for 16-digit cards
+CARD_BIN_PREFIXES = {
+    "VISA": ["4"],
+    "MASTERCARD": ["51", "52", "53", "54", "55"] + [str(p) for p in range(2221, 2721)],
+    "RUPAY": ["60", "65", "81", "82", "508", "353", "356"],
+    "DISCOVER": ["6011", "644", "645", "646", "647", "648", "649"],
+    "MAESTRO": ["50", "56", "57", "58", "63", "67"],
+    "JCB": [str(p) for p in range(3528, 3590)],
+    "UNIONPAY": ["62"],
+    "DINERS": ["300", "301", "302", "303", "304", "305", "36", "38", "39"],
+}
+
+# PAN 4th character: P person, C company, H HUF, F firm, A AOP, T trust,
+# B BOI, L local authority, J artificial juridical person, G government
+PAN_HOLDER_TYPES = set("ABCFGHJLPT")
+
+
+def _bin_ranges():
+    """
+    Disjoint, sorted six-digit BIN ranges. Prefixes nest across networks
+    ("60" RuPay holds "6011" Discover, "50" Maestro holds "508" RuPay), so
+    overlapping ranges are merged: bin_known() only looks at the last range
+    starting at or below a BIN.
+    """
+    ranges = []
+    for prefixes in CARD_BIN_PREFIXES.values():
+        for p in prefixes:
+            scale = 10 ** (6 - len(p))
+            ranges.append((int(p) * scale, (int(p) + 1) * scale - 1))
+    merged = []
+    for lo, hi in sorted(ranges):
+        if merged and lo <= merged[-1][1] + 1:
+            merged[-1][1] = max(merged[-1][1], hi)
+        else:
+            merged.append([lo, hi])
+    return np.array(merged, dtype=np.int64)
+
+
+_BIN_RANGES = _bin_ranges()
+_BIN_WEIGHTS = 10 ** np.arange(5, -1, -1, dtype=np.int64)
+
+
+def _digit_matrix(strings, length):
+    """(N, length) uint8 matrix of digit values for equal-length ASCII digit strings."""
+    buf = "".join(strings).encode("ascii")
+    return (np.frombuffer(buf, dtype=np.uint8) - ord("0")).reshape(len(strings), length)
+
+
+def _by_length(values):
+    """Group indices of ASCII digit strings by length; the rest go to `other`."""
+    groups, other = {}, []
+    for i, v in enumerate(values):
+        if v.isascii() and v.isdigit():
+            groups.setdefault(len(v), []).append(i)
+        else:
+            other.append(i)
+    return groups, other
+
+
+def verhoeff_valid(values):
+    """Vectorized Verhoeff check for digit strings (any length)."""
+    out = np.zeros(len(values), dtype=bool)
+    groups, other = _by_length(values)
+    for length, idx in groups.items():
+        digits = _digit_matrix([values[i] for i in idx], length)
+        check = np.zeros(len(idx), dtype=np.uint8)
+        for i in range(length):
+            check = _MUL[check, _PERM[i % 8, digits[:, length - 1 - i]]]
+        out[idx] = check == 0
+    for i in other:
+        out[i] = validate_aadhaar_checksum(values[i]) if len(values[i]) == 12 else False
+    return out
+
+
+def luhn_valid(values):
+    """Vectorized Luhn check for digit strings (any length)."""
+    out = np.zeros(len(values), dtype=bool)
+    groups, _ = _by_length(values)
+    for length, idx in groups.items():
+        digits = _digit_matrix([values[i] for i in idx], length)[:, ::-1].astype(np.int16)
+        doubled = digits[:, 1::2] * 2
+        doubled -= 9 * (doubled > 9)
+        total = digits[:, 0::2].sum(axis=1) + doubled.sum(axis=1)
+        out[idx] = total % 10 == 0
+    return out
+
+
+def bin_known(values):
+    """True where the first six digits fall in a CARD_BIN_PREFIXES range."""
+    out = np.zeros(len(values), dtype=bool)
+    groups, _ = _by_length(values)
+    for length, idx in groups.items():
+        if length < 6:
+            continue
+        bin6 = _digit_matrix([values[i] for i in idx], length)[:, :6].astype(np.int64) @ _BIN_WEIGHTS
+        pos = np.searchsorted(_BIN_RANGES[:, 0], bin6, side="right") - 1
+        ok = pos >= 0
+        out[idx] = ok & (bin6 <= _BIN_RANGES[np.maximum(pos, 0), 1])
+    return out
+
+
+def _digits_only(value):
+    return value.replace(" ", "").replace("-", "")
+
+
+def validate_candidates(candidates):
+    """
+    Drop impossible card numbers; flag Aadhaar and PAN candidates.
+
+    Keeps input order. AADHAAR candidates get "checksum_valid" and
+    "structure_valid" keys, PAN candidates "structure_valid", for the
+    context-override decision in detect_pii.
+    """
+    by_type = {}
+    for i, h in enumerate(candidates):
+        by_type.setdefault(h["type"], []).append(i)
+
+    keep = np.ones(len(candidates), dtype=bool)
+
+    idx = by_type.get("AADHAAR", [])
+    if idx:
+        digits = [_digits_only(candidates[i]["value"]) for i in idx]
+        valid = verhoeff_valid(digits)
+        for i, d, ok in zip(idx, digits, valid):
+            candidates[i]["checksum_valid"] = bool(ok)
+            candidates[i]["structure_valid"] = d[:1] not in ("0", "1")
+
+    idx = by_type.get("CREDIT_DEBIT_CARD", [])
+    if idx:
+        digits = [_digits_only(candidates[i]["value"]) for i in idx]
+        keep[idx] = luhn_valid(digits) & bin_known(digits)
+
+    for i in by_type.get("PAN", []):
+        candidates[i]["structure_valid"] = candidates[i]["value"][3].upper() in PAN_HOLDER_TYPES
+
+    return [h for h, k in zip(candidates, keep) if k]
@@ -1,30 +1,74 @@
 import cv2
-import pytesseract
-from ocr_cleaner import clean_ocr_text
+import numpy as np
 
-# Tesseract path
-pytesseract.pytesseract.tesseract_cmd = r"C:\Program Files\Tesseract-OCR\tesseract.exe"
+# Imported both as part of the pii_detection package (Django) and as a
+# top-level module by the standalone app (file_handler)
+try:
+    from .ocr_cleaner import clean_ocr_text
+    from .ocr_cache import get_ocr_cache, page_key
+    from .ocr_engine import OCR_LANG, choose_lang, image_to_string
+    from .ocr_preprocess import cache_tag, preprocess
+except ImportError:
+    from ocr_cleaner import clean_ocr_text
+    from ocr_cache import get_ocr_cache, page_key
+    from ocr_engine import OCR_LANG, choose_lang, image_to_string
+    from ocr_preprocess import cache_tag, preprocess
+
+IMAGE_PSM = 6
 
-def extract_text_from_image(image_path):
-    image = cv2.imread(image_path)
 
+def extract_text_from_array(image, info=None):
+    """
+    OCR a BGR / grayscale numpy image (e.g. from cv2.imdecode) without
+    touching disk. If `info` is a dict, the chosen OCR language is stored
+    in info["ocr_lang"], whether the OCR cache answered in info["ocr_cached"]
+    and the preprocessing stats (cache misses only) in info["preprocess"].
+    """
     if image is None:
         return ""
 
     # 1️⃣ Convert to grayscale (NO thresholding)
-    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
 
-    # 2️⃣ Mild noise reduction (very important)
-    gray = cv2.GaussianBlur(gray, (3, 3), 0)
+    # Same image seen before (by any worker): reuse its OCR text
+    cache = get_ocr_cache()
+    key = page_key(gray, OCR_LANG, IMAGE_PSM, cache_tag()) if cache else None
+    cached = cache.get(key) if cache else None
+    if info is not None:
+        info["ocr_cached"] = cached is not None
+    if cached is not None:
+        raw_text, lang = cached
+        if info is not None:
+            info["ocr_lang"] = lang
+        return clean_ocr_text(raw_text)
 
-    # 3️⃣ OCR with safe config
-    raw_text = pytesseract.image_to_string(
-        gray,
-        lang="eng+hin",
-        config="--psm 6"
-    )
+    # 2️⃣ Crop / deskew / rescale to OCR-friendly text height, mild noise
+    # reduction (very important)
+    stats = {}
+    gray = preprocess(gray, stats=stats)
+    if info is not None:
+        info["preprocess"] = stats
+
+    # 3️⃣ OCR with safe config (in-process Tesseract pool when available),
+    # in the language(s) the page's script calls for
+    lang = choose_lang(gray)
+    if info is not None:
+        info["ocr_lang"] = lang
+    raw_text = image_to_string(gray, lang=lang, psm=IMAGE_PSM)
+    if cache:
+        cache.set(key, raw_text, lang)
 
     # 4️⃣ Clean OCR output
     cleaned_text = clean_ocr_text(raw_text)
 
     return cleaned_text
+
+
+def extract_text_from_bytes(image_bytes, info=None):
+    """OCR an encoded image (PNG/JPEG bytes) held in memory."""
+    image = cv2.imdecode(np.frombuffer(image_bytes, dtype=np.uint8), cv2.IMREAD_COLOR)
+    return extract_text_from_array(image, info=info)
+
+
+def extract_text_from_image(image_path):
+    return extract_text_from_array(cv2.imread(image_path))
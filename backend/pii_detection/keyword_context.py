@@ -1,6 +1,10 @@
+from bisect import bisect_left
+import re
+
 SENSITIVE_KEYWORDS = {
     "AADHAAR": ["aadhaar", "aadhar", "adhar", "uid", "unique id"],
     "VID": ["vid", "virtual id"],
+    "PAN": ["pan", "permanent account", "income tax"],
     "DOB": ["dob", "date of birth", "birth", "born", "birthday", "age"],
     "EMAIL": ["email", "mail"],
     "PHONE": ["phone", "mobile"],
@@ -44,53 +48,110 @@ NEGATIVE_KEYWORDS = {
 }
 
 
+def _all_keywords():
+    keywords = set(UTILITY_KEYWORDS)
+    for table in (SENSITIVE_KEYWORDS, NEGATIVE_KEYWORDS):
+        for kws in table.values():
+            keywords.update(kws)
+    return keywords
+
+
+_KEYWORDS = _all_keywords()
 
+# One scan finds, at every offset, the longest keyword starting there
+# (alternatives are tried longest first). Any other keyword starting at the
+# same offset is a prefix of it, so each match expands via _SAME_START.
+_KEYWORD_RE = re.compile(
+    "(?=(" + "|".join(re.escape(k) for k in sorted(_KEYWORDS, key=len, reverse=True)) + "))"
+)
+_SAME_START = {
+    k: tuple(p for p in _KEYWORDS if k.startswith(p)) for k in _KEYWORDS
+}
 
-def keyword_score(text, pii_type, start, end, window=40):
-    text = text.lower()
-    context = text[max(0, start-window):min(len(text), end+window)]
 
-    # Check for negative keywords first (transaction IDs, etc.)
-    if pii_type in NEGATIVE_KEYWORDS:
-        for neg_kw in NEGATIVE_KEYWORDS[pii_type]:
-            if neg_kw in context:
+class KeywordContext:
+    """
+    Keyword hit positions for one document, built once.
+
+    keyword_score() used to lowercase the whole document and substring-scan
+    a window per candidate; here every keyword offset is recorded up front
+    and a window check is a bisect over that keyword's sorted offsets.
+    """
+
+    def __init__(self, text):
+        lowered = text.lower()
+        self._length = len(lowered)
+        self._positions = {}
+        for m in _KEYWORD_RE.finditer(lowered):
+            pos = m.start()
+            for kw in _SAME_START[m.group(1)]:
+                self._positions.setdefault(kw, []).append(pos)
+
+    def window(self, start, end, window=40):
+        return max(0, start - window), min(self._length, end + window)
+
+    def contains(self, keyword, lo, hi):
+        """True if `keyword` occurs entirely inside [lo, hi)."""
+        positions = self._positions.get(keyword)
+        if not positions:
+            return False
+        i = bisect_left(positions, lo)
+        return i < len(positions) and positions[i] + len(keyword) <= hi
+
+    def contains_any(self, keywords, lo, hi):
+        return any(self.contains(k, lo, hi) for k in keywords)
+
+    def score(self, pii_type, start, end, window=40):
+        lo, hi = self.window(start, end, window)
+
+        # Check for negative keywords first (transaction IDs, etc.)
+        if pii_type in NEGATIVE_KEYWORDS:
+            if self.contains_any(NEGATIVE_KEYWORDS[pii_type], lo, hi):
                 return -0.5  # Strong negative signal - likely not PII
 
-    # CVV is EXTREMELY strict - must have "cvv" keyword nearby
-    # Too many false positives (room numbers, PIN codes, enrollment numbers, etc.)
-    if pii_type == "CVV":
-        return 0.3 if "cvv" in context else -1.0  # MANDATORY keyword for CVV
-
-    # UTILITY_ACCOUNT is also strict - must have utility-related keywords
-    # Too many false positives (random numbers, codes, etc.)
-    if pii_type == "UTILITY_ACCOUNT":
-        return 0.3 if any(k in context for k in UTILITY_KEYWORDS) else -1.0  # MANDATORY
-
-    # DOB is also strict - must have birth-related keywords
-    # Too many false positives (any date gets detected: bill dates, transaction dates, etc.)
-    if pii_type == "DOB":
-        return 0.3 if any(k in context for k in SENSITIVE_KEYWORDS["DOB"]) else -1.0  # MANDATORY
-
-    # Check for keywords and boost confidence if found
-    if pii_type == "UPI_ID":
-        return 0.3 if any(k in context for k in SENSITIVE_KEYWORDS["UPI_ID"]) else 0.1
-
-    # VID vs Credit Card disambiguation
-    if pii_type == "VID":
-        if any(k in context for k in SENSITIVE_KEYWORDS["VID"]) or any(k in context for k in SENSITIVE_KEYWORDS["AADHAAR"]):
-            return 0.4 # Strong boost
-    
-    if pii_type == "CREDIT_DEBIT_CARD":
-        if any(k in context for k in SENSITIVE_KEYWORDS["AADHAAR"]) or any(k in context for k in SENSITIVE_KEYWORDS["VID"]):
-            return -1.0 # It's a VID, not a credit card!
-
-    for kw in SENSITIVE_KEYWORDS.get(pii_type, []):
-        if kw in context:
+        # CVV is EXTREMELY strict - must have "cvv" keyword nearby
+        # Too many false positives (room numbers, PIN codes, enrollment numbers, etc.)
+        if pii_type == "CVV":
+            return 0.3 if self.contains("cvv", lo, hi) else -1.0  # MANDATORY keyword for CVV
+
+        # UTILITY_ACCOUNT is also strict - must have utility-related keywords
+        # Too many false positives (random numbers, codes, etc.)
+        if pii_type == "UTILITY_ACCOUNT":
+            return 0.3 if self.contains_any(UTILITY_KEYWORDS, lo, hi) else -1.0  # MANDATORY
+
+        # DOB is also strict - must have birth-related keywords
+        # Too many false positives (any date gets detected: bill dates, transaction dates, etc.)
+        if pii_type == "DOB":
+            return 0.3 if self.contains_any(SENSITIVE_KEYWORDS["DOB"], lo, hi) else -1.0  # MANDATORY
+
+        # Check for keywords and boost confidence if found
+        if pii_type == "UPI_ID":
+            return 0.3 if self.contains_any(SENSITIVE_KEYWORDS["UPI_ID"], lo, hi) else 0.1
+
+        # VID vs Credit Card disambiguation
+        if pii_type == "VID":
+            if self.contains_any(SENSITIVE_KEYWORDS["VID"], lo, hi) or self.contains_any(SENSITIVE_KEYWORDS["AADHAAR"], lo, hi):
+                return 0.4 # Strong boost
+
+        if pii_type == "CREDIT_DEBIT_CARD":
+            if self.contains_any(SENSITIVE_KEYWORDS["AADHAAR"], lo, hi) or self.contains_any(SENSITIVE_KEYWORDS["VID"], lo, hi):
+                return -1.0 # It's a VID, not a credit card!
+
+        if self.contains_any(SENSITIVE_KEYWORDS.get(pii_type, []), lo, hi):
             return 0.3
-    
-    if pii_type.startswith("MASKED_"):
-        return 0.2
-    return 0.1
+
+        if pii_type.startswith("MASKED_"):
+            return 0.2
+        return 0.1
 
 
+def keyword_score(text, pii_type, start, end, window=40, context=None):
+    """
+    Context bonus for a candidate at [start, end).
 
+    Pass a KeywordContext built once for `text` when scoring many candidates
+    from the same document.
+    """
+    if context is None:
+        context = KeywordContext(text)
+    return context.score(pii_type, start, end, window)
@@ -1,12 +1,12 @@
-import spacy
-
-nlp = spacy.load("en_core_web_sm")
+from .nlp_provider import parse
 
 ALLOWED_ENTITIES = {"PERSON", "GPE", "ORG"}
 EXCLUDED_TERMS = {"otp", "pin", "code"}
 
-def ner_candidates(text):
-    doc = nlp(text)
+def ner_candidates(text, doc=None):
+    """NER entities; pass `doc` (from nlp_provider.parse) to reuse a parse."""
+    if doc is None:
+        doc = parse(text)
     results = []
 
     for ent in doc.ents:
@@ -17,6 +17,8 @@ def ner_candidates(text):
                 "type": ent.label_,
                 "value": ent.text,
                 "confidence": 0.2,
+                "start": ent.start_char,
+                "end": ent.end_char,
                 "source": "ner"
             })
     return results
@@ -0,0 +1,145 @@
+"""
+Process-wide spaCy pipeline shared by Presidio and ner_detector.
+
+The model is loaded once with the components neither consumer reads removed,
+each document is parsed once, and the resulting Doc is handed to Presidio
+(as precomputed NLP artifacts) and to ner_candidates().
+
+The tagger / attribute_ruler / lemmatizer stay: Presidio's context enhancer
+matches context words against token lemmas, and that boost is what lifts
+PHONE and URL hits over the 0.75 score threshold.
+"""
+import os
+import threading
+import time
+
+SPACY_MODEL = os.getenv("PII_SPACY_MODEL", "en_core_web_lg")
+DISABLED_COMPONENTS = ("parser", "senter")
+LANGUAGE = "en"
+
+_lock = threading.Lock()
+_stats_lock = threading.Lock()  # parse() runs on many request / detector threads
+_nlp = None
+_nlp_engine = None
+_stats = {
+    "model": SPACY_MODEL,
+    "disabled_components": list(DISABLED_COMPONENTS),
+    "load_seconds": None,
+    "rss_delta_mb": None,
+    "documents": 0,
+    "parse_ms_total": 0.0,
+}
+
+
+def _rss_mb():
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    # ru_maxrss is in KB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def get_nlp():
+    global _nlp
+    if _nlp is None:
+        with _lock:
+            if _nlp is None:
+                import spacy
+                rss_before = _rss_mb()
+                t0 = time.perf_counter()
+                _nlp = spacy.load(SPACY_MODEL, exclude=list(DISABLED_COMPONENTS))
+                _stats["load_seconds"] = round(time.perf_counter() - t0, 2)
+                if rss_before is not None:
+                    _stats["rss_delta_mb"] = round(_rss_mb() - rss_before, 1)
+                _stats["pipeline"] = list(_nlp.pipe_names)
+    return _nlp
+
+
+def get_nlp_engine():
+    """Presidio NLP engine backed by the shared pipeline (no second model load)."""
+    global _nlp_engine
+    if _nlp_engine is None:
+        nlp = get_nlp()
+        with _lock:
+            if _nlp_engine is None:
+                from presidio_analyzer.nlp_engine import SpacyNlpEngine
+
+                class SharedSpacyNlpEngine(SpacyNlpEngine):
+                    def load(self):
+                        self.nlp = {LANGUAGE: nlp}
+
+                engine = SharedSpacyNlpEngine(
+                    models=[{"lang_code": LANGUAGE, "model_name": SPACY_MODEL}]
+                )
+                engine.load()
+                _nlp_engine = engine
+    return _nlp_engine
+
+
+def parse(text):
+    """Parse `text` once with the shared pipeline."""
+    nlp = get_nlp()
+    t0 = time.perf_counter()
+    doc = nlp(text)
+    elapsed = (time.perf_counter() - t0) * 1000
+    with _stats_lock:
+        _stats["documents"] += 1
+        _stats["parse_ms_total"] += elapsed
+    return doc
+
+
+def parse_many(texts, batch_size=32):
+    """Parse an iterable of texts with nlp.pipe; yields Docs in input order."""
+    nlp = get_nlp()
+    t0 = time.perf_counter()
+    for doc in nlp.pipe(texts, batch_size=batch_size):
+        with _stats_lock:
+            _stats["documents"] += 1
+        yield doc
+    with _stats_lock:
+        _stats["parse_ms_total"] += (time.perf_counter() - t0) * 1000
+
+
+def nlp_artifacts(doc):
+    """
+    Presidio NlpArtifacts for a parsed Doc without re-parsing, built through
+    the public constructor the way SpacyNlpEngine does it: model labels
+    mapped to Presidio entities, ignored labels dropped, default scores.
+    The entities are new Spans, so the Doc keeps spaCy's labels for
+    ner_candidates().
+    """
+    from presidio_analyzer.nlp_engine import NlpArtifacts
+    from spacy.tokens import Span
+
+    engine = get_nlp_engine()
+    config = engine.ner_model_configuration
+    entities, scores = [], []
+    for ent in doc.ents:
+        label = config.model_to_presidio_entity_mapping.get(ent.label_, ent.label_)
+        if ent.label_ in config.labels_to_ignore or label in config.labels_to_ignore:
+            continue
+        score = config.default_score
+        if label in config.low_score_entity_names:
+            score *= config.low_confidence_score_multiplier
+        entities.append(Span(doc, ent.start, ent.end, label=label))
+        scores.append(score)
+    return NlpArtifacts(
+        entities=entities,
+        tokens=doc,
+        tokens_indices=[token.idx for token in doc],
+        lemmas=[token.lemma_ for token in doc],
+        nlp_engine=engine,
+        language=LANGUAGE,
+        scores=scores,
+    )
+
+
+def nlp_stats():
+    """Load cost, memory footprint and average per-document parse latency."""
+    with _stats_lock:
+        stats = dict(_stats)
+    docs = stats["documents"]
+    stats["parse_ms_avg"] = round(stats["parse_ms_total"] / docs, 2) if docs else None
+    stats["parse_ms_total"] = round(stats["parse_ms_total"], 2)
+    return stats
@@ -0,0 +1,293 @@
+"""
+Persistent cache of OCR output, keyed by page pixels.
+
+The same scans (standard Aadhaar layouts, the monthly bill re-uploaded)
+come back again and again, and OCR is by far the most expensive step of
+extraction. Keys are SHA-256 digests of the page's pixel buffer (shape,
+dtype and bytes) plus the OCR configuration: requested language, page
+segmentation mode, preprocessing version and OCR_CACHE_VERSION. Values are
+the raw OCR text, zlib-compressed, and the language actually used.
+
+The store is one SQLite file (WAL mode), so every worker process and every
+pdf_extractor OCR worker shares it. It is bounded by size: when the
+compressed payload exceeds the budget, least recently used pages are
+deleted down to 90% of it. Each process keeps a running total of the
+payload (re-read from the file every RESYNC_WRITES writes, since other
+processes write too) instead of summing the table on every insert.
+
+Unlike result_cache, which holds masked results only, the pages are raw
+OCR text with full Aadhaar / PAN numbers in it. They are kept for at most
+PII_OCR_CACHE_TTL seconds from the OCR run (a hit doesn't extend that);
+expired pages are never served and are purged whenever a process opens
+the file. On POSIX the file is created 0600 (the -wal / -shm files
+inherit that) and, at the default path, in a directory only this user can
+enter (0700); looser modes are tightened and a file owned by another user
+is refused. Windows has no uids: the default directory sits in the user's
+own temp directory and is named after the account instead.
+
+Configured from the environment, like result_cache:
+    PII_OCR_CACHE_PATH        SQLite file (default <tmp>/pii_ocr_cache-<user>/ocr.sqlite3)
+    PII_OCR_CACHE_MAX_BYTES   payload budget in bytes (default 256 MiB, 0 disables)
+    PII_OCR_CACHE_TTL         seconds a page is kept (default 86400)
+"""
+import getpass
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+import tempfile
+import threading
+import time
+import zlib
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Bump when a Tesseract / traineddata upgrade should invalidate old pages
+OCR_CACHE_VERSION = "ocr-1"
+
+
+
+def _user_tag():
+    """uid on POSIX; the account name where there are no uids (Windows)."""
+    if hasattr(os, "getuid"):
+        return str(os.getuid())
+    try:
+        user = getpass.getuser()
+    except Exception:
+        user = "default"
+    return re.sub(r"[^\w.-]", "_", user)
+
+
+DEFAULT_PATH = os.path.join(tempfile.gettempdir(), f"pii_ocr_cache-{_user_tag()}", "ocr.sqlite3")
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+DEFAULT_TTL = 24 * 60 * 60
+TRIM_TO = 0.9
+RESYNC_WRITES = 100
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS ocr_pages (
+    key TEXT PRIMARY KEY,
+    lang TEXT,
+    text BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    used_at REAL NOT NULL,
+    created_at REAL NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS ocr_pages_used_at ON ocr_pages (used_at);
+"""
+
+
+def page_key(pixels, lang, psm, preprocess="none"):
+    """Key for one page image (numpy array) and the OCR config applied to it."""
+    pixels = np.ascontiguousarray(pixels)
+    h = hashlib.sha256()
+    for part in (OCR_CACHE_VERSION, lang, psm, preprocess, pixels.shape, pixels.dtype.str):
+        h.update(str(part).encode("utf-8"))
+        h.update(b"\0")
+    h.update(memoryview(pixels).cast("B"))
+    return h.hexdigest()
+
+
+class OcrCache:
+    """
+    Size-bounded SQLite store of OCR results, safe across threads and
+    processes (one connection per thread, per process).
+    """
+
+    def __init__(self, path=DEFAULT_PATH, max_bytes=DEFAULT_MAX_BYTES, ttl=DEFAULT_TTL):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.errors = 0
+        self.expired = 0
+        self._total = None  # payload bytes as last seen by this process
+        self._writes = 0
+
+    def _secure_path(self):
+        """
+        Create the file 0600 (and the default directory 0700); refuse a
+        file owned by another user, tighten looser modes. Only the file is
+        created on Windows, where modes and uids don't apply.
+        """
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+        os.close(os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600))
+        if not hasattr(os, "getuid"):
+            return
+        checks = [(self.path, 0o600)]
+        if os.path.abspath(self.path) == os.path.abspath(DEFAULT_PATH):
+            # A configured path may sit in a shared directory: only ours is tightened
+            checks.append((directory, 0o700))
+        for path, mode in checks:
+            st = os.stat(path)
+            if st.st_uid != os.getuid():
+                raise PermissionError(f"OCR cache {path} is owned by another user")
+            if st.st_mode & 0o077:
+                os.chmod(path, mode)
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            self._secure_path()
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            if "created_at" not in {row[1] for row in conn.execute("PRAGMA table_info(ocr_pages)")}:
+                # File from before the TTL: its pages count as expired
+                conn.execute("ALTER TABLE ocr_pages ADD COLUMN created_at REAL NOT NULL DEFAULT 0")
+            conn.execute("CREATE INDEX IF NOT EXISTS ocr_pages_created_at ON ocr_pages (created_at)")
+            self._purge_expired(conn)
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def _purge_expired(self, conn):
+        purged = conn.execute("DELETE FROM ocr_pages WHERE created_at < ?", (time.time() - self.ttl,)).rowcount
+        if purged:
+            with self._lock:
+                self.expired += purged
+                self._total = None
+
+    def _count(self, counter, n=1):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + n)
+
+    def get(self, key):
+        """(text, lang) for a cached page, or None."""
+        try:
+            conn = self._conn()
+            row = conn.execute(
+                "SELECT text, lang FROM ocr_pages WHERE key = ? AND created_at >= ?",
+                (key, time.time() - self.ttl),
+            ).fetchone()
+            if row is not None:
+                conn.execute("UPDATE ocr_pages SET used_at = ? WHERE key = ?", (time.time(), key))
+        except (sqlite3.Error, OSError) as e:
+            logger.warning(f"OCR cache read failed: {e}")
+            self._count("errors")
+            return None
+        if row is None:
+            self._count("misses")
+            return None
+        self._count("hits")
+        return zlib.decompress(row[0]).decode("utf-8"), row[1]
+
+    def set(self, key, text, lang=None):
+        blob = zlib.compress((text or "").encode("utf-8"))
+        now = time.time()
+        try:
+            conn = self._conn()
+            conn.execute(
+                "INSERT OR REPLACE INTO ocr_pages (key, lang, text, size, used_at, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, lang, blob, len(blob), now, now),
+            )
+            with self._lock:
+                self._writes += 1
+                if self._total is None or self._writes % RESYNC_WRITES == 0:
+                    self._total = None
+                else:
+                    self._total += len(blob)
+                total = self._total
+            if total is None:
+                total = self._sync_total(conn)
+            if total > self.max_bytes:
+                self._trim(conn)
+        except (sqlite3.Error, OSError) as e:
+            logger.warning(f"OCR cache write failed: {e}")
+            self._count("errors")
+
+    def _sync_total(self, conn):
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM ocr_pages").fetchone()[0]
+        with self._lock:
+            self._total = total
+        return total
+
+    def _trim(self, conn):
+        target = int(self.max_bytes * TRIM_TO)
+        evicted = 0
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Expired pages go first; then the exact figure under the write
+            # lock, since other processes add pages too
+            expired = conn.execute("DELETE FROM ocr_pages WHERE created_at < ?", (time.time() - self.ttl,)).rowcount
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM ocr_pages").fetchone()[0]
+            if total > self.max_bytes:
+                for key, size in conn.execute("SELECT key, size FROM ocr_pages ORDER BY used_at"):
+                    if total <= target:
+                        break
+                    conn.execute("DELETE FROM ocr_pages WHERE key = ?", (key,))
+                    total -= size
+                    evicted += 1
+            conn.execute("COMMIT")
+        except sqlite3.Error:
+            conn.execute("ROLLBACK")
+            raise
+        with self._lock:
+            self._total = total
+            self.expired += expired
+        self._count("evictions", evicted)
+
+    def clear(self):
+        self._conn().execute("DELETE FROM ocr_pages")
+        with self._lock:
+            self._total = 0
+
+    def stats(self):
+        try:
+            entries, size = self._conn().execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM ocr_pages"
+            ).fetchone()
+        except (sqlite3.Error, OSError):
+            entries = size = None
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "version": OCR_CACHE_VERSION,
+                "path": self.path,
+                "entries": entries,
+                "bytes": size,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expired": self.expired,
+                "errors": self.errors,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_ocr_cache():
+    """Process-wide OCR cache, or None when PII_OCR_CACHE_MAX_BYTES is 0."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                max_bytes = int(os.environ.get("PII_OCR_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES))
+                _cache = OcrCache(
+                    path=os.environ.get("PII_OCR_CACHE_PATH") or DEFAULT_PATH,
+                    max_bytes=max_bytes,
+                    ttl=float(os.environ.get("PII_OCR_CACHE_TTL", DEFAULT_TTL)),
+                ) if max_bytes > 0 else False
+    return _cache or None
+
+
+def ocr_cache_stats():
+    """Hit/miss counters for monitoring; {"enabled": False} when disabled."""
+    cache = get_ocr_cache()
+    if cache is None:
+        return {"enabled": False}
+    return dict(cache.stats(), enabled=True)
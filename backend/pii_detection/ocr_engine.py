@@ -0,0 +1,289 @@
+"""
+OCR backend shared by image_extractor and pdf_extractor.
+
+Preferred backend is in-process Tesseract through tesserocr: a pool of
+TessBaseAPI handles per (languages, psm), each initialised once (loading
+eng+hin traineddata is the expensive part) and reused across calls and
+threads. Images are handed over as raw pixel buffers, so no temp files.
+
+Without tesserocr, pytesseract is used; it runs a tesseract subprocess per
+call and reloads the traineddata every time.
+
+Languages are chosen per page (choose_lang): Tesseract OSD on a few bands
+of a downscaled copy identifies the script, so English-only pages skip the
+Devanagari model while mixed pages (an Aadhaar card) keep both.
+
+    PII_OCR_BACKEND     "auto" (default), "tesserocr" or "pytesseract"
+    PII_OCR_POOL_SIZE   handles per language set (default min(4, cores))
+    PII_OCR_LANG        "auto" (default, per-page choice) or a fixed lang
+    TESSDATA_PREFIX     tessdata directory for tesserocr
+"""
+import logging
+import os
+import queue
+import threading
+from contextlib import contextmanager
+
+import cv2
+import numpy as np
+import pytesseract
+
+try:
+    import tesserocr
+except ImportError:  # optional: pip install tesserocr
+    tesserocr = None
+
+logger = logging.getLogger(__name__)
+
+# Tesseract path (Windows-safe)
+TESSERACT_CMD = r"C:\Program Files\Tesseract-OCR\tesseract.exe"
+pytesseract.pytesseract.tesseract_cmd = TESSERACT_CMD
+
+TESSDATA_PREFIX = os.getenv("TESSDATA_PREFIX") or os.path.join(os.path.dirname(TESSERACT_CMD), "tessdata")
+OCR_BACKEND = os.getenv("PII_OCR_BACKEND", "auto")
+POOL_SIZE = int(os.getenv("PII_OCR_POOL_SIZE", 0)) or min(4, os.cpu_count() or 1)
+
+DEFAULT_LANG = "eng+hin"
+DEFAULT_PSM = 6
+
+OCR_LANG = os.getenv("PII_OCR_LANG", "auto")
+OSD_PSM = 0                # OSD only, no recognition
+OSD_MAX_SIDE = 1800        # ~150 dpi for an A4 page rendered at 300 dpi
+OSD_BAND = 1 / 8           # OSD sees bands of this page height...
+OSD_BANDS = 3              # ...the inkiest this many, not overlapping
+OSD_MIN_CONF = 2.0         # less confident script guesses keep DEFAULT_LANG
+SCRIPT_LANGS = {"Latin": "eng", "Devanagari": "hin"}
+
+
+class TesseractPool:
+    """
+    Thread-safe pool of tesserocr handles for one (lang, psm).
+
+    Handles are created on demand up to `size`; callers beyond that wait
+    for a handle to be returned.
+    """
+
+    def __init__(self, lang, psm, size=POOL_SIZE):
+        self.lang = lang
+        self.psm = psm
+        self.size = size
+        self._idle = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    def _new_handle(self):
+        path = TESSDATA_PREFIX if os.path.isdir(TESSDATA_PREFIX) else None
+        kwargs = {"path": path} if path else {}
+        return tesserocr.PyTessBaseAPI(lang=self.lang, psm=self.psm, **kwargs)
+
+    @contextmanager
+    def handle(self):
+        try:
+            api = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                create = self._created < self.size
+                if create:
+                    self._created += 1
+            if create:
+                try:
+                    api = self._new_handle()
+                except Exception:
+                    with self._lock:
+                        self._created -= 1
+                    raise
+            else:
+                api = self._idle.get()
+        try:
+            yield api
+        finally:
+            api.Clear()
+            self._idle.put(api)
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().End()
+            except queue.Empty:
+                return
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+_backends = {}
+_available = None
+
+
+def get_pool(lang=DEFAULT_LANG, psm=DEFAULT_PSM):
+    key = (lang, psm)
+    if key not in _pools:
+        with _pools_lock:
+            if key not in _pools:
+                _pools[key] = TesseractPool(lang, psm)
+    return _pools[key]
+
+
+def _installed_languages():
+    """Languages tesserocr has traineddata for, or None when it can't run."""
+    if tesserocr is None:
+        return None
+    path = TESSDATA_PREFIX if os.path.isdir(TESSDATA_PREFIX) else ""
+    try:
+        _, installed = tesserocr.get_languages(path) if path else tesserocr.get_languages()
+    except Exception as e:
+        logger.warning(f"tesserocr unavailable ({e}); falling back to pytesseract")
+        return None
+    return set(installed)
+
+
+def _tesserocr_usable(lang):
+    installed = _installed_languages()
+    if installed is None:
+        return False
+    missing = set(lang.split("+")) - installed
+    if missing:
+        logger.warning(f"tesserocr has no traineddata for {sorted(missing)}; using pytesseract for '{lang}'")
+    return not missing
+
+
+def get_backend(lang=DEFAULT_LANG):
+    """"tesserocr" or "pytesseract" for a language set, resolved once per process."""
+    if lang not in _backends:
+        if OCR_BACKEND in ("tesserocr", "pytesseract"):
+            backend = OCR_BACKEND
+        else:
+            backend = "tesserocr" if _tesserocr_usable(lang) else "pytesseract"
+        _backends[lang] = backend
+        logger.info(f"OCR backend for '{lang}': {backend}")
+    return _backends[lang]
+
+
+def ocr_available():
+    """
+    True if some OCR backend can run: tesserocr with traineddata for at
+    least one of the page languages, or the tesseract binary. Importing
+    tesserocr proves neither, so it is probed once per process.
+    """
+    global _available
+    if _available is None:
+        usable = False
+        if OCR_BACKEND != "pytesseract":
+            installed = _installed_languages()
+            usable = bool(installed and installed.intersection(
+                (DEFAULT_LANG if OCR_LANG == "auto" else OCR_LANG).split("+")))
+        _available = usable or os.path.exists(pytesseract.pytesseract.tesseract_cmd)
+    return _available
+
+
+def _as_pixels(image):
+    """uint8 C-contiguous pixel array (H, W) or (H, W, C) from numpy / PIL input."""
+    if not isinstance(image, np.ndarray):
+        if getattr(image, "mode", None) not in ("L", "RGB", "RGBA"):
+            image = image.convert("RGB")
+        image = np.asarray(image)
+    if image.dtype == bool:
+        image = image.astype(np.uint8) * 255
+    elif image.dtype != np.uint8:
+        image = np.clip(image, 0, 255).astype(np.uint8)
+    return np.ascontiguousarray(image)
+
+
+def image_to_string(image, lang=DEFAULT_LANG, psm=DEFAULT_PSM, timeout=0):
+    """
+    OCR a numpy array (grayscale, RGB or BGR-as-loaded-by-cv2 is fine for
+    Tesseract's binarisation) or a PIL image.
+
+    `timeout` (seconds, 0 = none) bounds recognition on either backend;
+    running out raises RuntimeError, as pytesseract does.
+    """
+    pixels = _as_pixels(image)
+    if get_backend(lang) == "tesserocr":
+        height, width = pixels.shape[:2]
+        channels = 1 if pixels.ndim == 2 else pixels.shape[2]
+        with get_pool(lang, psm).handle() as api:
+            api.SetImageBytes(pixels.tobytes(), width, height, channels, width * channels)
+            if timeout and not api.Recognize(timeout=int(timeout * 1000)):
+                raise RuntimeError(f"Tesseract recognition failed or exceeded {timeout:g}s")
+            return api.GetUTF8Text()
+    return pytesseract.image_to_string(pixels, lang=lang, config=f"--psm {psm}", timeout=timeout)
+
+
+def _osd_samples(pixels):
+    """
+    Downscaled grayscale bands of the page with the most ink, inkiest
+    first and not overlapping (OSD cost grows with text, so not the whole page).
+    """
+    if pixels.ndim == 3:
+        pixels = cv2.cvtColor(pixels, cv2.COLOR_RGB2GRAY if pixels.shape[2] == 3 else cv2.COLOR_RGBA2GRAY)
+    height, width = pixels.shape
+    scale = OSD_MAX_SIDE / max(height, width)
+    if scale < 1:
+        pixels = cv2.resize(pixels, (int(width * scale), int(height * scale)), interpolation=cv2.INTER_AREA)
+        height, width = pixels.shape
+    band = max(64, int(height * OSD_BAND))
+    if band >= height:
+        return [pixels]
+    ink = np.concatenate(([0], np.cumsum((pixels < 128).sum(axis=1))))
+    window = (ink[band:] - ink[:-band]).astype(np.int64)
+    samples = []
+    while len(samples) < OSD_BANDS:
+        top = int(np.argmax(window))
+        if window[top] <= 0:
+            break
+        samples.append(np.ascontiguousarray(pixels[top:top + band]))
+        window[max(0, top - band + 1):top + band] = -1
+    return samples or [pixels[:band]]
+
+
+def _osd(pixels):
+    height, width = pixels.shape
+    try:
+        if get_backend("osd") == "tesserocr":
+            with get_pool("osd", OSD_PSM).handle() as api:
+                api.SetImageBytes(pixels.tobytes(), width, height, 1, width)
+                osd = api.DetectOrientationScript()
+            if not osd:
+                return None, 0.0
+            return osd["script_name"], float(osd["script_conf"])
+        osd = pytesseract.image_to_osd(pixels, config=f"--psm {OSD_PSM}", output_type=pytesseract.Output.DICT)
+        return osd["script"], float(osd["script_conf"])
+    except Exception as e:
+        logger.debug(f"OSD failed: {e}")
+        return None, 0.0
+
+
+def detect_scripts(image):
+    """
+    (script_name, confidence) from Tesseract OSD for each sampled band of
+    the page, inkiest first and computed as iterated; (None, 0.0) for a
+    band where OSD finds too little text.
+    """
+    for pixels in _osd_samples(_as_pixels(image)):
+        yield _osd(pixels)
+
+
+def choose_lang(image, lang=None):
+    """
+    Tesseract language string for one page.
+
+    A fixed `lang` (or PII_OCR_LANG) is returned as is. Otherwise OSD runs
+    on the page's inkiest bands: "eng" if they are all clearly Latin,
+    "hin" if all clearly Devanagari. Bands in different scripts (a
+    bilingual card) or any uncertain band keep DEFAULT_LANG ("eng+hin"),
+    and stop the sampling.
+    """
+    lang = lang or OCR_LANG
+    if lang != "auto":
+        return lang
+    seen = []
+    chosen = None
+    for script, conf in detect_scripts(image):
+        seen.append(f"{script}:{conf:.2f}")
+        band_lang = SCRIPT_LANGS.get(script) if conf >= OSD_MIN_CONF else None
+        if band_lang is None or chosen not in (None, band_lang):
+            chosen = None
+            break
+        chosen = band_lang
+    chosen = chosen or DEFAULT_LANG
+    logger.debug(f"OSD scripts={seen} -> lang={chosen}")
+    return chosen
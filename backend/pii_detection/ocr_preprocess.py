@@ -0,0 +1,165 @@
+"""
+Image preprocessing before OCR.
+
+Phone photos of PAN / Aadhaar cards arrive at 12+ megapixels with the
+document skewed somewhere in the frame. Tesseract's cost grows with pixel
+count while its accuracy peaks around a 20-30 px text height, so:
+
+1. crop to the document (largest quadrilateral contour, perspective-warped)
+2. deskew (minimum-area rectangle of the ink)
+3. rescale so the median glyph height hits TARGET_TEXT_HEIGHT (text that
+   is already readable, MIN_TEXT_HEIGHT..TARGET_TEXT_HEIGHT, is kept)
+4. mild 3x3 blur, then optionally binarize (adaptive Gaussian threshold,
+   PII_OCR_BINARIZE=1)
+
+Every step is skipped when it does not apply (no document edge found,
+skew below MIN_SKEW_DEG, no measurable text), so clean scans pass through
+nearly untouched.
+"""
+import os
+import time
+
+import cv2
+import numpy as np
+
+TARGET_TEXT_HEIGHT = 28        # px, glyph bounding-box height after rescale
+MIN_TEXT_HEIGHT = 14           # smaller text is upscaled; anything between is left alone
+MIN_SCALE, MAX_SCALE = 0.2, 2.0
+MIN_DOC_AREA = 0.2             # document contour must cover this much of the frame
+MIN_SKEW_DEG, MAX_SKEW_DEG = 0.5, 15.0
+BINARIZE = os.getenv("PII_OCR_BINARIZE", "0") == "1"
+# Bump when the pipeline's output changes; part of the OCR cache key
+PREPROCESS_VERSION = "pre-1"
+
+
+def cache_tag():
+    """Identifies the active pipeline configuration in OCR cache keys."""
+    return PREPROCESS_VERSION + ("+bin" if BINARIZE else "")
+
+
+def _ink(gray):
+    """Binary mask (uint8 0/255) of dark-on-light ink via Otsu."""
+    _, mask = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+    return mask
+
+
+def _order_corners(pts):
+    s, d = pts.sum(axis=1), np.diff(pts, axis=1).ravel()
+    return np.array([pts[np.argmin(s)], pts[np.argmin(d)], pts[np.argmax(s)], pts[np.argmax(d)]], dtype=np.float32)
+
+
+def crop_document(gray):
+    """
+    Perspective-crop to the largest 4-corner contour covering at least
+    MIN_DOC_AREA of the frame. Returns (image, cropped?).
+    """
+    h, w = gray.shape
+    # Edges are found on a small copy; corners are scaled back up
+    scale = min(1.0, 1000 / max(h, w))
+    small = cv2.resize(gray, (int(w * scale), int(h * scale)), interpolation=cv2.INTER_AREA) if scale < 1 else gray
+    edges = cv2.Canny(cv2.GaussianBlur(small, (5, 5), 0), 50, 150)
+    edges = cv2.dilate(edges, np.ones((3, 3), np.uint8))
+    contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+
+    min_area = MIN_DOC_AREA * small.shape[0] * small.shape[1]
+    for contour in sorted(contours, key=cv2.contourArea, reverse=True)[:5]:
+        if cv2.contourArea(contour) < min_area:
+            break
+        approx = cv2.approxPolyDP(contour, 0.02 * cv2.arcLength(contour, True), True)
+        if len(approx) != 4:
+            continue
+        src = _order_corners(approx.reshape(4, 2).astype(np.float32) / scale)
+        width = int(max(np.linalg.norm(src[1] - src[0]), np.linalg.norm(src[2] - src[3])))
+        height = int(max(np.linalg.norm(src[3] - src[0]), np.linalg.norm(src[2] - src[1])))
+        if width < 32 or height < 32:
+            continue
+        dst = np.array([[0, 0], [width - 1, 0], [width - 1, height - 1], [0, height - 1]], dtype=np.float32)
+        warp = cv2.getPerspectiveTransform(src, dst)
+        return cv2.warpPerspective(gray, warp, (width, height), flags=cv2.INTER_AREA, borderValue=255), True
+    return gray, False
+
+
+def deskew(gray):
+    """Rotate text lines to horizontal. Returns (image, angle in degrees applied)."""
+    h, w = gray.shape
+    # The angle is measured on a small copy and applied to the full image
+    scale = min(1.0, 1000 / max(h, w))
+    small = cv2.resize(gray, (int(w * scale), int(h * scale)), interpolation=cv2.INTER_AREA) if scale < 1 else gray
+    # Merge glyphs into line blobs so the rectangle follows text lines
+    lines = cv2.morphologyEx(_ink(small), cv2.MORPH_CLOSE, cv2.getStructuringElement(cv2.MORPH_RECT, (15, 1)))
+    coords = cv2.findNonZero(lines)
+    if coords is None or len(coords) < 100:
+        return gray, 0.0
+    (_, _), (rw, rh), angle = cv2.minAreaRect(coords)
+    # OpenCV >= 4.5 reports angles in [0, 90); map to the small correction
+    if rw < rh:
+        angle -= 90
+    if angle < -45:
+        angle += 90
+    elif angle > 45:
+        angle -= 90
+    if not MIN_SKEW_DEG <= abs(angle) <= MAX_SKEW_DEG:
+        return gray, 0.0
+    rotation = cv2.getRotationMatrix2D((w / 2, h / 2), angle, 1.0)
+    return cv2.warpAffine(gray, rotation, (w, h), flags=cv2.INTER_LINEAR, borderValue=255), round(angle, 2)
+
+
+def estimate_text_height(gray):
+    """Median height of glyph-sized connected components, or None."""
+    n, _, stats, _ = cv2.connectedComponentsWithStats(_ink(gray), connectivity=8)
+    if n <= 1:
+        return None
+    heights, widths, areas = stats[1:, cv2.CC_STAT_HEIGHT], stats[1:, cv2.CC_STAT_WIDTH], stats[1:, cv2.CC_STAT_AREA]
+    h = gray.shape[0]
+    # Glyphs: not specks, not rules/borders, roughly letter-shaped
+    glyphs = heights[(heights >= 6) & (heights <= h * 0.2) & (areas >= 12) & (widths <= heights * 4)]
+    if len(glyphs) < 10:
+        return None
+    return float(np.median(glyphs))
+
+
+def rescale_to_text_height(gray, target=TARGET_TEXT_HEIGHT):
+    """Resize so glyphs are ~`target` px tall. Returns (image, scale applied)."""
+    text_height = estimate_text_height(gray)
+    if not text_height or MIN_TEXT_HEIGHT <= text_height <= target:
+        return gray, 1.0
+    scale = min(MAX_SCALE, max(MIN_SCALE, target / text_height))
+    if 0.9 <= scale <= 1.1:
+        return gray, 1.0
+    h, w = gray.shape
+    interpolation = cv2.INTER_AREA if scale < 1 else cv2.INTER_CUBIC
+    return cv2.resize(gray, (max(1, int(w * scale)), max(1, int(h * scale))), interpolation=interpolation), round(scale, 3)
+
+
+def binarize(gray):
+    return cv2.adaptiveThreshold(gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 31, 15)
+
+
+def preprocess(gray, binarize_output=None, stats=None):
+    """
+    Run the pipeline on a grayscale image.
+
+    If `stats` is a dict it receives input/output pixel counts, whether the
+    document was cropped, the deskew angle, the rescale factor and the time
+    spent.
+    """
+    t0 = time.perf_counter()
+    pixels_in = gray.shape[0] * gray.shape[1]
+
+    gray, cropped = crop_document(gray)
+    gray, angle = deskew(gray)
+    gray, scale = rescale_to_text_height(gray)
+    gray = cv2.GaussianBlur(gray, (3, 3), 0)
+    if BINARIZE if binarize_output is None else binarize_output:
+        gray = binarize(gray)
+
+    if stats is not None:
+        stats.update(
+            pixels_in=pixels_in,
+            pixels_out=gray.shape[0] * gray.shape[1],
+            cropped=cropped,
+            deskew_deg=angle,
+            scale=scale,
+            ms=round((time.perf_counter() - t0) * 1000, 1),
+        )
+    return gray
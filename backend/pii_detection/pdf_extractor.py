@@ -1,96 +1,553 @@
+import logging
+import multiprocessing
+import tempfile
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FuturesTimeout
+from contextlib import contextmanager
+from io import BytesIO
 import pdfplumber
-from pdf2image import convert_from_path
-import pytesseract
+import pypdfium2 as pdfium
+import pypdfium2.raw as pdfium_c
+from pypdf import PdfReader
 import os
 
-# Explicit paths (Windows-safe)
-# Ensure Tesseract is installed at this location
-pytesseract.pytesseract.tesseract_cmd = r"C:\Program Files\Tesseract-OCR\tesseract.exe"
+# Imported both as pii_detection.pdf_extractor and as a top-level module
+# by the standalone app (file_handler)
+try:
+    from . import ocr_cache, ocr_engine, pdf_structure
+except ImportError:
+    import ocr_cache
+    import ocr_engine
+    import pdf_structure
 
-# Ensure Poppler is extracted to C:\poppler
-# Common structure: C:\poppler\Library\bin OR C:\poppler\bin
-POPPLER_PATH = r"C:\poppler\Library\bin" 
-if not os.path.exists(POPPLER_PATH):
-    POPPLER_PATH = r"C:\poppler\bin" # Fallback for different versions
+logger = logging.getLogger(__name__)
+
+# Tesseract: see ocr_engine.TESSERACT_CMD. Pages are rendered for OCR
+# in-process by pypdfium2 (no Poppler binary, no subprocess per page).
+
+# Text layer backend: "pypdfium2" (default, fastest), "pdfplumber" or "pypdf".
+# With pypdfium2, layout-sensitive pages (see _layout_sensitive) are
+# re-extracted with pdfplumber.
+TEXT_BACKEND = os.getenv("PII_PDF_BACKEND", "pypdfium2")
+LAYOUT_MIN_CHARS = 200        # pages shorter than this are never re-extracted
+LAYOUT_MIN_SPACE_RATIO = 0.05  # fewer spaces than this = words glued together
+LAYOUT_MIN_LINE_CHARS = 8     # shorter mean line = text scattered glyph by glyph
+LAYOUT_MIN_LINES = 20
+
+OCR_DPI = 300  # Higher DPI for better OCR quality
+OCR_PSM = 6
+# Pages OCR'd concurrently (each worker holds one rendered page at a time)
+OCR_WORKERS = int(os.getenv("PII_OCR_WORKERS", 0)) or min(4, os.cpu_count() or 1)
+# Wall-clock budget for OCR of one document, in seconds
+OCR_TIME_BUDGET = float(os.getenv("PII_OCR_TIME_BUDGET", 120))
+
+# Per-page OCR decision (see _classify_page)
+PAGE_MIN_CHARS = 100          # fewer characters than this = no usable text layer
+IMAGE_COVERAGE_SCAN = 0.5     # images covering this much of the page look like a scan
+SCAN_MAX_DENSITY = 10.0       # ...unless there are more chars per square inch than this
+
+# Structured content (form fields, annotations, metadata; see pdf_structure)
+STRUCTURED = os.getenv("PII_PDF_STRUCTURED", "1") == "1"
+FORM_MIN_FIELDS = 3           # filled fields on a page that make its OCR unnecessary
+
+_ocr_pool = None
+_ocr_pool_lock = threading.Lock()
+
+
+# A PDF "source" is either a file path or the file's bytes (an upload held
+# in memory); both are accepted throughout, so callers need no temp files.
+
+def _is_bytes(source):
+    return isinstance(source, (bytes, bytearray, memoryview))
+
+
+def open_pdf(source):
+    """pdfplumber.PDF for a path or in-memory bytes (no copy to disk)."""
+    return pdfplumber.open(BytesIO(source) if _is_bytes(source) else source)
 
-def extract_text_from_pdf(file_path):
-    import logging
-    logger = logging.getLogger(__name__)
-    
-    text = ""
-    total_pages = 0
 
-    # 1️⃣ Try normal text-based extraction from ALL pages
+def _open_pdfium(source):
+    return pdfium.PdfDocument(bytes(source) if isinstance(source, (bytearray, memoryview)) else source)
+
+
+# Text layer backends. Each yields (page_num, text, width, height,
+# image_boxes) per page, image boxes as (x0, top, x1, bottom) in points
+# from the top-left corner; text is None when the page could not be read.
+
+def _pypdfium2_pages(source, pdf=None):
+    doc = _open_pdfium(source)
     try:
-        with pdfplumber.open(file_path) as pdf:
-            total_pages = len(pdf.pages)
-            logger.info(f"📄 PDF has {total_pages} pages, extracting text from ALL pages...")
-            
-            for page_num, page in enumerate(pdf.pages, 1):
+        for index in range(len(doc)):
+            page = doc[index]
+            try:
+                width, height = page.get_size()
+                textpage = page.get_textpage()
+                text = textpage.get_text_range().replace("\r\n", "\n")
+                textpage.close()
+                boxes = []
+                for obj in page.get_objects(filter=[pdfium_c.FPDF_PAGEOBJ_IMAGE], max_depth=2):
+                    left, bottom, right, top = obj.get_bounds()
+                    boxes.append((left, height - top, right, height - bottom))
+            except Exception as page_error:
+                logger.warning(f"Failed to extract text from page {index + 1}: {page_error}")
+                text, width, height, boxes = None, 0, 0, []
+            finally:
+                page.close()
+            yield index + 1, text, width, height, boxes
+    finally:
+        doc.close()
+
+
+def _pdfplumber_pages(source, pdf=None):
+    opened = pdf is None
+    if opened:
+        pdf = open_pdf(source)
+    try:
+        for page_num, page in enumerate(pdf.pages, 1):
+            try:
+                text = page.extract_text() or ""
+                width, height = float(page.width), float(page.height)
+                boxes = [(img["x0"], img["top"], img["x1"], img["bottom"]) for img in page.images]
+            except Exception as page_error:
+                logger.warning(f"Failed to extract text from page {page_num}: {page_error}")
+                text, width, height, boxes = None, 0, 0, []
+            finally:
+                # Release the page's parsed objects once its text is out
+                page.close()
+            yield page_num, text, width, height, boxes
+    finally:
+        if opened:
+            pdf.close()
+
+
+def _pypdf_has_images(page):
+    xobjects = (page.get("/Resources") or {}).get("/XObject") or {}
+    return any(xobj.get_object().get("/Subtype") == "/Image" for xobj in xobjects.values())
+
+
+def _pypdf_pages(source, pdf=None):
+    reader = PdfReader(BytesIO(source) if _is_bytes(source) else source)
+    for page_num, page in enumerate(reader.pages, 1):
+        try:
+            text = page.extract_text() or ""
+            width, height = float(page.mediabox.width), float(page.mediabox.height)
+            # pypdf gives no image placement: an image page counts as fully covered
+            boxes = [(0, 0, width, height)] if _pypdf_has_images(page) else []
+        except Exception as page_error:
+            logger.warning(f"Failed to extract text from page {page_num}: {page_error}")
+            text, width, height, boxes = None, 0, 0, []
+        yield page_num, text, width, height, boxes
+
+
+TEXT_BACKENDS = {
+    "pypdfium2": _pypdfium2_pages,
+    "pdfplumber": _pdfplumber_pages,
+    "pypdf": _pypdf_pages,
+}
+
+
+def _layout_sensitive(text):
+    """
+    True when a fast backend's page text looks mangled by layout: words run
+    together (positioned glyphs without space characters) or text scattered
+    into tiny fragments (tables, glyph-by-glyph placement). pdfplumber
+    rebuilds lines from character positions and handles both.
+    """
+    if not text or len(text) < LAYOUT_MIN_CHARS:
+        return False
+    if text.count(" ") / len(text) < LAYOUT_MIN_SPACE_RATIO:
+        return True
+    lines = [line for line in text.split("\n") if line.strip()]
+    return len(lines) >= LAYOUT_MIN_LINES and sum(map(len, lines)) / len(lines) < LAYOUT_MIN_LINE_CHARS
+
+
+def _text_pages(source, backend=None, pdf=None):
+    """
+    Text layer page by page through `backend` (default TEXT_BACKEND), as
+    (page_num, text, width, height, image_boxes, backend_used). Pages the
+    pypdfium2 backend reads badly are re-extracted with pdfplumber, using
+    `pdf` if an opened pdfplumber document is given.
+    """
+    backend = backend or TEXT_BACKEND
+    plumber, plumber_opened = pdf, False
+    try:
+        for page_num, text, width, height, boxes in TEXT_BACKENDS[backend](source, pdf=pdf):
+            used = backend
+            if backend == "pypdfium2" and _layout_sensitive(text):
+                if plumber is None:
+                    plumber, plumber_opened = open_pdf(source), True
+                page = plumber.pages[page_num - 1]
                 try:
-                    page_text = page.extract_text()
-                    if page_text and page_text.strip():
-                        text += page_text + "\n"
-                        logger.debug(f"Page {page_num}: Extracted {len(page_text)} characters")
+                    text, used = page.extract_text() or "", "pdfplumber"
                 except Exception as page_error:
-                    logger.warning(f"Failed to extract text from page {page_num}: {page_error}")
-                    continue
+                    logger.warning(f"pdfplumber fallback failed on page {page_num}: {page_error}")
+                finally:
+                    page.close()
+            yield page_num, text, width, height, boxes, used
+    finally:
+        if plumber_opened:
+            plumber.close()
+
+
+def iter_pdf_pages(source):
+    """
+    Yield the text layer of each non-empty page, one page at a time, so
+    streaming.stream_pii() can run without holding the whole document.
+    """
+    for page_num, text, *_ in _text_pages(source):
+        if text and text.strip():
+            logger.debug(f"Page {page_num}: Extracted {len(text)} characters")
+            yield text + "\n"
+
+
+@contextmanager
+def _rendered_page(source, page_num):
+    """Grayscale pixels (numpy, H x W) of one page at OCR_DPI, valid inside the block."""
+    doc = _open_pdfium(source)
+    page = bitmap = None
+    try:
+        page = doc[page_num - 1]
+        bitmap = page.render(scale=OCR_DPI / 72, grayscale=True)
+        yield bitmap.to_numpy()
+    finally:
+        for obj in (bitmap, page, doc):
+            if obj is not None:
+                obj.close()
+
+
+def _page_count(source):
+    doc = _open_pdfium(source)
+    try:
+        return len(doc)
+    finally:
+        doc.close()
+
+
+def _ocr_page(source, page_num, timeout):
+    """
+    Render a single page and OCR it (runs inside an OCR worker).
+
+    Returns (text, lang, cached): the Tesseract language chosen for the
+    page and whether the text came from the OCR cache (keyed by the
+    rendered pixels, so identical pages in other PDFs hit too).
+    """
+    with _rendered_page(source, page_num) as pixels:
+        cache = ocr_cache.get_ocr_cache()
+        key = ocr_cache.page_key(pixels, ocr_engine.OCR_LANG, OCR_PSM, f"dpi{OCR_DPI}") if cache else None
+        cached = cache.get(key) if cache else None
+        if cached is not None:
+            return cached + (True,)
+        lang = ocr_engine.choose_lang(pixels)
+        text = ocr_engine.image_to_string(pixels, lang=lang, psm=OCR_PSM, timeout=timeout)
+        if cache:
+            cache.set(key, text, lang)
+        return text, lang, False
+
+
+def _ocr_page_task(source, page_num, timeout):
+    """
+    _ocr_page as an OCR pool task. Errors come back as RuntimeError: an
+    exception the parent can't unpickle (pytesseract's
+    TesseractNotFoundError) would break the whole pool, not just the page.
+    """
+    try:
+        return _ocr_page(source, page_num, timeout)
     except Exception as e:
-        logger.error(f"pdfplumber extraction failed: {e}")
-        text = ""
-
-    extracted_text = text.strip()
-    logger.info(f"📊 Total extracted text: {len(extracted_text)} characters from {total_pages} pages")
-
-    # 2️⃣ Check if we need OCR - Aadhaar cards should have 500+ characters
-    # If we got very little text, it's likely a scanned/image-based PDF
-    needs_ocr = len(extracted_text) < 500
-    
-    if needs_ocr:
-        logger.warning(f"⚠️ VERY LITTLE TEXT ({len(extracted_text)} chars). PDF is likely scanned. Triggering OCR...")
-    elif not extracted_text:
-        logger.warning("⚠️ NO TEXT EXTRACTED. Triggering OCR...")
-        needs_ocr = True
-
-    # 3️⃣ OCR scanned PDF if needed (explicit Poppler path)
-    if needs_ocr:
-        if os.path.exists(POPPLER_PATH) and os.path.exists(pytesseract.pytesseract.tesseract_cmd):
+        raise RuntimeError(f"{type(e).__name__}: {e}") from None
+
+
+def _get_ocr_pool():
+    global _ocr_pool
+    if _ocr_pool is None:
+        with _ocr_pool_lock:
+            if _ocr_pool is None:
+                # Not fork: the server process runs detector and job threads, and a
+                # forked child can inherit a lock one of them held
+                method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+                _ocr_pool = ProcessPoolExecutor(max_workers=OCR_WORKERS,
+                                                mp_context=multiprocessing.get_context(method))
+    return _ocr_pool
+
+
+def _worker_path(source):
+    """
+    (path, is_temp): a path OCR workers can open `source` from. In-memory
+    bytes are written once to a private (0600) temp file rather than
+    pickled into every task; see _remove_after.
+    """
+    if not _is_bytes(source):
+        return source, False
+    fd, path = tempfile.mkstemp(suffix=".pdf")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(source)
+    except BaseException:
+        _remove_temp(path)
+        raise
+    return path, True
+
+
+def _remove_temp(path):
+    try:
+        os.remove(path)
+    except OSError as e:
+        logger.warning(f"Could not delete OCR temp file {path}: {e}")
+
+
+def _remove_after(path, futures):
+    """
+    Delete a temp PDF once none of `futures` can still have it open
+    (Windows refuses to delete an open file): now, or from the callback
+    of the last task still running.
+    """
+    futures = [f for f in futures if not f.done()]
+    if not futures:
+        _remove_temp(path)
+        return
+    lock = threading.Lock()
+    left = [len(futures)]
+
+    def finished(_):
+        with lock:
+            left[0] -= 1
+            last = not left[0]
+        if last:
+            _remove_temp(path)
+
+    for future in futures:
+        future.add_done_callback(finished)
+
+
+def iter_ocr_pages(source, page_nums, workers=None, time_budget=None):
+    """
+    OCR the given 1-based pages, yielding (page_num, text, lang, cached) in
+    page order, where lang is the Tesseract language chosen for the page
+    and cached tells whether the OCR cache answered.
+
+    `source` is a path or the PDF's bytes (written to a temp file the
+    workers open, see _worker_path). Each page is rendered on its own
+    inside a worker and at most `workers` pages are in flight, so peak
+    memory is a few page bitmaps however long the document is. Stops once
+    `time_budget` seconds have passed; Tesseract calls are given the
+    remaining budget as their timeout.
+    """
+    workers = workers or OCR_WORKERS
+    budget = OCR_TIME_BUDGET if time_budget is None else time_budget
+    deadline = time.monotonic() + budget
+
+    def remaining():
+        return deadline - time.monotonic()
+
+    page_nums = list(page_nums)
+
+    def out_of_budget(page_num):
+        skipped = page_nums[page_nums.index(page_num):]
+        logger.warning(
+            f"⏱️ OCR time budget ({budget:g}s) exhausted; skipping pages {skipped}"
+        )
+
+    if workers <= 1:
+        for page_num in page_nums:
+            if remaining() <= 0:
+                out_of_budget(page_num)
+                return
+            try:
+                yield (page_num,) + _ocr_page(source, page_num, max(1, remaining()))
+            except Exception as page_ocr_error:
+                logger.warning(f"❌ OCR failed for page {page_num}: {page_ocr_error}")
+        return
+
+    pool = _get_ocr_pool()
+    pending = deque()
+    submitted = []
+    queue = deque(page_nums)
+    path, is_temp = _worker_path(source)
+    try:
+        while pending or queue:
+            while queue and len(pending) < workers and remaining() > 0:
+                page_num = queue.popleft()
+                future = pool.submit(_ocr_page_task, path, page_num, max(1, remaining()))
+                pending.append((page_num, future))
+                submitted.append(future)
+            if not pending:
+                out_of_budget(queue[0])
+                return
+
+            page_num, future = pending.popleft()
+            try:
+                page_ocr, lang, cached = future.result(timeout=max(0, remaining()))
+            except FuturesTimeout:
+                out_of_budget(page_num)
+                return
+            except Exception as page_ocr_error:
+                logger.warning(f"❌ OCR failed for page {page_num}: {page_ocr_error}")
+                continue
+            yield page_num, page_ocr, lang, cached
+    finally:
+        for _, future in pending:
+            future.cancel()
+        if is_temp:
+            # Pages still being OCR'd (past the budget) may hold the file open
+            _remove_after(path, submitted)
+
+
+def _image_coverage(width, height, boxes):
+    """Fraction of the page area covered by images (clipped, capped at 1)."""
+    area = float(width * height) or 1.0
+    covered = 0.0
+    for x0, top, x1, bottom in boxes:
+        w = min(x1, width) - max(x0, 0)
+        h = min(bottom, height) - max(top, 0)
+        if w > 0 and h > 0:
+            covered += w * h
+    return min(1.0, covered / area)
+
+
+def _classify_page(page_num, text, width, height, boxes, backend):
+    """
+    Decide whether one page (its text layer already extracted) needs OCR.
+
+    A page is OCR'd when it has images and either almost no text
+    (< PAGE_MIN_CHARS) or images covering most of it with only a sparse
+    text layer (a scan with a header/footer). Pages without images are
+    never OCR'd: their text layer is all there is. Unreadable pages
+    (text None) always are.
+    """
+    info = {"page": page_num, "text": text or "", "chars": 0, "image_coverage": 0.0,
+            "needs_ocr": text is None, "backend": backend}
+    if text is None:
+        return info
+    info["chars"] = len(info["text"].strip())
+    info["image_coverage"] = round(_image_coverage(width, height, boxes), 3)
+    if boxes:
+        square_inches = max(float(width * height) / (72 * 72), 1.0)
+        density = info["chars"] / square_inches
+        info["needs_ocr"] = info["chars"] < PAGE_MIN_CHARS or (
+            info["image_coverage"] >= IMAGE_COVERAGE_SCAN and density < SCAN_MAX_DENSITY
+        )
+    return info
+
+
+def extract_pdf(source, pdf=None, backend=None):
+    """
+    Extract a PDF page by page, OCR-ing only the pages that need it.
+
+    `source` is a file path or the PDF's bytes. The text layer comes from
+    `backend` (default TEXT_BACKEND, see TEXT_BACKENDS); an already opened
+    pdfplumber `pdf` is reused by the pdfplumber backend and fallback
+    instead of parsing the file again (it is left open).
+
+    With STRUCTURED, form field values, annotations and metadata are read
+    first (pdf_structure) and appended to the text as "label: value"
+    lines. A page that would need OCR but has FORM_MIN_FIELDS filled form
+    fields is not OCR'd: it is a form whose values are already in hand.
+
+    Returns {"text", "text_layer", "pages", "ocr_pages", "ocr_cache_hits",
+    "segments"}: the combined text in page order, the text layer alone
+    (before OCR), per-page {"page", "source", "backend", "chars",
+    "image_coverage", "ocr_lang", "ocr_cached", "form_fields"} records
+    (source is "text", "ocr" or "form"; backend is the text layer backend
+    that read the page; ocr_lang is the Tesseract language used, None for
+    pages not OCR'd), the page numbers whose text came from OCR, those of
+    them served by the OCR cache, and the structured segments with their
+    "start" / "end" offsets in the text.
+    """
+    pages = []
+    segments = pdf_structure.extract_segments(source) if STRUCTURED else []
+    form_fields = {}
+    for segment in segments:
+        if segment["source"] == "form" and segment["page"]:
+            form_fields[segment["page"]] = form_fields.get(segment["page"], 0) + 1
+
+    # 1️⃣ Text layer + per-page OCR decision
+    backend = backend or TEXT_BACKEND
+    try:
+        pages = [_classify_page(*page) for page in _text_pages(source, backend, pdf=pdf)]
+        logger.info(f"📄 PDF has {len(pages)} pages, text layer read with {backend}")
+    except Exception as e:
+        logger.error(f"{backend} extraction failed: {e}")
+        pages = []
+
+    if not pages:
+        # Unreadable structure: fall back to OCR of every page
+        try:
+            page_count = _page_count(source)
+        except Exception as e:
+            logger.error(f"❌ Could not count PDF pages: {e}")
+            page_count = 0
+        pages = [
+            {"page": n, "text": "", "chars": 0, "image_coverage": None, "needs_ocr": True, "backend": None}
+            for n in range(1, page_count + 1)
+        ]
+
+    for p in pages:
+        p["source"] = "text"
+        p["ocr_lang"] = None
+        p["ocr_cached"] = False
+        p["form_fields"] = form_fields.get(p["page"], 0)
+        if p["needs_ocr"] and p["form_fields"] >= FORM_MIN_FIELDS:
+            p.update(needs_ocr=False, source="form")
+    text_layer = "".join(p["text"] + "\n" for p in pages if p["text"].strip()).strip()
+    text_chars = sum(p["chars"] for p in pages)
+    wanted = [p["page"] for p in pages if p["needs_ocr"]]
+    logger.info(
+        f"📊 Text layer: {text_chars} characters from {len(pages)} pages; "
+        f"{len(wanted)} pages need OCR {wanted if wanted else ''}"
+    )
+
+    # 2️⃣ OCR only the pages that need it (rendered by pypdfium2)
+    ocr_pages = []
+    ocr_cache_hits = []
+    if wanted:
+        if ocr_engine.ocr_available():
             try:
-                logger.info(f"🖼️ Converting PDF to images using Poppler at {POPPLER_PATH}...")
-                images = convert_from_path(
-                    file_path,
-                    poppler_path=POPPLER_PATH,
-                    dpi=300  # Higher DPI for better OCR quality
-                )
-                logger.info(f"✅ Converted PDF to {len(images)} images for OCR")
-                
-                ocr_text = ""
-                for i, img in enumerate(images, 1):
-                    try:
-                        logger.info(f"🔍 Running OCR on page {i}/{len(images)}...")
-                        page_ocr = pytesseract.image_to_string(img, lang="eng+hin", config="--psm 6")
-                        if page_ocr and page_ocr.strip():
-                            ocr_text += page_ocr + "\n"
-                            logger.info(f"✅ Page {i} OCR: Extracted {len(page_ocr)} characters")
-                    except Exception as page_ocr_error:
-                        logger.warning(f"❌ OCR failed for page {i}: {page_ocr_error}")
-                
-                if ocr_text.strip():
-                    combined_text = (extracted_text + "\n" + ocr_text).strip()
-                    logger.info(f"🎉 OCR extracted {len(ocr_text)} characters. Combined total: {len(combined_text)}")
-                    return combined_text
-                else:
+                logger.info(f"🖼️ OCR of {len(wanted)} pages, page by page on {OCR_WORKERS} workers...")
+                by_num = {p["page"]: p for p in pages}
+                for i, page_ocr, lang, cached in iter_ocr_pages(source, wanted):
+                    by_num[i].update(ocr_lang=lang, ocr_cached=cached)
+                    if cached:
+                        ocr_cache_hits.append(i)
+                    if page_ocr and page_ocr.strip():
+                        # The rendered page includes whatever text layer it had
+                        by_num[i].update(text=page_ocr, chars=len(page_ocr.strip()), source="ocr")
+                        ocr_pages.append(i)
+                        logger.info(
+                            f"✅ Page {i} OCR ({lang}{', cached' if cached else ''}): "
+                            f"Extracted {len(page_ocr)} characters"
+                        )
+                if not ocr_pages:
                     logger.warning("⚠️ OCR completed but extracted no text")
             except Exception as e:
                 logger.error(f"❌ OCR Failed: {e}", exc_info=True)
         else:
-            missing = []
-            if not os.path.exists(POPPLER_PATH):
-                missing.append(f"Poppler (expected at {POPPLER_PATH})")
-            if not os.path.exists(pytesseract.pytesseract.tesseract_cmd):
-                missing.append(f"Tesseract (expected at {pytesseract.pytesseract.tesseract_cmd})")
-            logger.error(f"❌ OCR dependencies missing: {', '.join(missing)}. Skipping OCR.")
-
-    # Return whatever text we extracted (even if short, if OCR failed)
-    logger.info(f"📤 Returning {len(extracted_text)} characters")
-    return extracted_text
+            logger.error(
+                f"❌ OCR dependencies missing: Tesseract (tesserocr, or the binary at "
+                f"{ocr_engine.TESSERACT_CMD}). Skipping OCR."
+            )
+
+    text = "".join(p["text"] + "\n" for p in pages if p["text"].strip()).strip()
+    if segments:
+        # Offsets are final: the block is only followed by a stripped newline
+        text += "\n\n" if text else ""
+        block, segments = pdf_structure.segments_text(segments, offset=len(text))
+        text = (text + block).rstrip()
+        logger.info(f"🧾 {len(segments)} structured segments (form fields: {sum(form_fields.values())})")
+    logger.info(f"📤 Returning {len(text)} characters (OCR'd pages: {ocr_pages or 'none'})")
+    return {
+        "text": text,
+        "text_layer": text_layer,
+        "pages": [
+            {k: p[k] for k in ("page", "source", "backend", "chars", "image_coverage", "ocr_lang", "ocr_cached",
+                               "form_fields")}
+            for p in pages
+        ],
+        "ocr_pages": ocr_pages,
+        "ocr_cache_hits": ocr_cache_hits,
+        "segments": segments,
+    }
+
+
+def extract_text_from_pdf(file_path):
+    return extract_pdf(file_path)["text"]
@@ -0,0 +1,147 @@
+"""
+Structured content of a PDF, read with pypdf in one cheap pass (no page
+text extraction, no rendering):
+
+- AcroForm field values (text and choice fields), with the page their
+  widget sits on
+- annotation text (sticky notes, free text, ...) and annotation authors
+- document information metadata (title, author, subject, keywords, custom
+  keys)
+
+Government and bank PDFs often carry the sensitive values (name, DOB,
+account number) only in form fields, which neither the text layer nor the
+rendered page reliably shows. Each value becomes a labelled segment
+{"source", "label", "page", "text"}; segments_text() lays them out as
+"label: value" lines so keyword context (e.g. "Date of Birth: ...")
+applies, and records each segment's offsets.
+"""
+import logging
+import re
+from io import BytesIO
+
+from pypdf import PdfReader
+from pypdf.generic import IndirectObject
+
+logger = logging.getLogger(__name__)
+
+FORM_TEXT_TYPES = ("/Tx", "/Ch")
+SKIP_ANNOTATIONS = ("/Widget", "/Link", "/Popup")
+SKIP_METADATA = ("/Producer", "/Creator", "/CreationDate", "/ModDate", "/Trapped")
+MAX_SEGMENT_CHARS = 2000
+ANNOTATION_LABELS = {"/Text": "Note", "/FreeText": "Comment"}
+
+
+def _label(name):
+    """Readable label from a field / key name: "txtDateOfBirth" -> "txt Date Of Birth"."""
+    name = str(name).lstrip("/")
+    name = re.sub(r"(?<=[a-z])(?=[A-Z])", " ", name)
+    return re.sub(r"[_.\-\s]+", " ", name).strip()
+
+
+def _text(value):
+    if isinstance(value, IndirectObject):
+        value = value.get_object()
+    if isinstance(value, list):
+        value = ", ".join(str(v) for v in value)
+    if value is None:
+        return ""
+    return str(value).strip()[:MAX_SEGMENT_CHARS]
+
+
+def _inherited(field, key):
+    """Field attribute, looked up through /Parent (kids inherit /FT, /V, ...)."""
+    while field is not None:
+        if key in field:
+            return field[key]
+        parent = field.get("/Parent")
+        field = parent.get_object() if parent is not None else None
+    return None
+
+
+def _field_segment(field, page):
+    if _inherited(field, "/FT") not in FORM_TEXT_TYPES:
+        return None
+    value = _text(_inherited(field, "/V"))
+    if not value:
+        return None
+    name = field.get("/TU") or _inherited(field, "/T") or "field"
+    return {"source": "form", "label": _label(name), "page": page, "text": value}
+
+
+def extract_segments(source):
+    """
+    Labelled segments of a PDF (path or bytes), in page order, then
+    fields without a widget, then metadata. Never raises: a PDF pypdf
+    cannot read simply has no segments.
+    """
+    try:
+        reader = PdfReader(BytesIO(source) if isinstance(source, (bytes, bytearray, memoryview)) else source)
+    except Exception as e:
+        logger.warning(f"pypdf could not open PDF for structured fields: {e}")
+        return []
+
+    segments, seen_fields = [], set()
+    try:
+        for page_num, page in enumerate(reader.pages, 1):
+            for ref in page.get("/Annots") or []:
+                annot = ref.get_object()
+                subtype = annot.get("/Subtype")
+                if subtype == "/Widget":
+                    # A widget is the field itself or a kid of it
+                    field = annot if "/T" in annot else (annot.get("/Parent") or annot).get_object()
+                    key = id(field)
+                    if key in seen_fields:
+                        continue
+                    seen_fields.add(key)
+                    segment = _field_segment(field, page_num)
+                    if segment:
+                        segments.append(segment)
+                    continue
+                if subtype in SKIP_ANNOTATIONS:
+                    continue
+                contents = _text(annot.get("/Contents"))
+                if contents:
+                    label = ANNOTATION_LABELS.get(subtype) or _label(subtype or "Annotation")
+                    segments.append({"source": "annotation", "label": label, "page": page_num, "text": contents})
+                author = _text(annot.get("/T"))
+                if author:
+                    segments.append({"source": "annotation", "label": "Author", "page": page_num, "text": author})
+
+        # Fields that have no widget on any page (hidden / orphaned)
+        fields = reader.get_fields() or {}
+        for field in fields.values():
+            if field.indirect_reference is not None:
+                obj = field.indirect_reference.get_object()
+                if id(obj) in seen_fields:
+                    continue
+            value = _text(field.get("/V"))
+            if field.get("/FT") in FORM_TEXT_TYPES and value:
+                label = field.get("/TU") or field.get("/T") or "field"
+                if not any(s["source"] == "form" and s["text"] == value for s in segments):
+                    segments.append({"source": "form", "label": _label(label), "page": None, "text": value})
+
+        for key, value in (reader.metadata or {}).items():
+            value = _text(value)
+            if key not in SKIP_METADATA and value:
+                segments.append({"source": "metadata", "label": _label(key), "page": None, "text": value})
+    except Exception as e:
+        logger.warning(f"Structured PDF scan stopped early: {e}")
+    return segments
+
+
+def segments_text(segments, offset=0):
+    """
+    "label: value" lines for `segments`, and the segments with "start" /
+    "end" offsets of their value in that text (shifted by `offset`, the
+    position the block will have in the final document text).
+    """
+    parts, placed, pos = [], [], offset
+    for segment in segments:
+        prefix = f"{segment['label']}: "
+        value = " ".join(segment["text"].split())
+        start = pos + len(prefix)
+        placed.append(dict(segment, text=value, start=start, end=start + len(value)))
+        line = prefix + value + "\n"
+        parts.append(line)
+        pos += len(line)
+    return "".join(parts), placed
@@ -1,8 +1,14 @@
+import time
+
 from .presidio_engine import detect_pii_presidio
+from .ner_detector import ner_candidates
+from .nlp_provider import parse
+from .entity_mapper import map_entity
 from .regex_patterns import regex_candidates
-from .keyword_context import keyword_score
+from .keyword_context import KeywordContext
 from .confidence_engine import compute_confidence
-from .aadhaar_validator import is_valid_aadhaar
+from .checksum_filter import validate_candidates
+from .span_index import SpanIndex
 
 
 PII_PRIORITY = {
@@ -24,29 +30,60 @@ REGEX_ONLY = {
     "MASKED_PHONE","MASKED_EMAIL","MASKED_PAN"
 }
 
-def overlaps(a, b, c, d):
-    return not (b <= c or d <= a)
+# Detection tiers:
+# - fast:     regex + checksums + keywords only (no spaCy / Presidio); the
+#             regex PHONE/EMAIL patterns stand in for Presidio
+# - standard: Presidio + regex (default)
+# - deep:     standard + spaCy NER entities (PERSON/GPE/ORG)
+MODES = ("fast", "standard", "deep")
+
+FAST_REGEX_TYPES = REGEX_ONLY | {"PHONE", "EMAIL"}
+
+def detect_pii(text, mode="standard", timings=None, doc=None):
+    """
+    Detect PII in `text` using the given tier (see MODES).
 
-def detect_pii(text):
-    final_hits = []
+    If `timings` is a dict, per-tier latency in milliseconds is recorded
+    in it ("nlp", "presidio", "regex", "ner"). Pass `doc` (from
+    nlp_provider.parse / parse_many) to reuse an existing spaCy parse.
+    """
+    if mode not in MODES:
+        raise ValueError(f"Unknown detection mode '{mode}'. Expected one of {MODES}")
+    if timings is None:
+        timings = {}
+
+    index = SpanIndex(PII_PRIORITY)
 
     # 1️⃣ Presidio (safe entities only)
-    for h in detect_pii_presidio(text):
-        final_hits.append(h)
+    if mode != "fast":
+        # One spaCy parse, shared by Presidio and (deep) NER
+        if doc is None:
+            t0 = time.perf_counter()
+            doc = parse(text)
+            timings["nlp"] = round((time.perf_counter() - t0) * 1000, 2)
+
+        t0 = time.perf_counter()
+        for h in detect_pii_presidio(text, doc=doc):
+            index.add(h)
+        timings["presidio"] = round((time.perf_counter() - t0) * 1000, 2)
 
     # 2️⃣ Regex (India-specific)
-    for h in regex_candidates(text):
-        if h["type"] not in REGEX_ONLY:
-            continue
-
-        # Validate Aadhaar checksum to prevent false positives
-        if h["type"] == "AADHAAR":
-            # 1. Check strict mathematical validity
-            is_valid_checksum = is_valid_aadhaar(h["value"])
+    t0 = time.perf_counter()
+    # Keyword positions are indexed once and shared by every candidate below
+    context = KeywordContext(text)
+    regex_types = FAST_REGEX_TYPES if mode == "fast" else REGEX_ONLY
+
+    # Checksums / structure are validated in one batch before any scoring;
+    # impossible cards never reach keyword_score
+    for h in validate_candidates(regex_candidates(text, regex_types)):
+        # Validate Aadhaar / PAN checksum and structure to prevent false positives
+        if h["type"] in ("AADHAAR", "PAN"):
+            # 1. Check strict validity (Verhoeff, leading digit, PAN holder type; batch-computed)
+            is_valid_checksum = h.get("checksum_valid", True) and h["structure_valid"]
             
-            # 2. Check context (e.g. "Father", "DOB", "Male/Female" nearby)
+            # 2. Check context (e.g. "Aadhaar", "PAN" nearby)
             # We calculate this specifically for validation
-            ctx_bonus = keyword_score(text, "AADHAAR", h["start"], h["end"])
+            ctx_bonus = context.score(h["type"], h["start"], h["end"])
             
             # 3. Decision Logic:
             # - Valid Checksum -> Keep
@@ -62,7 +99,10 @@ def detect_pii(text):
             if h["end"] < len(text) and text[h["end"]] == "@":
                 continue  # This is part of a UPI ID, not a standalone bank account
 
-        bonus = keyword_score(text, h["type"], h["start"], h["end"])
+        if h["type"] in ("AADHAAR", "PAN"):
+            bonus = ctx_bonus  # Already scored for the checksum decision
+        else:
+            bonus = context.score(h["type"], h["start"], h["end"])
         if bonus < 0:
             continue
 
@@ -72,33 +112,8 @@ def detect_pii(text):
 
 
         # Suppress overlaps or remove lower priority overlapping entities
-        is_suppressed = False
-        to_remove = []
-        for f in final_hits:
-            if overlaps(h["start"], h["end"], f["start"], f["end"]):
-                priority_f = PII_PRIORITY.get(f["type"], 0)
-                priority_h = PII_PRIORITY.get(h["type"], 0)
-                
-                if priority_f > priority_h:
-                    is_suppressed = True
-                    break
-                elif priority_f == priority_h:
-                    # Break ties using confidence scores
-                    if f.get("confidence", 0) >= round(conf, 2):
-                        is_suppressed = True
-                        break
-                    else:
-                        to_remove.append(f)
-                else:
-                    to_remove.append(f)
-        
-        if is_suppressed:
-            continue
-            
-        for f in to_remove:
-            final_hits.remove(f)
-
-        final_hits.append({
+        # (higher priority wins; equal priority is broken by confidence)
+        index.offer({
             "type": h["type"],
             "value": h["value"],
             "confidence": round(conf,2),
@@ -106,6 +121,17 @@ def detect_pii(text):
             "end": h["end"]
         })
 
+    timings["regex"] = round((time.perf_counter() - t0) * 1000, 2)
+
+    # 3️⃣ NER (deep only) - lowest priority, never displaces regex/Presidio hits
+    if mode == "deep":
+        t0 = time.perf_counter()
+        for h in ner_candidates(text, doc=doc):
+            index.offer(dict(h, type=map_entity(h["type"])))
+        timings["ner"] = round((time.perf_counter() - t0) * 1000, 2)
+
+    final_hits = index.hits()
+
     # Deduplicate
     seen = set()
     cleaned = []
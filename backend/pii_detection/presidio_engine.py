@@ -1,4 +1,4 @@
-from presidio_analyzer import AnalyzerEngine
+from .nlp_provider import get_nlp_engine, nlp_artifacts, parse
 
 # Allow ONLY high-precision entities
 ALLOWED_ENTITIES = {
@@ -7,14 +7,32 @@ ALLOWED_ENTITIES = {
     "URL": "URL" 
 }
 
-analyzer = AnalyzerEngine()
+# Loaded on first use so regex-only ("fast") detection never pays for spaCy
+analyzer = None
 
-def detect_pii_presidio(text):
-    results = analyzer.analyze(
+def get_analyzer():
+    global analyzer
+    if analyzer is None:
+        from presidio_analyzer import AnalyzerEngine
+        # Shares the process-wide spaCy pipeline instead of loading its own
+        analyzer = AnalyzerEngine(nlp_engine=get_nlp_engine(), supported_languages=["en"])
+    return analyzer
+
+def detect_pii_presidio(text, doc=None):
+    """
+    Run Presidio's EMAIL / PHONE / URL recognizers.
+
+    Pass `doc` (from nlp_provider.parse) to reuse an existing spaCy parse.
+    """
+    if doc is None:
+        doc = parse(text)
+
+    results = get_analyzer().analyze(
         text=text,
         language="en",
         entities=list(ALLOWED_ENTITIES.keys()),
-        score_threshold=0.75
+        score_threshold=0.75,
+        nlp_artifacts=nlp_artifacts(doc)
     )
 
     detections = []
@@ -34,7 +34,156 @@ REGEX_PATTERNS = {
     "UTILITY_ACCOUNT": r"\b\d{8,14}\b"
 }
 
-def regex_candidates(text):
+COMPILED_PATTERNS = {
+    t: re.compile(pattern, re.IGNORECASE) for t, pattern in REGEX_PATTERNS.items()
+}
+
+# Every pattern above is \b-anchored and only spans these characters, with a
+# single whitespace allowed between digit groups (Aadhaar / VID / card). A
+# segment is a maximal run of them; only segments holding a digit or "@" can
+# contain a candidate, so everything else is skipped inside the lexer itself.
+_TOKEN = r"[\w.+\-@*/]"
+SEGMENT_RE = re.compile(
+    rf"(?<!{_TOKEN})(?={_TOKEN}*?[\d@]){_TOKEN}++(?:(?<=\d)\s(?=\d){_TOKEN}++)*"
+)
+
+# Pure digit runs are classified by length alone: (type, min_len, max_len)
+_DIGIT_RUN_TYPES = (
+    ("AADHAAR", 12, 12),
+    ("VID", 16, 16),
+    ("CREDIT_DEBIT_CARD", 16, 16),
+    ("BANK_ACCOUNT", 11, 11),
+    ("BANK_ACCOUNT", 13, 18),
+    ("CVV", 3, 3),
+    ("UTILITY_ACCOUNT", 8, 14),
+)
+
+# Characters a segment must contain before a pattern is worth running on it
+# (d = digit, a = letter)
+_REQUIRES = {
+    "AADHAAR": "d", "VID": "d", "CREDIT_DEBIT_CARD": "d", "BANK_ACCOUNT": "d",
+    "CVV": "d", "PHONE": "d", "DOB": "d", "UTILITY_ACCOUNT": "d",
+    "PAN": "da",
+    "UPI_ID": "@", "EMAIL": "@",
+    "MASKED_PHONE": "d*", "MASKED_PAN": "d*", "MASKED_EMAIL": "@*",
+}
+
+# Numeric segments (digits + separators, no letters or "@") match the same way
+# as their shape: only digit-ness and the [6-9] phone prefix matter.
+_SHAPE = str.maketrans("0123456789", "0000009999")
+_SHAPE_CACHE_SIZE = 4096
+
+_HAS_DIGIT = re.compile(r"\d").search
+_HAS_ALPHA = re.compile(r"[^\W\d_]").search
+
+
+class CandidateScanner:
+    """
+    Single-pass candidate scanner over the patterns in REGEX_PATTERNS.
+
+    The text is lexed once into segments. Pure digit runs are typed by length,
+    numeric segments by their separator shape (memoised), and the remaining
+    segments are matched only against the precompiled patterns their characters
+    allow. Output is identical to running re.finditer per pattern: grouped in
+    REGEX_PATTERNS order, then by position.
+    """
+
+    def __init__(self, entity_types=None):
+        if entity_types is None:
+            entity_types = REGEX_PATTERNS.keys()
+        unknown = set(entity_types) - REGEX_PATTERNS.keys()
+        if unknown:
+            raise ValueError(f"Unknown entity types: {', '.join(sorted(unknown))}")
+
+        self.entity_types = [t for t in REGEX_PATTERNS if t in set(entity_types)]
+        self._digit_run_types = [r for r in _DIGIT_RUN_TYPES if r[0] in self.entity_types]
+        self._phone = "PHONE" in self.entity_types
+        self._patterns_by_mask = {}
+        self._shape_cache = {}
+
+    def _patterns_for(self, mask):
+        patterns = self._patterns_by_mask.get(mask)
+        if patterns is None:
+            patterns = [
+                (t, COMPILED_PATTERNS[t]) for t in self.entity_types
+                if set(mask).issuperset(_REQUIRES[t])
+            ]
+            self._patterns_by_mask[mask] = patterns
+        return patterns
+
+    def _match_segment(self, value, mask):
+        return [
+            (t, m.start(), m.end())
+            for t, pattern in self._patterns_for(mask)
+            for m in pattern.finditer(value)
+        ]
+
+    def _match_numeric(self, value):
+        shape = value.translate(_SHAPE)
+        spans = self._shape_cache.get(shape)
+        if spans is None:
+            mask = "d*" if "*" in value else "d"
+            spans = self._match_segment(shape, mask)
+            if len(self._shape_cache) >= _SHAPE_CACHE_SIZE:
+                self._shape_cache.clear()
+            self._shape_cache[shape] = spans
+        return spans
+
+    def scan(self, text):
+        found = {t: [] for t in self.entity_types}
+
+        for seg in SEGMENT_RE.finditer(text):
+            value = seg.group()
+            offset = seg.start()
+
+            if value.isdecimal():
+                n = len(value)
+                end = offset + n
+                for t, lo, hi in self._digit_run_types:
+                    if lo <= n <= hi:
+                        found[t].append((value, offset, end))
+                if self._phone and n == 10 and value[0] in "6789":
+                    found["PHONE"].append((value, offset, end))
+                continue
+
+            if "@" not in value and not _HAS_ALPHA(value):
+                spans = self._match_numeric(value)
+            else:
+                mask = "a" if _HAS_ALPHA(value) else ""
+                if _HAS_DIGIT(value):
+                    mask += "d"
+                if "@" in value:
+                    mask += "@"
+                if "*" in value:
+                    mask += "*"
+                spans = self._match_segment(value, mask)
+
+            for t, s, e in spans:
+                found[t].append((value[s:e], offset + s, offset + e))
+
+        hits = []
+        for t in self.entity_types:
+            for value, start, end in found[t]:
+                hits.append({
+                    "type": t,
+                    "value": value,
+                    "start": start,
+                    "end": end,
+                    "source": "regex"
+                })
+        return hits
+
+
+_DEFAULT_SCANNER = CandidateScanner()
+
+
+def regex_candidates(text, entity_types=None):
+    scanner = _DEFAULT_SCANNER if entity_types is None else CandidateScanner(entity_types)
+    return scanner.scan(text)
+
+
+def regex_candidates_multipass(text):
+    """Reference implementation: one re.finditer scan per pattern."""
     hits = []
     for t, pattern in REGEX_PATTERNS.items():
         for m in re.finditer(pattern, text, re.IGNORECASE):
@@ -0,0 +1,283 @@
+"""
+Content-addressed cache for detection results.
+
+Keys are SHA-256 digests of the input text exactly as given (or of the
+raw file bytes) together with DETECTOR_VERSION, the detection mode and a
+scope naming the producer ("model_router", "detect_pdf_ai", ...). The text
+is not normalized first: finding offsets index the caller's text, so two
+texts may only share results if they are identical. Values are the
+already-masked result dicts; raw PII never reaches the cache.
+
+Two tiers:
+- memory: LRU bounded by a byte budget (size of the JSON encoding)
+- disk (optional): one JSON file per key, survives restarts. Expired
+  files are swept and, past the byte budget, the oldest are deleted down
+  to 90% of it. Each process keeps a running total of the directory's
+  size, re-scanned every SWEEP_WRITES writes since other processes write
+  to it too.
+
+Configured from the environment, like nlp_provider:
+    PII_CACHE_MAX_BYTES       memory budget in bytes (default 32 MiB, 0 disables)
+    PII_CACHE_TTL             seconds an entry stays valid (default 86400)
+    PII_CACHE_DIR             directory for the disk tier (unset = memory only)
+    PII_CACHE_DISK_MAX_BYTES  disk tier budget in bytes (default 256 MiB)
+"""
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever a change to detection, masking or scoring can alter output,
+# so stale results are never served
+DETECTOR_VERSION = "pii-2026.10.3"
+
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024
+DEFAULT_TTL = 24 * 60 * 60
+DEFAULT_DISK_MAX_BYTES = 256 * 1024 * 1024
+TRIM_TO = 0.9
+SWEEP_WRITES = 1000
+
+
+def _key(parts, payload):
+    h = hashlib.sha256()
+    for part in (DETECTOR_VERSION,) + parts:
+        h.update(str(part).encode("utf-8"))
+        h.update(b"\0")
+    h.update(payload)
+    return h.hexdigest()
+
+
+def text_key(text, mode="standard", scope="model_router"):
+    """Key for a text, exactly as detection sees it."""
+    return _key(("text", scope, mode), text.encode("utf-8"))
+
+
+def bytes_key(data, mode="standard", scope="detect_pdf_ai"):
+    """Key for the raw bytes of an uploaded file."""
+    return _key(("bytes", scope, mode), data)
+
+
+class ResultCache:
+    """Thread-safe LRU + TTL cache of JSON-serialisable results."""
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES, ttl=DEFAULT_TTL, disk_dir=None,
+                 disk_max_bytes=DEFAULT_DISK_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.disk_dir = disk_dir
+        self.disk_max_bytes = disk_max_bytes
+        self._entries = OrderedDict()   # key -> (stored_at, encoded)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+        self.disk_evictions = 0
+        self._disk_bytes = None  # disk tier size as last seen by this process
+        self._disk_writes = 0
+        self._sweep_lock = threading.Lock()
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    def get(self, key):
+        """Return a fresh copy of the cached value, or None."""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if now - entry[0] <= self.ttl:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return json.loads(entry[1])
+                self._drop(key)
+                self.expired += 1
+
+        entry = self._disk_read(key, now)
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._store(key, *entry)
+        return json.loads(entry[1])
+
+    def set(self, key, value):
+        encoded = json.dumps(value, separators=(",", ":"), default=str)
+        stored_at = time.time()
+        with self._lock:
+            self._store(key, stored_at, encoded)
+        self._disk_write(key, stored_at, encoded)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                "version": DETECTOR_VERSION,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl,
+                "disk": bool(self.disk_dir),
+                "disk_bytes": self._disk_bytes,
+                "disk_max_bytes": self.disk_max_bytes if self.disk_dir else None,
+                "disk_evictions": self.disk_evictions,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "expired": self.expired,
+                "evictions": self.evictions,
+                "hit_rate": round((self.hits + self.disk_hits) / lookups, 4) if lookups else 0.0,
+            }
+
+    # -- memory tier (caller holds the lock) --
+
+    def _store(self, key, stored_at, encoded):
+        if key in self._entries:
+            self._drop(key)
+        size = len(encoded)
+        if size > self.max_bytes:
+            return
+        self._entries[key] = (stored_at, encoded)
+        self._bytes += size
+        while self._bytes > self.max_bytes:
+            old_key, _ = next(iter(self._entries.items()))
+            self._drop(old_key)
+            self.evictions += 1
+
+    def _drop(self, key):
+        _, encoded = self._entries.pop(key)
+        self._bytes -= len(encoded)
+
+    # -- disk tier --
+
+    def _path(self, key):
+        return os.path.join(self.disk_dir, key[:2], key + ".json")
+
+    def _disk_read(self, key, now):
+        if not self.disk_dir:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, encoding="utf-8") as f:
+                stored_at = float(f.readline())
+                encoded = f.read()
+        except (OSError, ValueError):
+            return None
+        if now - stored_at > self.ttl:
+            self._disk_remove(path)
+            return None
+        return stored_at, encoded
+
+    def _disk_write(self, key, stored_at, encoded):
+        if not self.disk_dir:
+            return
+        path = self._path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(f"{stored_at}\n{encoded}")
+            os.utime(tmp, (stored_at, stored_at))
+            os.replace(tmp, path)
+        except OSError as e:
+            logger.warning(f"Result cache disk write failed: {e}")
+            return
+        with self._lock:
+            self._disk_writes += 1
+            if self._disk_bytes is None or self._disk_writes % SWEEP_WRITES == 0:
+                self._disk_bytes = None
+            else:
+                self._disk_bytes += len(encoded)
+            total = self._disk_bytes
+        if total is None or total > self.disk_max_bytes:
+            self._sweep()
+
+    def _sweep(self):
+        """
+        Delete expired files, then the oldest ones while the tier is over
+        budget; file mtimes are the entries' stored_at.
+        """
+        if not self._sweep_lock.acquire(blocking=False):
+            return  # another thread of this process is sweeping
+        try:
+            now = time.time()
+            entries, total, evicted = [], 0, 0
+            for sub in os.scandir(self.disk_dir):
+                if not sub.is_dir():
+                    continue
+                for f in os.scandir(sub.path):
+                    try:
+                        st = f.stat()
+                    except OSError:
+                        continue  # removed by another process meanwhile
+                    if now - st.st_mtime > self.ttl:
+                        # Also temp files a killed writer left behind
+                        self._disk_remove(f.path)
+                        evicted += f.name.endswith(".json")
+                    elif f.name.endswith(".json"):
+                        entries.append((st.st_mtime, st.st_size, f.path))
+                        total += st.st_size
+            if total > self.disk_max_bytes:
+                target = int(self.disk_max_bytes * TRIM_TO)
+                for _, size, path in sorted(entries):
+                    if total <= target:
+                        break
+                    self._disk_remove(path)
+                    total -= size
+                    evicted += 1
+        except OSError as e:
+            logger.warning(f"Result cache disk sweep failed: {e}")
+            return
+        finally:
+            self._sweep_lock.release()
+        with self._lock:
+            self._disk_bytes = total
+            self.disk_evictions += evicted
+
+    @staticmethod
+    def _disk_remove(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    """Process-wide cache, or None when PII_CACHE_MAX_BYTES is 0."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                max_bytes = int(os.environ.get("PII_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES))
+                _cache = ResultCache(
+                    max_bytes=max_bytes,
+                    ttl=float(os.environ.get("PII_CACHE_TTL", DEFAULT_TTL)),
+                    disk_dir=os.environ.get("PII_CACHE_DIR") or None,
+                    disk_max_bytes=int(os.environ.get("PII_CACHE_DISK_MAX_BYTES", DEFAULT_DISK_MAX_BYTES)),
+                ) if max_bytes > 0 else False
+    return _cache or None
+
+
+def cache_stats():
+    """Hit/miss counters for monitoring; {"enabled": False} when disabled."""
+    cache = get_cache()
+    if cache is None:
+        return {"enabled": False}
+    return dict(cache.stats(), enabled=True)
@@ -7,26 +7,39 @@ SENSITIVE = {"DOB","PHONE"}  # Names are sensitive PII
 MODERATE = {"EMAIL","URL","UTILITY_ACCOUNT"}
 LOW = {"MASKED_PHONE","MASKED_EMAIL","MASKED_PAN"}
 
-def calculate_risk(pii):
-    score = 0
-    critical = False
 
-    for p in pii:
-        t, c = p["type"], p["confidence"]
+class RiskAggregate:
+    """Running risk score, updated one finding at a time (used for streaming)."""
+
+    def __init__(self):
+        self.score = 0
+        self.critical = False
+
+    def add(self, pii_type, confidence):
+        t, c = pii_type, confidence
         if t in CRITICAL:
-            critical = True
-            score += c * 8
+            self.critical = True
+            self.score += c * 8
         elif t in SENSITIVE:
-            score += c * 4
+            self.score += c * 4
         elif t in MODERATE:
-            score += c * 3
+            self.score += c * 3
         elif t in LOW:
-            score += c * 1
-
-    if critical:
-        return "HIGH", round(score,2)
-    if score >= 6:
-        return "MEDIUM", round(score,2)
-    if score > 0:
-        return "LOW", round(score,2)
-    return "NONE", 0
+            self.score += c * 1
+
+    def result(self):
+        score = self.score
+        if self.critical:
+            return "HIGH", round(score,2)
+        if score >= 6:
+            return "MEDIUM", round(score,2)
+        if score > 0:
+            return "LOW", round(score,2)
+        return "NONE", 0
+
+
+def calculate_risk(pii):
+    aggregate = RiskAggregate()
+    for p in pii:
+        aggregate.add(p["type"], p["confidence"])
+    return aggregate.result()
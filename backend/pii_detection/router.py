@@ -1,38 +1,90 @@
+import time
+
 from .pii_engine import detect_pii
 from .risk_engine import calculate_risk
 from .masking import mask_value
 from .privacy_educator import generate_privacy_education
+from .result_cache import get_cache, text_key
+
+def mask_finding(p):
+    return {
+        "type": p["type"],
+        "masked_value": mask_value(p["type"], p["value"]),
+        "confidence": p["confidence"],
+        "start": p["start"],
+        "end": p["end"],
+        # Raw value intentionally omitted — only masked_value is returned to callers
+    }
+
+def action_for_risk(risk):
+    if risk == "HIGH":
+        return "BLOCK"
+    if risk == "MEDIUM":
+        return "WARN_AND_PROCESS"
+    return "PROCESS"
+
+def tag_segments(findings, segments):
+    """
+    Label findings that lie inside a structured segment (a PDF form field,
+    annotation or metadata value, see pdf_structure) with where they came
+    from: {"source", "label", "page"}.
+    """
+    for finding in findings:
+        for segment in segments:
+            if segment["start"] <= finding["start"] and finding["end"] <= segment["end"]:
+                finding["segment"] = {k: segment[k] for k in ("source", "label", "page")}
+                break
+    return findings
+
 
-def model_router(text):
-    pii = detect_pii(text)
+def model_router(text, mode="standard", use_cache=True, doc=None, segments=None):
+    """
+    Run PII detection on `text` and return the masked, risk-scored result.
+
+    `mode` selects the detection tier: "fast" (regex/checksums/keywords),
+    "standard" (adds Presidio) or "deep" (adds spaCy NER).
+
+    Finding offsets index `text` as given (it is not normalized), and a
+    pre-parsed `doc` must come from that same text. Results are served from
+    the result cache when possible.
+
+    `segments` (offsets into the same text) label the findings they
+    contain; the labels are added per call and never cached.
+    """
+    started = time.perf_counter()
+    text = text or ""
+    cache = get_cache() if use_cache else None
+    if cache is not None:
+        key = text_key(text, mode)
+        cached = cache.get(key)
+        if cached is not None:
+            cached["cached"] = True
+            cached["timings_ms"] = {"total": round((time.perf_counter() - started) * 1000, 2)}
+            if segments:
+                tag_segments(cached["detected_pii"], segments)
+            return cached
+
+    timings = {}
+    pii = detect_pii(text, mode=mode, timings=timings, doc=doc)
     risk, score = calculate_risk(pii)
 
-    masked = [
-        {
-            "type": p["type"],
-            "masked_value": mask_value(p["type"], p["value"]),
-            "confidence": p["confidence"],
-            "start": p["start"],
-            "end": p["end"],
-            # Raw value intentionally omitted — only masked_value is returned to callers
-        }
-        for p in pii
-    ]
+    masked = [mask_finding(p) for p in pii]
     
     # Generate education tips
     education = generate_privacy_education(masked, risk)
 
-    if risk == "HIGH":
-        action = "BLOCK"
-    elif risk == "MEDIUM":
-        action = "WARN_AND_PROCESS"
-    else:
-        action = "PROCESS"
-
-    return {
-        "action": action,
+    result = {
+        "action": action_for_risk(risk),
         "risk_level": risk,
         "risk_score": score,
         "detected_pii": masked,
-        "privacy_tips": education
+        "privacy_tips": education,
+        "mode": mode,
+        "cached": False,
     }
+    if cache is not None:
+        cache.set(key, result)
+    result["timings_ms"] = dict(timings, total=round((time.perf_counter() - started) * 1000, 2))
+    if segments:
+        tag_segments(masked, segments)
+    return result
@@ -0,0 +1,74 @@
+from collections import defaultdict
+
+
+class SpanIndex:
+    """
+    Interval index for overlap suppression in pii_engine.detect_pii.
+
+    Accepted hits are kept in fixed-width buckets keyed by start offset, so an
+    overlap query only visits the buckets a span can reach (bounded by the
+    longest accepted span) instead of every hit kept so far. Insertion order
+    is tracked so hits() returns exactly what the old list-based loop built.
+    """
+
+    BUCKET = 64
+
+    def __init__(self, priority):
+        self._priority = priority
+        self._buckets = defaultdict(list)  # start // BUCKET -> [(seq, hit)]
+        self._max_len = 0
+        self._seq = 0
+
+    def __len__(self):
+        return sum(len(b) for b in self._buckets.values())
+
+    def add(self, hit):
+        """Insert a hit unconditionally (e.g. Presidio results)."""
+        self._buckets[hit["start"] // self.BUCKET].append((self._seq, hit))
+        self._seq += 1
+        self._max_len = max(self._max_len, hit["end"] - hit["start"])
+
+    def overlapping(self, start, end):
+        """Return (bucket, entry) pairs for hits overlapping [start, end)."""
+        found = []
+        first = (start - self._max_len + 1) // self.BUCKET
+        last = (end - 1) // self.BUCKET
+        for key in range(first, last + 1):
+            bucket = self._buckets.get(key)
+            if not bucket:
+                continue
+            for entry in bucket:
+                f = entry[1]
+                if f["start"] < end and start < f["end"]:
+                    found.append((bucket, entry))
+        return found
+
+    def offer(self, hit):
+        """
+        Insert `hit` unless an overlapping hit outranks it.
+
+        An overlapping hit wins on higher priority, or on equal priority with
+        confidence >= hit's. Otherwise every overlapping hit is evicted.
+        Returns True if the hit was inserted.
+        """
+        rank = self._priority.get(hit["type"], 0)
+        conflicts = self.overlapping(hit["start"], hit["end"])
+
+        for _, (_, f) in conflicts:
+            rank_f = self._priority.get(f["type"], 0)
+            if rank_f > rank:
+                return False
+            if rank_f == rank and f.get("confidence", 0) >= hit["confidence"]:
+                return False
+
+        for bucket, entry in conflicts:
+            bucket.remove(entry)
+
+        self.add(hit)
+        return True
+
+    def hits(self):
+        """All kept hits in insertion order."""
+        entries = [e for b in self._buckets.values() for e in b]
+        entries.sort(key=lambda e: e[0])
+        return [hit for _, hit in entries]
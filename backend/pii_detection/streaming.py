@@ -0,0 +1,133 @@
+"""
+Incremental PII detection over a stream of text chunks (pages, windows).
+
+Only a bounded buffer is kept: the current chunk plus enough trailing text to
+give the next one its keyword context. Findings are yielded (masked) as soon
+as no later text can change them, de-duplicated across chunk boundaries, and
+the document risk is kept as a running aggregate.
+"""
+from .pii_engine import detect_pii
+from .privacy_educator import generate_privacy_education
+from .risk_engine import RiskAggregate
+from .router import action_for_risk, mask_finding
+
+CONTEXT_WINDOW = 40      # keyword_score window on each side of a candidate
+MAX_CANDIDATE_LEN = 64   # longest single candidate span we expect
+DEFAULT_OVERLAP = CONTEXT_WINDOW + MAX_CANDIDATE_LEN
+
+
+class PiiStream:
+    """
+    Feed text chunks in document order; each feed() returns the findings
+    that became final. Call close() after the last chunk.
+
+    Offsets in the findings are relative to the whole stream.
+    """
+
+    def __init__(self, mode="standard", overlap=DEFAULT_OVERLAP):
+        self.mode = mode
+        self.overlap = overlap
+        self.risk = RiskAggregate()
+        self.findings_count = 0
+        self.chars_processed = 0
+        self._buffer = ""
+        self._offset = 0      # stream offset of _buffer[0]
+        self._committed = 0   # findings starting before this are final
+        self._seen = set()
+        self._types = set()
+
+    def feed(self, chunk):
+        if not chunk:
+            return []
+        self._buffer += chunk
+        self.chars_processed += len(chunk)
+        return self._process(final=False)
+
+    def close(self):
+        return self._process(final=True)
+
+    def _process(self, final):
+        end = self._offset + len(self._buffer)
+        boundary = end if final else end - self.overlap
+        if boundary <= self._committed:
+            return []
+
+        hits = [
+            dict(h, start=h["start"] + self._offset, end=h["end"] + self._offset)
+            for h in detect_pii(self._buffer, mode=self.mode)
+        ]
+
+        # Never cut through a finding; it is re-detected with the next chunk
+        if not final:
+            moved = True
+            while moved:
+                moved = False
+                for h in hits:
+                    if h["start"] < boundary < h["end"]:
+                        boundary = h["start"]
+                        moved = True
+
+        ready = sorted(
+            (h for h in hits if self._committed <= h["start"] < boundary),
+            key=lambda h: h["start"]
+        )
+
+        out = []
+        for h in ready:
+            key = (h["type"], h["value"])
+            if key in self._seen:
+                continue
+            self._seen.add(key)
+            self._types.add(h["type"])
+            self.risk.add(h["type"], h["confidence"])
+            self.findings_count += 1
+            out.append(mask_finding(h))
+
+        self._committed = max(self._committed, boundary)
+        self._trim()
+        return out
+
+    def _trim(self):
+        # Keep CONTEXT_WINDOW chars before the commit point, widened back to a
+        # whitespace so the next scan never starts mid-token. Text with no
+        # whitespace near there (a base64 blob, a run of digits) is no single
+        # candidate: cut it hard rather than let the buffer grow with the stream
+        hard = min(self._committed - CONTEXT_WINDOW - 1 - self._offset, len(self._buffer) - self.overlap)
+        if hard <= 0:
+            return
+        cut = max(self._buffer.rfind(c, 0, hard) for c in " \n\t\r")
+        if cut < hard - MAX_CANDIDATE_LEN:
+            cut = hard
+        self._buffer = self._buffer[cut:]
+        self._offset += cut
+
+    def summary(self):
+        """model_router-style verdict for everything streamed so far."""
+        risk, score = self.risk.result()
+        return {
+            "action": action_for_risk(risk),
+            "risk_level": risk,
+            "risk_score": score,
+            "findings_count": self.findings_count,
+            "privacy_tips": generate_privacy_education([{"type": t} for t in self._types], risk),
+            "mode": self.mode,
+            "chars_processed": self.chars_processed,
+        }
+
+
+def stream_pii(chunks, mode="standard", overlap=DEFAULT_OVERLAP, stream=None):
+    """
+    Generator over masked findings for an iterable of text chunks.
+
+    Pass your own PiiStream as `stream` to read stream.summary() afterwards.
+    """
+    stream = stream or PiiStream(mode=mode, overlap=overlap)
+    for chunk in chunks:
+        yield from stream.feed(chunk)
+    yield from stream.close()
+
+
+def iter_windows(text, size=8192):
+    """Split an in-memory text into fixed-size chunks for stream_pii."""
+    for i in range(0, len(text), size):
+        yield text[i:i + size]
@@ -0,0 +1,64 @@
+"""
+Benchmark: model_router() in a loop vs. model_router_batch() on 1..N cores.
+
+Usage (from backend/):
+    python scripts/bench_batch_scaling.py [--docs 200] [--size-kb 5] [--mode standard] [--max-workers N]
+
+The result cache is bypassed so every run does the full detection work.
+Set PII_SPACY_MODEL to benchmark a model other than en_core_web_lg.
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_regex_scanner import make_document  # noqa: E402
+from pii_detection.batch import model_router_batch  # noqa: E402
+from pii_detection.router import model_router  # noqa: E402
+
+
+def _worker_counts(max_workers):
+    counts, n = [], 1
+    while n < max_workers:
+        counts.append(n)
+        n *= 2
+    return counts + [max_workers]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=200)
+    parser.add_argument("--size-kb", type=int, default=5)
+    parser.add_argument("--mode", choices=("fast", "standard", "deep"), default="standard")
+    parser.add_argument("--chunk-size", type=int, default=16)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    texts = [make_document(args.size_kb, seed=i) for i in range(args.docs)]
+
+    # Warm the in-process engines so the loop baseline excludes model load
+    model_router(texts[0], mode=args.mode, use_cache=False)
+    t0 = time.perf_counter()
+    for text in texts:
+        model_router(text, mode=args.mode, use_cache=False)
+    loop = time.perf_counter() - t0
+
+    print(f"{args.docs} docs x {args.size_kb} KB, mode={args.mode}, chunk={args.chunk_size}")
+    print(f"{'run':<16} {'seconds':>8} {'docs/s':>8} {'speedup':>8}")
+    print(f"{'loop':<16} {loop:>8.2f} {args.docs / loop:>8.1f} {1.0:>7.2f}x")
+
+    for workers in _worker_counts(args.max_workers):
+        # Includes pool start-up and per-worker engine load, as a nightly job would
+        t0 = time.perf_counter()
+        for _ in model_router_batch(texts, mode=args.mode, workers=workers,
+                                    chunk_size=args.chunk_size, use_cache=False):
+            pass
+        wall = time.perf_counter() - t0
+        print(f"{f'batch x{workers}':<16} {wall:>8.2f} {args.docs / wall:>8.1f} {loop / wall:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Benchmark: batch (NumPy) checksum validation vs. per-candidate Python loops.
+
+Usage (from backend/):
+    python scripts/bench_checksum_filter.py [--count 100000]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from pii_detection.aadhaar_validator import validate_aadhaar_checksum  # noqa: E402
+from pii_detection.checksum_filter import bin_known, luhn_valid, verhoeff_valid  # noqa: E402
+
+
+def luhn_scalar(value):
+    total = 0
+    for i, c in enumerate(reversed(value)):
+        d = int(c)
+        if i % 2:
+            d *= 2
+            if d > 9:
+                d -= 9
+        total += d
+    return total % 10 == 0
+
+
+def _time(fn, *args):
+    t0 = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - t0, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=100000)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    aadhaar = ["".join(rng.choice("0123456789") for _ in range(12)) for _ in range(args.count)]
+    cards = ["".join(rng.choice("0123456789") for _ in range(16)) for _ in range(args.count)]
+
+    rows = []
+    t_s, ref = _time(lambda v: [validate_aadhaar_checksum(x) for x in v], aadhaar)
+    t_v, got = _time(verhoeff_valid, aadhaar)
+    assert list(got) == ref
+    rows.append(("Verhoeff (12 digits)", t_s, t_v))
+
+    t_s, ref = _time(lambda v: [luhn_scalar(x) for x in v], cards)
+    t_v, got = _time(luhn_valid, cards)
+    assert list(got) == ref
+    rows.append(("Luhn (16 digits)", t_s, t_v))
+
+    t_v, _ = _time(bin_known, cards)
+    rows.append(("BIN prefix table", None, t_v))
+
+    print(f"{args.count} candidates")
+    print(f"{'check':<22} {'python ms':>10} {'numpy ms':>9} {'cand/s (numpy)':>15}")
+    for name, t_s, t_v in rows:
+        py = f"{t_s * 1000:.1f}" if t_s is not None else "-"
+        print(f"{name:<22} {py:>10} {t_v * 1000:>9.1f} {args.count / t_v:>15,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Benchmark: PDF parse / extraction through analysis.document.Document
+(in-memory bytes, parsed once) vs. the previous route_and_detect flow
+(upload copied to a NamedTemporaryFile, extract_pdf() on the path).
+
+Usage (from backend/):
+    python scripts/bench_document.py [--pages 1 10 50] [--repeat 5] [--pdf FILE ...]
+
+Synthetic PDFs hold scripts/pii_corpus.py text, ~45 lines per page; pass
+--pdf to measure real files instead. Reports the best wall time of
+--repeat runs and the tracemalloc peak of one run. Pages that need OCR are
+OCR'd identically by both flows, so set PII_OCR_CACHE_MAX_BYTES=0 when
+comparing scans.
+"""
+import argparse
+import io
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from analysis.document import Document  # noqa: E402
+from pii_corpus import make_document  # noqa: E402
+from pii_detection.pdf_extractor import extract_pdf  # noqa: E402
+
+LINES_PER_PAGE = 45
+
+
+def _escape(line):
+    return line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def make_pdf(n_pages, seed=0):
+    """Minimal text-only PDF (Helvetica, one content stream per page)."""
+    text, _ = make_document(n_pages * 3, seed=seed)
+    lines = [line[:95] for line in text.splitlines()]
+    objs = ["<< /Type /Catalog /Pages 2 0 R >>", None, "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for p in range(n_pages):
+        chunk = lines[p * LINES_PER_PAGE:(p + 1) * LINES_PER_PAGE] or ["(empty)"]
+        stream = "BT /F1 9 Tf 40 800 Td 12 TL " + " ".join(f"({_escape(line)}) '" for line in chunk) + " ET"
+        objs.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+        objs.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] /Contents {len(objs)} 0 R "
+            "/Resources << /Font << /F1 3 0 R >> >> >>"
+        )
+        kids.append(f"{len(objs)} 0 R")
+    objs[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {n_pages} >>"
+
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for i, obj in enumerate(objs, 1):
+        offsets.append(out.tell())
+        out.write(f"{i} 0 obj\n{obj}\nendobj\n".encode("latin-1", errors="replace"))
+    xref = out.tell()
+    out.write(f"xref\n0 {len(objs) + 1}\n0000000000 65535 f \n".encode())
+    for offset in offsets:
+        out.write(f"{offset:010d} 00000 n \n".encode())
+    out.write(f"trailer << /Size {len(objs) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF".encode())
+    return out.getvalue()
+
+
+def temp_file_flow(data):
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp:
+        tmp.write(data)
+        tmp_path = tmp.name
+    try:
+        return extract_pdf(tmp_path)["text"]
+    finally:
+        os.unlink(tmp_path)
+
+
+def document_flow(data):
+    with Document(data, name="bench.pdf") as document:
+        return document.text
+
+
+def measure(fn, data, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        text = fn(data)
+        best = min(best, time.perf_counter() - t0)
+    tracemalloc.start()
+    fn(data)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak, len(text)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, nargs="+", default=[1, 10, 50])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--pdf", nargs="+", help="measure these files instead of synthetic PDFs")
+    args = parser.parse_args()
+
+    if args.pdf:
+        inputs = [(os.path.basename(path), open(path, "rb").read()) for path in args.pdf]
+    else:
+        inputs = [(f"{n} pages", make_pdf(n, seed=n)) for n in args.pages]
+
+    print(f"{'input':<16} {'KB':>7} {'flow':<22} {'best ms':>9} {'peak MB':>8} {'chars':>8}")
+    for label, data in inputs:
+        for name, fn in (("temp file + path", temp_file_flow), ("Document (bytes)", document_flow)):
+            best, peak, chars = measure(fn, data, args.repeat)
+            print(f"{label:<16} {len(data) / 1024:>7.0f} {name:<22} {best * 1000:>9.1f} {peak / 1e6:>8.2f} {chars:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Benchmark: preparing one uploaded image for OCR and the ViT detector.
+
+Usage (from backend/):
+    python scripts/bench_image_decode.py [--repeat 5] [--image FILE ...]
+
+- temp files: the previous flow. The upload is written to a temp file for
+  cv2.imread (OCR) and again for PIL.Image.open (ViT), so it is decoded
+  twice.
+- shared decode: analysis.document.Document.image. It is decoded once by
+  cv2.imdecode over the upload buffer, and the same array is converted
+  for OCR (grayscale) and ViT (RGB).
+
+Both rows include the ViT processor's resize / normalise step
+(ViTImageProcessor defaults, no model download) but neither OCR nor
+inference. Synthetic inputs are 12 MP phone photos
+(scripts/bench_ocr_preprocess.make_photo) as JPEG and PNG. Reports the
+best wall time of --repeat runs and the tracemalloc peak of one run.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import cv2  # noqa: E402
+from PIL import Image  # noqa: E402
+from transformers import ViTImageProcessor  # noqa: E402
+
+from analysis.document import Document  # noqa: E402
+from analysis.image_detector import _to_rgb  # noqa: E402
+from bench_ocr_preprocess import make_photo  # noqa: E402
+
+processor = ViTImageProcessor()
+
+
+def _via_temp_file(data, suffix, reader):
+    with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
+        tmp.write(data)
+        path = tmp.name
+    try:
+        return reader(path)
+    finally:
+        os.unlink(path)
+
+
+def temp_files(data, suffix):
+    image = _via_temp_file(data, suffix, cv2.imread)
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    rgb = _via_temp_file(data, suffix, lambda path: Image.open(path).convert("RGB"))
+    return gray, processor(rgb, return_tensors="pt")
+
+
+def shared_decode(data, suffix):
+    document = Document(data, name="upload" + suffix)
+    gray = cv2.cvtColor(document.image, cv2.COLOR_BGR2GRAY)
+    return gray, processor(_to_rgb(document.image), return_tensors="pt")
+
+
+def measure(fn, data, suffix, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(data, suffix)
+        best = min(best, time.perf_counter() - t0)
+    tracemalloc.start()
+    fn(data, suffix)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--image", nargs="+", help="measure these files instead of synthetic photos")
+    args = parser.parse_args()
+
+    if args.image:
+        inputs = [(os.path.basename(p), open(p, "rb").read(), os.path.splitext(p)[1]) for p in args.image]
+    else:
+        photo = cv2.cvtColor(make_photo(0)[0], cv2.COLOR_GRAY2BGR)
+        inputs = [
+            ("12MP JPEG", cv2.imencode(".jpg", photo, [cv2.IMWRITE_JPEG_QUALITY, 90])[1].tobytes(), ".jpg"),
+            ("12MP PNG", cv2.imencode(".png", photo)[1].tobytes(), ".png"),
+        ]
+
+    print(f"{'input':<14} {'KB':>7} {'flow':<16} {'best ms':>9} {'peak MB':>8}")
+    for label, data, suffix in inputs:
+        for name, fn in (("temp files", temp_files), ("shared decode", shared_decode)):
+            best, peak = measure(fn, data, suffix, args.repeat)
+            print(f"{label:<14} {len(data) / 1024:>7.0f} {name:<16} {best * 1000:>9.1f} {peak / 1e6:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
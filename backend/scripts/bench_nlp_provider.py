@@ -0,0 +1,73 @@
+"""
+Report memory footprint and per-document latency of the shared spaCy
+pipeline (pii_detection.nlp_provider), pruned vs. full, for worker sizing.
+
+Usage (from backend/):
+    python scripts/bench_nlp_provider.py [--docs 50] [--size-kb 5]
+
+Each variant runs in its own subprocess so RSS numbers are not mixed.
+Set PII_SPACY_MODEL to benchmark a model other than en_core_web_lg.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, BACKEND_DIR)
+
+
+def _measure(variant, docs, size_kb):
+    from bench_regex_scanner import make_document
+    from pii_detection import nlp_provider
+
+    if variant == "full":
+        nlp_provider.DISABLED_COMPONENTS = ()
+        nlp_provider._stats["disabled_components"] = []
+
+    texts = [make_document(size_kb, seed=i) for i in range(docs)]
+    nlp_provider.get_nlp()
+
+    t0 = time.perf_counter()
+    for text in texts:
+        nlp_provider.parse(text)
+    wall = time.perf_counter() - t0
+
+    stats = nlp_provider.nlp_stats()
+    stats["variant"] = variant
+    stats["docs_per_sec"] = round(docs / wall, 2)
+    print(json.dumps(stats))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=50)
+    parser.add_argument("--size-kb", type=int, default=5)
+    parser.add_argument("--variant", choices=("pruned", "full"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.variant:
+        sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+        _measure(args.variant, args.docs, args.size_kb)
+        return
+
+    rows = []
+    for variant in ("pruned", "full"):
+        out = subprocess.run(
+            [sys.executable, __file__, "--variant", variant,
+             "--docs", str(args.docs), "--size-kb", str(args.size_kb)],
+            capture_output=True, text=True, check=True,
+        )
+        rows.append(json.loads(out.stdout.strip().splitlines()[-1]))
+
+    print(f"model: {rows[0]['model']}   docs: {args.docs} x {args.size_kb} KB")
+    print(f"{'variant':>8} {'load s':>7} {'rss MB':>7} {'ms/doc':>8} {'docs/s':>8}  pipeline")
+    for r in rows:
+        print(f"{r['variant']:>8} {r['load_seconds']:>7} {str(r['rss_delta_mb']):>7} "
+              f"{r['parse_ms_avg']:>8} {r['docs_per_sec']:>8}  {', '.join(r['pipeline'])}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Benchmark: OCR latency of the pii_detection.ocr_engine backends for 1, 10
+and 100 page images.
+
+Usage (from backend/):
+    python scripts/bench_ocr_backend.py [--counts 1 10 100] [--lang eng+hin]
+
+Rows:
+- pytesseract        one tesseract subprocess + temp files per page
+- tesserocr (fresh)  in-process, but a new handle (traineddata load) per page
+- tesserocr (pool)   ocr_engine.image_to_string with the persistent pool
+Backends that are not installed are skipped. Set TESSDATA_PREFIX for
+tesserocr and PII_OCR_POOL_SIZE to size the pool.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import numpy as np  # noqa: E402
+import pytesseract  # noqa: E402
+from PIL import Image, ImageDraw, ImageFont  # noqa: E402
+
+from pii_detection import ocr_engine  # noqa: E402
+
+LINES = [
+    "Aadhaar No: {d4} {d4} {d4}   DOB: {d2}/{d2}/19{d2}",
+    "Consumer No: {d10}   Bill No: {d8}",
+    "Mobile: 9{d9}   Email: user{d2}@example.com",
+    "Account Number {d14}   IFSC SBIN0{d6}",
+    "Amount payable Rs. {d4}.{d2} before due date",
+]
+
+
+def make_page(seed, width=1240, height=1754):
+    """A4 at 150 dpi with ~30 lines of bill / KYC text, as a grayscale array."""
+    rng = random.Random(seed)
+    digits = lambda n: "".join(rng.choice("0123456789") for _ in range(n))  # noqa: E731
+    img = Image.new("L", (width, height), 255)
+    draw = ImageDraw.Draw(img)
+    font = ImageFont.load_default(size=28)
+    for i in range(30):
+        line = rng.choice(LINES).format(d2=digits(2), d4=digits(4), d6=digits(6), d8=digits(8),
+                                        d9=digits(9), d10=digits(10), d14=digits(14))
+        draw.text((80, 80 + i * 52), line, fill=0, font=font)
+    return np.asarray(img)
+
+
+def _pytesseract(page, lang):
+    return pytesseract.image_to_string(page, lang=lang, config=f"--psm {ocr_engine.DEFAULT_PSM}")
+
+
+def _tesserocr_fresh(page, lang):
+    pool = ocr_engine.TesseractPool(lang, ocr_engine.DEFAULT_PSM, size=1)
+    api = pool._new_handle()
+    try:
+        height, width = page.shape
+        api.SetImageBytes(page.tobytes(), width, height, 1, width)
+        return api.GetUTF8Text()
+    finally:
+        api.End()
+
+
+def _tesserocr_pool(page, lang):
+    return ocr_engine.image_to_string(page, lang=lang)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--counts", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--lang", default=ocr_engine.DEFAULT_LANG)
+    args = parser.parse_args()
+
+    runners = []
+    if os.path.exists(pytesseract.pytesseract.tesseract_cmd):
+        runners.append(("pytesseract", _pytesseract))
+    else:
+        print(f"pytesseract skipped: no binary at {pytesseract.pytesseract.tesseract_cmd}")
+    if ocr_engine.tesserocr is not None:
+        runners.append(("tesserocr (fresh)", _tesserocr_fresh))
+        ocr_engine.OCR_BACKEND = "tesserocr"
+        runners.append(("tesserocr (pool)", _tesserocr_pool))
+    else:
+        print("tesserocr skipped: not installed")
+    if not runners:
+        sys.exit("No OCR backend available")
+
+    pages = [make_page(i) for i in range(max(args.counts))]
+    print(f"{'backend':<20} {'pages':>6} {'total s':>8} {'ms/page':>8}")
+    for name, fn in runners:
+        fn(pages[0], args.lang)  # first call pays pool / binary warm-up
+        for count in args.counts:
+            t0 = time.perf_counter()
+            for page in pages[:count]:
+                fn(page, args.lang)
+            wall = time.perf_counter() - t0
+            print(f"{name:<20} {count:>6} {wall:>8.2f} {wall / count * 1000:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
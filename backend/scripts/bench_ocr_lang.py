@@ -0,0 +1,71 @@
+"""
+Benchmark: OCR with a fixed language set vs. per-page script detection
+(ocr_engine.choose_lang) on a page corpus.
+
+Usage (from backend/):
+    python scripts/bench_ocr_lang.py [--pages 20] [--images-dir DIR] [--fixed eng+hin]
+
+Pages are synthetic English bills (scripts/bench_ocr_backend.make_page)
+unless --images-dir points at real page images (PNG/JPEG). Reports the
+language chosen per page, OSD overhead and the total time saved.
+"""
+import argparse
+import os
+import sys
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import cv2  # noqa: E402
+
+from bench_ocr_backend import make_page  # noqa: E402
+from pii_detection import ocr_engine  # noqa: E402
+
+
+def load_pages(images_dir, count):
+    if not images_dir:
+        return [(f"synthetic-{i}", make_page(i)) for i in range(count)]
+    names = sorted(n for n in os.listdir(images_dir) if n.lower().endswith((".png", ".jpg", ".jpeg")))
+    return [(n, cv2.imread(os.path.join(images_dir, n), cv2.IMREAD_GRAYSCALE)) for n in names[:count]]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=20)
+    parser.add_argument("--images-dir")
+    parser.add_argument("--fixed", default=ocr_engine.DEFAULT_LANG, help="language set used without detection")
+    args = parser.parse_args()
+
+    pages = load_pages(args.images_dir, args.pages)
+    # Warm both paths so handle initialisation is not counted
+    ocr_engine.image_to_string(pages[0][1], lang=args.fixed)
+    ocr_engine.image_to_string(pages[0][1], lang=ocr_engine.choose_lang(pages[0][1], lang="auto"))
+
+    t_fixed = t_osd = t_auto = 0.0
+    chosen = Counter()
+    for name, page in pages:
+        t0 = time.perf_counter()
+        ocr_engine.image_to_string(page, lang=args.fixed)
+        t_fixed += time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        lang = ocr_engine.choose_lang(page, lang="auto")
+        t1 = time.perf_counter()
+        ocr_engine.image_to_string(page, lang=lang)
+        t_auto += time.perf_counter() - t0
+        t_osd += t1 - t0
+        chosen[lang] += 1
+
+    n = len(pages)
+    print(f"{n} pages; chosen languages: {dict(chosen)}")
+    print(f"{'run':<22} {'total s':>8} {'ms/page':>8}")
+    print(f"{'fixed ' + args.fixed:<22} {t_fixed:>8.2f} {t_fixed / n * 1000:>8.1f}")
+    print(f"{'auto (incl. OSD)':<22} {t_auto:>8.2f} {t_auto / n * 1000:>8.1f}")
+    print(f"{'  of which OSD':<22} {t_osd:>8.2f} {t_osd / n * 1000:>8.1f}")
+    print(f"time saved: {t_fixed - t_auto:.2f} s ({(1 - t_auto / t_fixed) * 100:.0f}%)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Benchmark: OCR on raw uploads vs. after pii_detection.ocr_preprocess
+(document crop, deskew, rescale to a target text height).
+
+Usage (from backend/):
+    python scripts/bench_ocr_preprocess.py [--docs 10] [--lang eng] [--binarize]
+        [--images-dir DIR]
+
+Synthetic pages are labelled documents from scripts/pii_corpus.py rendered
+as phone photos: a white sheet with large text, rotated a few degrees and
+placed on a darker 12 MP background. Each page is OCRed twice (grayscale +
+3x3 blur only, the previous image_extractor path, and after preprocess)
+and reports pixels, OCR time and PII recall: labelled (type, value) pairs
+that detect_pii(mode="fast") finds in the OCR text. --images-dir pages are
+timed only (no labels).
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import cv2  # noqa: E402
+import numpy as np  # noqa: E402
+from PIL import Image, ImageDraw, ImageFont  # noqa: E402
+
+from pii_corpus import make_document  # noqa: E402
+from pii_detection import ocr_engine, ocr_preprocess  # noqa: E402
+from pii_detection.pii_engine import detect_pii  # noqa: E402
+
+
+def make_photo(seed, size_kb=0.6, frame=(4000, 3000), font_size=64):
+    """(grayscale photo, labelled spans) for one corpus document."""
+    rng = random.Random(seed)
+    text, spans = make_document(size_kb, seed=seed)
+    font = ImageFont.load_default(size=font_size)
+    lines = text.splitlines()
+    line_h = int(font_size * 1.5)
+    sheet_w = max(int(font.getlength(line)) for line in lines) + 2 * font_size
+    sheet = Image.new("L", (sheet_w, line_h * len(lines) + 2 * font_size), 250)
+    draw = ImageDraw.Draw(sheet)
+    for i, line in enumerate(lines):
+        draw.text((font_size, font_size + i * line_h), line, fill=20, font=font)
+    sheet = np.asarray(sheet)
+
+    fw, fh = frame
+    scale = min(1.0, 0.8 * fw / sheet.shape[1], 0.8 * fh / sheet.shape[0])
+    sheet = cv2.resize(sheet, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+    photo = np.full((fh, fw), rng.randint(60, 110), np.uint8)
+    sh, sw = sheet.shape
+    x, y = (fw - sw) // 2 + rng.randint(-100, 100), (fh - sh) // 2 + rng.randint(-100, 100)
+    photo[y:y + sh, x:x + sw] = sheet
+    rotation = cv2.getRotationMatrix2D((fw / 2, fh / 2), rng.uniform(-6, 6), 1.0)
+    photo = cv2.warpAffine(photo, rotation, (fw, fh), borderValue=int(photo[0, 0]))
+    noise = np.random.default_rng(seed).normal(0, 6, photo.shape)
+    return np.clip(photo + noise, 0, 255).astype(np.uint8), spans
+
+
+def recall(text, spans):
+    norm = lambda v: "".join(v.split())  # noqa: E731
+    found = {(h["type"], norm(h["value"])) for h in detect_pii(text, mode="fast")}
+    gold = {(s["type"], norm(s["value"])) for s in spans}
+    return len(gold & found), len(gold)
+
+
+def ocr(gray, lang):
+    t0 = time.perf_counter()
+    text = ocr_engine.image_to_string(gray, lang=lang, psm=6)
+    return text, time.perf_counter() - t0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=10)
+    parser.add_argument("--lang", default="eng")
+    parser.add_argument("--binarize", action="store_true")
+    parser.add_argument("--images-dir")
+    args = parser.parse_args()
+
+    if args.images_dir:
+        names = sorted(n for n in os.listdir(args.images_dir) if n.lower().endswith((".png", ".jpg", ".jpeg")))
+        pages = [(cv2.imread(os.path.join(args.images_dir, n), cv2.IMREAD_GRAYSCALE), None) for n in names[:args.docs]]
+    else:
+        pages = [make_photo(i) for i in range(args.docs)]
+
+    ocr(pages[0][0][:200, :200], args.lang)  # pool warm-up
+    totals = dict(px_raw=0, px_pre=0, t_raw=0.0, t_pre=0.0, t_prep=0.0, hit_raw=0, hit_pre=0, gold=0)
+    print(f"{'page':>4} {'raw MP':>7} {'pre MP':>7} {'scale':>6} {'skew':>5} {'crop':>5} "
+          f"{'raw ms':>7} {'pre ms':>7} {'recall raw':>10} {'recall pre':>10}")
+    for i, (page, spans) in enumerate(pages):
+        raw_text, t_raw = ocr(cv2.GaussianBlur(page, (3, 3), 0), args.lang)
+        stats = {}
+        pre = ocr_preprocess.preprocess(page, binarize_output=args.binarize, stats=stats)
+        pre_text, t_pre = ocr(pre, args.lang)
+
+        totals["px_raw"] += stats["pixels_in"]
+        totals["px_pre"] += stats["pixels_out"]
+        totals["t_raw"] += t_raw
+        totals["t_pre"] += t_pre
+        totals["t_prep"] += stats["ms"] / 1000
+        rec_raw = rec_pre = "-"
+        if spans is not None:
+            hit_raw, gold = recall(raw_text, spans)
+            hit_pre, _ = recall(pre_text, spans)
+            totals["hit_raw"] += hit_raw
+            totals["hit_pre"] += hit_pre
+            totals["gold"] += gold
+            rec_raw, rec_pre = f"{hit_raw}/{gold}", f"{hit_pre}/{gold}"
+        print(f"{i:>4} {stats['pixels_in'] / 1e6:>7.2f} {stats['pixels_out'] / 1e6:>7.2f} {stats['scale']:>6} "
+              f"{stats['deskew_deg']:>5} {str(stats['cropped']):>5} {t_raw * 1000:>7.0f} {t_pre * 1000:>7.0f} "
+              f"{rec_raw:>10} {rec_pre:>10}")
+
+    t = totals
+    print(f"pixels: {t['px_raw'] / 1e6:.1f} MP -> {t['px_pre'] / 1e6:.1f} MP "
+          f"({(1 - t['px_pre'] / t['px_raw']) * 100:.0f}% fewer)")
+    print(f"OCR time: {t['t_raw']:.2f} s -> {t['t_pre']:.2f} s + {t['t_prep']:.2f} s preprocessing "
+          f"(saved {t['t_raw'] - t['t_pre'] - t['t_prep']:.2f} s)")
+    if t["gold"]:
+        print(f"PII recall: raw {t['hit_raw'] / t['gold']:.3f}, preprocessed {t['hit_pre'] / t['gold']:.3f} "
+              f"({t['gold']} labelled values)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Benchmark: SpanIndex overlap suppression vs. the previous list-based loop
+from pii_engine.detect_pii.
+
+Usage (from backend/):
+    python scripts/bench_overlap_index.py [--counts 1000 5000 10000 50000]
+
+Candidates are synthetic regex hits laid out like a long statement: runs of
+numeric spans that come back as several overlapping entity types. Both
+implementations must produce the same hits in the same order.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from pii_detection.span_index import SpanIndex  # noqa: E402
+
+# Mirrors pii_engine.PII_PRIORITY for the entity types generated below
+# (pii_engine itself loads Presidio at import time).
+PRIORITY = {
+    "AADHAAR": 5, "CREDIT_DEBIT_CARD": 5, "CVV": 5, "UPI_ID": 4,
+    "BANK_ACCOUNT": 3, "DOB": 3, "PHONE": 2, "EMAIL": 2, "UTILITY_ACCOUNT": 2,
+}
+TYPES = list(PRIORITY)
+
+
+def make_candidates(count, seed=0):
+    rng = random.Random(seed)
+    presidio, regex = [], []
+    pos = 0
+    while len(regex) < count:
+        length = rng.choice((3, 10, 11, 12, 14, 16, 19))
+        # Same span reported as several types, like numeric regex hits
+        for _ in range(rng.randint(1, 4)):
+            regex.append({
+                "type": rng.choice(TYPES),
+                "value": "x" * length,
+                "confidence": rng.choice((0.7, 0.8, 0.9)),
+                "start": pos + rng.randint(0, 2),
+                "end": pos + length,
+            })
+        if rng.random() < 0.05:
+            presidio.append({
+                "type": rng.choice(("PHONE", "EMAIL")), "value": "p" * length,
+                "confidence": 0.85, "start": pos, "end": pos + length, "source": "presidio",
+            })
+        pos += length + rng.randint(1, 30)
+    return presidio, regex[:count]
+
+
+def resolve_linear(presidio, regex):
+    final_hits = list(presidio)
+    for h in regex:
+        is_suppressed = False
+        to_remove = []
+        for f in final_hits:
+            if not (h["end"] <= f["start"] or f["end"] <= h["start"]):
+                priority_f = PRIORITY.get(f["type"], 0)
+                priority_h = PRIORITY.get(h["type"], 0)
+                if priority_f > priority_h:
+                    is_suppressed = True
+                    break
+                elif priority_f == priority_h:
+                    if f.get("confidence", 0) >= h["confidence"]:
+                        is_suppressed = True
+                        break
+                    else:
+                        to_remove.append(f)
+                else:
+                    to_remove.append(f)
+        if is_suppressed:
+            continue
+        for f in to_remove:
+            final_hits.remove(f)
+        final_hits.append(h)
+    return final_hits
+
+
+def resolve_indexed(presidio, regex):
+    index = SpanIndex(PRIORITY)
+    for h in presidio:
+        index.add(h)
+    for h in regex:
+        index.offer(h)
+    return index.hits()
+
+
+def _time(fn, *args):
+    t0 = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - t0, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--counts", type=int, nargs="+", default=[1000, 5000, 10000, 20000, 50000])
+    parser.add_argument("--skip-linear-above", type=int, default=50000,
+                        help="don't run the quadratic baseline above this many candidates")
+    args = parser.parse_args()
+
+    print(f"{'candidates':>10} {'kept':>7} {'linear ms':>11} {'indexed ms':>11} {'speedup':>8}")
+    for count in args.counts:
+        presidio, regex = make_candidates(count, seed=count)
+        t_new, new = _time(resolve_indexed, presidio, regex)
+
+        if count > args.skip_linear_above:
+            print(f"{count:>10} {len(new):>7} {'-':>11} {t_new * 1000:>11.1f} {'-':>8}")
+            continue
+
+        t_old, old = _time(resolve_linear, presidio, regex)
+        if old != new:
+            sys.exit(f"Output mismatch at {count} candidates")
+        print(f"{count:>10} {len(new):>7} {t_old * 1000:>11.1f} {t_new * 1000:>11.1f} {t_old / t_new:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Benchmark: PDF text layer backends of pii_detection.pdf_extractor
+(pypdfium2, pdfplumber, pypdf) by page count, plus page rendering for OCR
+(pypdfium2 in-process vs. pdf2image / Poppler subprocess, when installed).
+
+Usage (from backend/):
+    python scripts/bench_pdf_backends.py [--pages 1 10 100] [--repeat 3] [--render-pages 5]
+
+Text PDFs come from scripts/bench_document.make_pdf (pii_corpus text).
+Each row is the best of --repeat full passes over the text layer
+(pdf_extractor._text_pages, including pypdfium2's pdfplumber fallback for
+layout-sensitive pages); "fallback" counts pages that took it.
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_document import make_pdf  # noqa: E402
+from pii_detection import pdf_extractor  # noqa: E402
+
+
+def time_backend(data, backend, repeat):
+    best, chars, fallback = float("inf"), 0, 0
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        pages = list(pdf_extractor._text_pages(data, backend))
+        best = min(best, time.perf_counter() - t0)
+    chars = sum(len(p[1] or "") for p in pages)
+    fallback = sum(1 for p in pages if p[5] != backend)
+    return best, chars, fallback
+
+
+def time_render(data, n_pages):
+    rows = []
+    t0 = time.perf_counter()
+    for page_num in range(1, n_pages + 1):
+        with pdf_extractor._rendered_page(data, page_num) as pixels:
+            pixels.sum()
+    rows.append(("pypdfium2", time.perf_counter() - t0))
+    try:
+        from pdf2image import convert_from_bytes
+        t0 = time.perf_counter()
+        for page_num in range(1, n_pages + 1):
+            convert_from_bytes(data, dpi=pdf_extractor.OCR_DPI, first_page=page_num, last_page=page_num)
+        rows.append(("pdf2image/poppler", time.perf_counter() - t0))
+    except Exception as e:
+        print(f"pdf2image/poppler skipped: {e.__class__.__name__}")
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--render-pages", type=int, default=5)
+    args = parser.parse_args()
+
+    backends = list(pdf_extractor.TEXT_BACKENDS)
+    print("Text layer (ms, best of --repeat)")
+    print(f"{'pages':>6} " + " ".join(f"{b:>12}" for b in backends) + f" {'fallback':>9}")
+    for n in args.pages:
+        data = make_pdf(n, seed=n)
+        results = {b: time_backend(data, b, args.repeat) for b in backends}
+        chars = {b: r[1] for b, r in results.items()}
+        if len(set(chars.values())) > 1:
+            print(f"       note: characters extracted differ {chars}")
+        print(f"{n:>6} " + " ".join(f"{results[b][0] * 1000:>12.1f}" for b in backends)
+              + f" {results['pypdfium2'][2]:>9}")
+
+    n = args.render_pages
+    print(f"\nRendering {n} pages at {pdf_extractor.OCR_DPI} dpi for OCR")
+    for name, wall in time_render(make_pdf(n), n):
+        print(f"{name:<18} {wall:>8.2f} s {wall / n * 1000:>8.1f} ms/page")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+"""
+Throughput and accuracy regression benchmark for pii_detection.detect_pii.
+
+Usage (from backend/):
+    python scripts/bench_pii_engine.py [--mode standard] [--sizes-kb 1 10 100 1024 5120]
+        [--eval-docs 200] [--save-baseline bench.json | --baseline bench.json]
+
+Documents come from scripts/pii_corpus.py (deterministic, labelled spans):
+- throughput: docs/sec, MB/s and per-stage timings (nlp, presidio, regex,
+  ner) at each document size
+- accuracy: precision / recall / F1 per entity type on --eval-docs labelled
+  documents; a hit is correct when type and value match a labelled span it
+  overlaps (the engine reports each (type, value) once per document)
+
+Exits non-zero when micro F1 is below --min-f1, or, given --baseline, when
+throughput drops more than --max-slowdown or any F1 more than --max-f1-drop.
+Set PII_SPACY_MODEL to benchmark a model other than en_core_web_lg.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from collections import defaultdict
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from pii_corpus import make_corpus, make_document  # noqa: E402
+from pii_detection.pii_engine import detect_pii  # noqa: E402
+
+STAGES = ("nlp", "presidio", "regex", "ner")
+
+
+def measure_throughput(mode, size_kb, min_seconds):
+    text, _ = make_document(size_kb, seed=size_kb)
+    if mode != "fast":
+        from pii_detection.nlp_provider import get_nlp
+        if len(text) > get_nlp().max_length:
+            return None
+        detect_pii(text[:1024], mode=mode)  # warm up engines
+
+    runs, wall, stages = 0, 0.0, defaultdict(float)
+    while runs == 0 or wall < min_seconds:
+        timings = {}
+        t0 = time.perf_counter()
+        detect_pii(text, mode=mode, timings=timings)
+        wall += time.perf_counter() - t0
+        runs += 1
+        for stage, ms in timings.items():
+            stages[stage] += ms
+    return {
+        "docs_per_sec": runs / wall,
+        "mb_per_sec": runs * len(text) / wall / 1e6,
+        "stages_ms": {s: stages[s] / runs for s in STAGES if s in stages},
+    }
+
+
+def score_document(spans, hits, counts):
+    gold = defaultdict(list)
+    for s in spans:
+        gold[(s["type"], s["value"])].append((s["start"], s["end"]))
+    matched = set()
+    for h in hits:
+        key = (h["type"], h["value"])
+        if key not in matched and any(h["start"] < e and s < h["end"] for s, e in gold.get(key, ())):
+            matched.add(key)
+            counts[h["type"]]["tp"] += 1
+        else:
+            counts[h["type"]]["fp"] += 1
+    for key in gold.keys() - matched:
+        counts[key[0]]["fn"] += 1
+
+
+def _prf(c):
+    p = c["tp"] / (c["tp"] + c["fp"]) if c["tp"] + c["fp"] else 0.0
+    r = c["tp"] / (c["tp"] + c["fn"]) if c["tp"] + c["fn"] else 0.0
+    f1 = 2 * p * r / (p + r) if p + r else 0.0
+    return p, r, f1
+
+
+def measure_accuracy(mode, n_docs, size_kb):
+    counts = defaultdict(lambda: {"tp": 0, "fp": 0, "fn": 0})
+    for text, spans in make_corpus(n_docs, size_kb):
+        score_document(spans, detect_pii(text, mode=mode), counts)
+    total = {k: sum(c[k] for c in counts.values()) for k in ("tp", "fp", "fn")}
+    rows = {t: dict(c, **dict(zip(("precision", "recall", "f1"), _prf(c)))) for t, c in sorted(counts.items())}
+    rows["micro"] = dict(total, **dict(zip(("precision", "recall", "f1"), _prf(total))))
+    return rows
+
+
+def check(report, baseline, args):
+    failures = []
+    micro = report["accuracy"]["micro"]["f1"]
+    if micro < args.min_f1:
+        failures.append(f"micro F1 {micro:.3f} < --min-f1 {args.min_f1}")
+    if not baseline:
+        return failures
+    if baseline.get("mode") != report["mode"]:
+        return failures + [f"baseline mode {baseline.get('mode')} != {report['mode']}"]
+
+    for size, old in baseline["throughput"].items():
+        new = report["throughput"].get(size)
+        if old and new and new["docs_per_sec"] < old["docs_per_sec"] * (1 - args.max_slowdown):
+            failures.append(
+                f"{size} KB: {new['docs_per_sec']:.2f} docs/s vs baseline {old['docs_per_sec']:.2f}"
+            )
+    for pii_type, old in baseline["accuracy"].items():
+        new = report["accuracy"].get(pii_type, {"f1": 0.0})
+        if new["f1"] < old["f1"] - args.max_f1_drop:
+            failures.append(f"{pii_type}: F1 {new['f1']:.3f} vs baseline {old['f1']:.3f}")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mode", choices=("fast", "standard", "deep"), default="standard")
+    parser.add_argument("--sizes-kb", type=int, nargs="+", default=[1, 10, 100, 1024, 5120])
+    parser.add_argument("--min-seconds", type=float, default=2.0, help="time budget per size")
+    parser.add_argument("--eval-docs", type=int, default=200)
+    parser.add_argument("--eval-kb", type=int, default=2)
+    parser.add_argument("--min-f1", type=float, default=0.9)
+    parser.add_argument("--max-slowdown", type=float, default=0.25)
+    parser.add_argument("--max-f1-drop", type=float, default=0.02)
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--baseline", help="fail on regressions against this report")
+    group.add_argument("--save-baseline", help="write this run's report as a baseline")
+    args = parser.parse_args()
+
+    report = {"mode": args.mode, "throughput": {}, "accuracy": {}}
+
+    print(f"mode={args.mode}")
+    print(f"{'size KB':>8} {'docs/s':>9} {'MB/s':>7} " + " ".join(f"{s + ' ms':>12}" for s in STAGES))
+    for size in args.sizes_kb:
+        row = measure_throughput(args.mode, size, args.min_seconds)
+        report["throughput"][str(size)] = row
+        if row is None:
+            print(f"{size:>8} {'skipped: exceeds spaCy max_length':>40}")
+            continue
+        stages = " ".join(
+            f"{row['stages_ms'][s]:>12.2f}" if s in row["stages_ms"] else f"{'-':>12}" for s in STAGES
+        )
+        print(f"{size:>8} {row['docs_per_sec']:>9.2f} {row['mb_per_sec']:>7.2f} {stages}")
+
+    report["accuracy"] = measure_accuracy(args.mode, args.eval_docs, args.eval_kb)
+    print(f"\n{args.eval_docs} labelled docs x {args.eval_kb} KB")
+    print(f"{'type':<18} {'tp':>6} {'fp':>6} {'fn':>6} {'precision':>10} {'recall':>7} {'f1':>6}")
+    for pii_type, r in report["accuracy"].items():
+        print(f"{pii_type:<18} {r['tp']:>6} {r['fp']:>6} {r['fn']:>6} "
+              f"{r['precision']:>10.3f} {r['recall']:>7.3f} {r['f1']:>6.3f}")
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nBaseline written to {args.save_baseline}")
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    failures = check(report, baseline, args)
+    if failures:
+        print("\nREGRESSION:")
+        for failure in failures:
+            print(f"  - {failure}")
+        sys.exit(1)
+    print("\nOK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Benchmark: single-pass CandidateScanner vs. one re.finditer pass per pattern.
+
+Usage (from backend/):
+    python scripts/bench_regex_scanner.py [--sizes 10 50 200] [--repeat 20]
+
+Sizes are in KB of synthetic bank-statement / utility-bill text. Every run
+first checks that both implementations return identical candidates.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from pii_detection.regex_patterns import (  # noqa: E402
+    CandidateScanner,
+    regex_candidates,
+    regex_candidates_multipass,
+)
+
+LINES = [
+    "{d2}/{d2}/2024  UPI/{d12}/PAYMENT TO MERCHANT  {amt}  Cr  {amt}",
+    "{d2}-{d2}-2024  NEFT-{d16}-SALARY CREDIT        {amt}  Dr  {amt}",
+    "Consumer No: {d10}   Bill No: {d8}   Meter No: {d9}",
+    "Account Number {d14}  IFSC SBIN0{d6}  Branch Code {d4}",
+    "Aadhaar {d4} {d4} {d4}  DOB {d2}/{d2}/19{d2}  Mobile {mob}",
+    "Paid via rahul.{d3}@ybl  ref {d12}  contact support@example.com",
+    "Registered mobile 9******{d2}  email ra***@gm**.com  PAN AB****{d1}C",
+    "Previous reading {d5}  Current reading {d5}  Units {d3}  Amount Rs. {amt}",
+]
+
+
+def _digits(rng, n):
+    return "".join(rng.choice("0123456789") for _ in range(n))
+
+
+def make_document(size_kb, seed=0):
+    rng = random.Random(seed)
+    out, total = [], 0
+    while total < size_kb * 1024:
+        line = rng.choice(LINES).format(
+            d1=_digits(rng, 1), d2=_digits(rng, 2), d3=_digits(rng, 3), d4=_digits(rng, 4),
+            d5=_digits(rng, 5), d6=_digits(rng, 6), d8=_digits(rng, 8), d9=_digits(rng, 9),
+            d10=_digits(rng, 10), d12=_digits(rng, 12), d14=_digits(rng, 14),
+            d16=_digits(rng, 16), mob=rng.choice("6789") + _digits(rng, 9),
+            amt=f"{rng.randint(1, 99999)}.{_digits(rng, 2)}",
+        )
+        out.append(line)
+        total += len(line) + 1
+    return "\n".join(out)
+
+
+def _time(fn, text, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(text)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 50, 200])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    aadhaar_only = CandidateScanner(["AADHAAR", "VID"]).scan
+
+    print(f"{'size':>7} {'candidates':>10} {'multipass ms':>13} {'scanner ms':>11} {'speedup':>8} {'aadhaar+vid ms':>15}")
+    for size in args.sizes:
+        text = make_document(size, seed=size)
+        expected = regex_candidates_multipass(text)
+        if regex_candidates(text) != expected:
+            sys.exit(f"Output mismatch at {size} KB")
+
+        t_old = _time(regex_candidates_multipass, text, args.repeat)
+        t_new = _time(regex_candidates, text, args.repeat)
+        t_sub = _time(aadhaar_only, text, args.repeat)
+        print(f"{size:>5}KB {len(expected):>10} {t_old * 1000:>13.2f} {t_new * 1000:>11.2f} "
+              f"{t_old / t_new:>7.2f}x {t_sub * 1000:>15.2f}")
+
+
+if __name__ == "__main__":
+    main()
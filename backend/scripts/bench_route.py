@@ -0,0 +1,143 @@
+"""
+Benchmark: analysis.router.route_and_detect end to end, and how long each
+request holds the database transaction.
+
+Usage (from backend/):
+    python scripts/bench_route.py [--repeat 5] [--random-weights]
+
+Uploads: a scanned KYC page as PNG (OCR + PII and the ViT deepfake
+detector) and a plain text file (PII + perplexity). "db lock" is the span
+from the request's first SQL statement to its last, which is when the
+transaction is open: with detectors run inside transaction.atomic() it
+covers the whole detection, now only the inserts. Compare
+PII_DETECTOR_WORKERS=1 (detectors one after another) with the default
+(concurrent; needs more than one core to pay off).
+The KYC page is HIGH once its PII is found, so the detector cascade
+skips perplexity and the ViT on it (analysis/detectors/registry.py).
+
+Runs on an in-memory SQLite database whose tables are created directly
+from the models. Uses the real ViT / distilgpt2 weights when they can be
+loaded; otherwise, or with --random-weights, randomly initialised models of
+the same architecture (same compute, meaningless scores). Set
+TESSDATA_PREFIX for tesserocr.
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
+os.environ.setdefault("SECRET_KEY", "bench")
+os.environ["DATABASE_URL"] = "sqlite://:memory:"
+
+import django  # noqa: E402
+
+django.setup()
+
+import cv2  # noqa: E402
+import torch  # noqa: E402
+from django.apps import apps  # noqa: E402
+from django.contrib.auth.models import AnonymousUser  # noqa: E402
+from django.core.files.uploadedfile import SimpleUploadedFile  # noqa: E402
+from django.db import connection  # noqa: E402
+
+from analysis import image_detector  # noqa: E402
+from analysis import router  # noqa: E402
+from bench_ocr_backend import make_page  # noqa: E402
+from core.ai_detection import pdf_text_detector  # noqa: E402
+from pii_corpus import make_document  # noqa: E402
+
+
+class _ByteTokenizer:
+    """Stand-in for the GPT-2 tokenizer: one token per UTF-8 byte."""
+
+    def __call__(self, text, return_tensors=None):
+        return SimpleNamespace(input_ids=torch.tensor([list(text.encode("utf-8"))]))
+
+
+def load_models(random_weights):
+    if not random_weights:
+        try:
+            image_detector.get_resources()
+            if pdf_text_detector._load_model_safely():
+                return "pretrained"
+        except Exception as e:
+            print(f"pretrained models unavailable ({e.__class__.__name__}), using random weights")
+    from transformers import GPT2Config, GPT2LMHeadModel, ViTConfig, ViTForImageClassification, ViTImageProcessor
+    image_detector.processor = ViTImageProcessor()
+    image_detector.model = ViTForImageClassification(ViTConfig(num_labels=2)).eval()
+    pdf_text_detector.tokenizer = _ByteTokenizer()
+    # distilgpt2: GPT-2 small with 6 layers
+    pdf_text_detector.model = GPT2LMHeadModel(GPT2Config(n_layer=6)).eval()
+    return "random weights"
+
+
+def create_tables():
+    with connection.schema_editor() as editor:
+        for model in apps.get_models():
+            editor.create_model(model)
+
+
+class LockSpan:
+    """execute_wrapper recording the first and last SQL statement of a request."""
+
+    def __init__(self):
+        self.first = self.last = None
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.first = self.first or start
+            self.last = time.perf_counter()
+
+
+def run(name, data, repeat):
+    walls, locks = [], []
+    for i in range(repeat + 1):
+        span = LockSpan()
+        t0 = time.perf_counter()
+        with connection.execute_wrapper(span):
+            router.route_and_detect(
+                user=AnonymousUser(), uploaded_file=SimpleUploadedFile(name, data),
+                metadata={"run": i}, pii_mode="fast", force_rescan=True,
+            )
+        if i:  # the first run loads models and warms caches
+            walls.append(time.perf_counter() - t0)
+            locks.append(span.last - span.first)
+    return statistics.median(walls), statistics.median(locks)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--random-weights", action="store_true")
+    args = parser.parse_args()
+
+    # Every run does the full work: no result or OCR cache
+    os.environ["PII_CACHE_MAX_BYTES"] = "0"
+    os.environ["PII_OCR_CACHE_MAX_BYTES"] = "0"
+    weights = load_models(args.random_weights)
+    create_tables()
+
+    page = make_page(0)
+    uploads = [
+        ("kyc.png", cv2.imencode(".png", page)[1].tobytes()),
+        ("notes.txt", make_document(4, seed=1)[0].encode("utf-8")),
+    ]
+    workers = getattr(router, "DETECTOR_WORKERS", 1)
+    print(f"models: {weights}; detector workers: {workers}; median of {args.repeat}")
+    print(f"{'upload':<10} {'KB':>6} {'end-to-end ms':>14} {'db lock ms':>11}")
+    for name, data in uploads:
+        wall, lock = run(name, data, args.repeat)
+        print(f"{name:<10} {len(data) / 1024:>6.0f} {wall * 1000:>14.1f} {lock * 1000:>11.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -10,23 +10,6 @@ def log_status(name, ok, msg=""):
     icon = "✅" if ok else "❌"
     print(f"{icon} {color}{name.upper():<15}{reset}: {msg}")
 
-def check_poppler():
-    # Poppler Check
-    poppler_roots = [r"C:\poppler", r"C:\Program Files\poppler", r"C:\Program Files (x86)\poppler"]
-    found_bin = None
-    for root in poppler_roots:
-        for b in ["Library\\bin", "bin", ""]:
-            p = os.path.join(root, b)
-            if os.path.exists(os.path.join(p, "pdftoppm.exe")):
-                found_bin = p
-                break
-        if found_bin: break
-    
-    if found_bin:
-        log_status("Poppler", True, f"Found at {found_bin}")
-    else:
-        log_status("Poppler", False, "Missing pdftoppm.exe! OCR will fail. Please download binaries from https://github.com/oschwartz10612/poppler-windows/releases")
-
 def check_tesseract():
     t_path = r"C:\Program Files\Tesseract-OCR\tesseract.exe"
     if os.path.exists(t_path):
@@ -53,7 +36,7 @@ def check_env():
         log_status("Env File", False, "backend/.env missing!")
 
 def check_python_deps():
-    deps = ["pdfplumber", "pdf2image", "pytesseract", "groq", "django"]
+    deps = ["pdfplumber", "pypdfium2", "pytesseract", "groq", "django"]
     for d in deps:
         try:
             __import__(d)
@@ -69,7 +52,6 @@ if __name__ == "__main__":
     print(f"Python: {sys.version.split()[0]}")
     print("-"*40)
     
-    check_poppler()
     check_tesseract()
     check_env()
     check_python_deps()
@@ -0,0 +1,185 @@
+"""
+Deterministic synthetic Indian-document corpus with labelled PII spans.
+
+Used by scripts/bench_pii_engine.py. Documents mix KYC / bank / utility-bill
+records (valid Aadhaar and VIDs, PANs, UPI IDs on UPI_HANDLES, masked bill
+fields, utility account numbers, ...) with decoys the engine must reject:
+invalid Verhoeff or PAN structure, Luhn failures and numbers sitting next
+to NEGATIVE_KEYWORDS such as transaction IDs.
+
+Each record is preceded by a keyword-free filler line longer than the
+keyword window, so a record's context never leaks into its neighbours.
+"""
+import random
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from pii_detection.aadhaar_validator import (  # noqa: E402
+    INVERSE_TABLE,
+    MULTIPLICATION_TABLE,
+    PERMUTATION_TABLE,
+)
+from pii_detection.keyword_context import (  # noqa: E402
+    NEGATIVE_KEYWORDS,
+    SENSITIVE_KEYWORDS,
+    UTILITY_KEYWORDS,
+)
+from pii_detection.regex_patterns import UPI_HANDLES  # noqa: E402
+
+HANDLES = UPI_HANDLES.split("|")
+NAMES = ["rahul", "priya", "amit", "neha", "vikram", "sneha", "arjun", "kavya"]
+FILLER_WORDS = [
+    "lorem", "ipsum", "dolor", "sit", "amet", "tempor", "magna", "aliqua",
+    "veniam", "nostrud", "ullamco", "laboris", "nisi", "aliquip", "commodo",
+    "consequat", "dolore", "fugiat", "nulla", "lectus",
+]
+FILLER_MIN_LEN = 48  # > keyword_context window (40)
+
+
+def _check_filler():
+    keywords = set(UTILITY_KEYWORDS)
+    for table in (SENSITIVE_KEYWORDS, NEGATIVE_KEYWORDS):
+        for kws in table.values():
+            keywords.update(kws)
+    for word in FILLER_WORDS:
+        for other in FILLER_WORDS:
+            joined = f"{word} {other}"
+            bad = [k for k in keywords if k in joined]
+            assert not bad, f"filler '{joined}' contains keyword {bad}"
+
+
+_check_filler()
+
+
+def _digits(rng, n, first="0123456789"):
+    return rng.choice(first) + "".join(rng.choice("0123456789") for _ in range(n - 1))
+
+
+def verhoeff_digit(number):
+    """Check digit that makes `number` + digit pass the Verhoeff check."""
+    c = 0
+    for i, d in enumerate(reversed(number)):
+        c = MULTIPLICATION_TABLE[c][PERMUTATION_TABLE[(i + 1) % 8][int(d)]]
+    return str(INVERSE_TABLE[c])
+
+
+def luhn_digit(number):
+    total = 0
+    for i, d in enumerate(reversed(number)):
+        d = int(d)
+        if i % 2 == 0:
+            d *= 2
+            if d > 9:
+                d -= 9
+        total += d
+    return str((10 - total % 10) % 10)
+
+
+def _group4(number):
+    return " ".join(number[i:i + 4] for i in range(0, len(number), 4))
+
+
+def aadhaar(rng, valid=True):
+    body = _digits(rng, 11, first="23456789")
+    check = verhoeff_digit(body)
+    if not valid:
+        check = str((int(check) + rng.randint(1, 9)) % 10)
+    return _group4(body + check)
+
+
+def vid(rng):
+    body = _digits(rng, 15, first="23456789")
+    return _group4(body + verhoeff_digit(body))
+
+
+# One prefix per network, including those nested in another's range
+# (RuPay 60 / Discover 6011, Maestro 50 / RuPay 508)
+CARD_PREFIXES = ["4", "52", "2221", "60", "6011", "65", "508", "509", "62", "3530"]
+
+
+def card(rng, valid=True):
+    prefix = rng.choice(CARD_PREFIXES)
+    body = prefix + _digits(rng, 15 - len(prefix))
+    check = luhn_digit(body)
+    if not valid:
+        check = str((int(check) + rng.randint(1, 9)) % 10)
+    return _group4(body + check)
+
+
+def pan(rng, valid=True):
+    letters = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+    holder = rng.choice("PCHF") if valid else rng.choice("DEIKMNOQRSUVWXYZ")
+    return (
+        "".join(rng.choice(letters) for _ in range(3)) + holder + rng.choice(letters)
+        + _digits(rng, 4) + rng.choice(letters)
+    )
+
+
+def _date(rng, year_from, year_to):
+    return f"{rng.randint(1, 28):02d}/{rng.randint(1, 12):02d}/{rng.randint(year_from, year_to)}"
+
+
+# Each record returns a list of pieces: plain text, or (TYPE, value) for a
+# labelled span. Decoys are plain text only.
+RECORDS = {
+    "aadhaar": lambda r: ["Aadhaar No: ", ("AADHAAR", aadhaar(r))],
+    "aadhaar_bare": lambda r: ["Holder number ", ("AADHAAR", aadhaar(r))],
+    "vid": lambda r: ["VID: ", ("VID", vid(r))],
+    "pan": lambda r: ["Permanent account holder PAN ", ("PAN", pan(r))],
+    "upi": lambda r: ["Pay to ", ("UPI_ID", f"{r.choice(NAMES)}.{_digits(r, 3)}@{r.choice(HANDLES)}"), " now"],
+    "card": lambda r: ["Card number ", ("CREDIT_DEBIT_CARD", card(r))],
+    "bank": lambda r: ["Bank account ", ("BANK_ACCOUNT", _digits(r, 14, first="123456789"))],
+    "phone": lambda r: ["Mobile: ", ("PHONE", _digits(r, 10, first="6789"))],
+    "email": lambda r: ["Email: ", ("EMAIL", f"{r.choice(NAMES)}{_digits(r, 2)}@example.com"), " today"],
+    "dob": lambda r: ["Date of Birth: ", ("DOB", _date(r, 1950, 2005))],
+    "utility": lambda r: ["Consumer No: ", ("UTILITY_ACCOUNT", _digits(r, 10, first="12345"))],
+    "masked_phone": lambda r: ["Registered mobile ", ("MASKED_PHONE", f"{_digits(r, 1, first='6789')}******{_digits(r, 2)}")],
+    "masked_email": lambda r: ["Registered email ", ("MASKED_EMAIL", f"{r.choice(NAMES)[:2]}***@gm**.com"), " only"],
+    "masked_pan": lambda r: ["Linked PAN ", ("MASKED_PAN", f"{pan(r)[:2]}****{_digits(r, 1)}{pan(r)[-1]}")],
+    # Decoys
+    "decoy_aadhaar_checksum": lambda r: [f"Holder number {aadhaar(r, valid=False)}"],
+    "decoy_txn_id": lambda r: [f"UPI transaction id {aadhaar(r).replace(' ', '')}"],
+    "decoy_order_id": lambda r: [f"Order id {aadhaar(r)}"],
+    "decoy_txn_ref": lambda r: [f"Txn reference {_digits(r, 14, first='123456789')}"],
+    # Without PAN context: with it, an invalid holder type is kept (OCR error)
+    "decoy_pan": lambda r: [f"Holder tag {pan(r, valid=False)}"],
+    "decoy_card": lambda r: [f"Card number {card(r, valid=False)}"],
+    "decoy_bill_date": lambda r: [f"Bill date {_date(r, 2020, 2025)}"],
+}
+
+
+def _filler(rng):
+    words, length = [], 0
+    while length < FILLER_MIN_LEN:
+        word = rng.choice(FILLER_WORDS)
+        words.append(word)
+        length += len(word) + 1
+    return " ".join(words)
+
+
+def make_document(size_kb, seed=0, records=None):
+    """
+    Build one document of roughly `size_kb` KB.
+
+    Returns (text, spans); spans are {"type", "value", "start", "end"} dicts
+    in document order.
+    """
+    rng = random.Random(seed)
+    names = sorted(records or RECORDS)
+    out, spans, pos = [], [], 0
+    while pos < size_kb * 1024:
+        for piece in [_filler(rng) + "\n"] + RECORDS[rng.choice(names)](rng) + ["\n"]:
+            if isinstance(piece, tuple):
+                pii_type, value = piece
+                spans.append({"type": pii_type, "value": value, "start": pos, "end": pos + len(value)})
+                piece = value
+            out.append(piece)
+            pos += len(piece)
+    return "".join(out), spans
+
+
+def make_corpus(n_docs, size_kb=2, seed=0):
+    """`n_docs` labelled documents; document i uses seed `seed + i`."""
+    return [make_document(size_kb, seed=seed + i) for i in range(n_docs)]